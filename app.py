@@ -1,292 +1,936 @@
-from flask import Flask, request, jsonify, render_template, send_file
+from flask import Blueprint, Flask, Response, request, jsonify, render_template, send_file
 from flask_cors import CORS
 import requests
 import io
-from PIL import Image, ImageDraw, ImageFont
+from PIL import Image, ImageDraw
 import os
 from dotenv import load_dotenv
 import logging
+from card_cache import CardCache
+from bulk_store import BulkCardStore
+from name_index import NameIndex
+from upstream import UpstreamClient
+from rate_limit import RequestScheduler, UpstreamBusy
+from art_cache import ArtCache
+import batch
+from concurrent.futures import ThreadPoolExecutor
+import json
+import math
+import threading
+from render_cache import RenderCache, RENDERER_REVISION, render_key
+from art_ingest import fit_art
+import assets
+from assets import FrameRegistry
+import text_layout
+import glyph_cache
+from projection import parse_fields, project
+from render_jobs import RenderJobs, JobQueueFull, DONE as JOB_DONE, FAILED as JOB_FAILED
+import encoders
+from compression import init_compression, stream_json_list
+import metrics
+import imposition
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 load_dotenv()
 
-app = Flask(__name__)
-CORS(app)
+# Routes live on a blueprint so create_app() can build as many app instances as needed
+api = Blueprint('api', __name__)
+
+# gzip/brotli for JSON responses; card objects are projected down to the requested fields
+COMPRESS_MIN_BYTES = int(os.getenv('COMPRESS_MIN_BYTES', 500))
+COMPRESS_LEVEL = int(os.getenv('COMPRESS_LEVEL', 6))
+
+# Per-stage render timings: always in /metrics, in response headers when asked for
+RENDER_TIMING_HEADERS = os.getenv('RENDER_TIMING_HEADERS', '0') == '1'
+# cProfile requests with ?profile=1 (and a random fraction of all requests) into PROFILE_DIR
+PROFILE_DIR = os.getenv('PROFILE_DIR')
+PROFILE_SAMPLE_RATE = float(os.getenv('PROFILE_SAMPLE_RATE', 0))
+SEARCH_MAX_RESULTS = int(os.getenv('SEARCH_MAX_RESULTS', 175))
+SEARCH_STREAM_THRESHOLD = 25
 
 # Scryfall API base URL
-SCRYFALL_BASE_URL = "https://api.scryfall.com"
+SCRYFALL_BASE_URL = os.getenv('SCRYFALL_BASE_URL', "https://api.scryfall.com")
+
+# Token-bucket scheduler keeping Scryfall API calls near their requested 10/s,
+# serving interactive lookups before batch work
+scryfall_scheduler = RequestScheduler(
+    rate=float(os.getenv('SCRYFALL_RATE_LIMIT', 10)),
+    burst=float(os.getenv('SCRYFALL_BURST', 10)),
+    max_queue=int(os.getenv('SCRYFALL_MAX_QUEUE', 100)),
+    max_wait=float(os.getenv('SCRYFALL_MAX_WAIT', 5)),
+    shared_file=os.getenv('SCRYFALL_RATE_LIMIT_FILE') or None,
+)
+
+# Pooled, retrying HTTP client shared by every Scryfall and image CDN call
+upstream = UpstreamClient(
+    pool_size=int(os.getenv('UPSTREAM_POOL_SIZE', 20)),
+    connect_timeout=float(os.getenv('UPSTREAM_CONNECT_TIMEOUT', 3.05)),
+    read_timeout=float(os.getenv('UPSTREAM_READ_TIMEOUT', 15)),
+    retries=int(os.getenv('UPSTREAM_RETRIES', 3)),
+    backoff_factor=float(os.getenv('UPSTREAM_BACKOFF', 0.5)),
+    scheduler=scryfall_scheduler,
+)
+
+# Shared cache for Scryfall search results and card lookups
+card_cache = CardCache(
+    max_entries=int(os.getenv('CARD_CACHE_SIZE', 2048)),
+    ttl=float(os.getenv('CARD_CACHE_TTL', 6 * 3600)),
+    negative_ttl=float(os.getenv('CARD_CACHE_NEGATIVE_TTL', 300)),
+)
 
+# Offline mode: with SCRYFALL_BULK_DB pointing at a database built by
+# `python bulk_store.py refresh <bulk-file>`, card metadata never touches the API
+bulk_store = BulkCardStore(os.getenv('SCRYFALL_BULK_DB')) if os.getenv('SCRYFALL_BULK_DB') else None
 
-# Load the fonts
+# Autocomplete index over the offline card names, rebuilt when a refresh swaps the snapshot
+AUTOCOMPLETE_MAX_NAMES = int(os.getenv('AUTOCOMPLETE_MAX_NAMES', 100000))
+_name_index = None
+_name_index_version = None
+_name_index_lock = threading.Lock()
+
+# On-disk cache for downloaded art (and art pre-resized to the frame's art box)
 current_dir = os.path.dirname(os.path.abspath(__file__))
-fonts_dir = os.path.join(current_dir, 'static', 'fonts')
-title_font = ImageFont.truetype(os.path.join(fonts_dir, "Beleren2016-Bold.ttf"), 100)
-type_font = ImageFont.truetype(os.path.join(fonts_dir, "Beleren2016-Bold.ttf"), 80)
-artist_font = ImageFont.truetype(os.path.join(fonts_dir, "Beleren2016SmallCaps-Bold.ttf"), 50)
-pt_font = ImageFont.truetype(os.path.join(fonts_dir, "Beleren2016-Bold.ttf"), 100)
-oracle_font = ImageFont.truetype(os.path.join(fonts_dir, "MPlantin-Regular.ttf"), 80)
-frame_path = os.path.join(os.path.dirname(__file__), 'static', 'images', 'black-frame.png')
-frame = Image.open(frame_path).convert('RGBA')
+art_cache = ArtCache(
+    os.getenv('ART_CACHE_DIR', os.path.join(current_dir, '.cache', 'art')),
+    max_bytes=int(os.getenv('ART_CACHE_MAX_BYTES', 512 * 1024 * 1024)),
+    store_resized=os.getenv('ART_CACHE_STORE_RESIZED', '1') != '0',
+    resized_max_bytes=int(os.getenv('ART_CACHE_RESIZED_MAX_BYTES', 256 * 1024 * 1024)),
+)
+
+# Frame templates (frame image, fonts and box geometry) from static/layouts; only the
+# layout files are read here, each frame is decoded the first time it is rendered
+layouts_dir = os.path.join(current_dir, 'static', 'layouts')
+frame_templates = FrameRegistry(layouts_dir)
+DEFAULT_FRAME = os.getenv('DEFAULT_FRAME', 'black')
+# Fonts are pooled by (file, size); text fitting asks for many sizes of the same face
+assets.fonts.max_entries = int(os.getenv('FONT_CACHE_SIZE', 256))
+# Rasterized text masks shared by every render in the process; 0 turns the cache off
+glyph_cache.runs.max_bytes = int(float(os.getenv('TEXT_CACHE_MB', 32)) * 1024 * 1024)
+# Faces tried, in order, by the frameless fallback renderer before Pillow's built-in font
+BASIC_FONT_FACES = ('arial.ttf',)
+# Preview renders use the same layouts resolved at this fraction of the frame size
+PREVIEW_SCALE = float(os.getenv('PREVIEW_SCALE', 0.25))
+
+# Rendered tokens are cached by a hash of their inputs plus the template fingerprint,
+# so swapping a frame, font or layout file invalidates every previously rendered token
+render_cache = RenderCache(
+    os.getenv('RENDER_CACHE_DIR', os.path.join(current_dir, '.cache', 'renders')),
+    max_memory_bytes=int(os.getenv('RENDER_CACHE_MEMORY_BYTES', 64 * 1024 * 1024)),
+    max_disk_bytes=int(os.getenv('RENDER_CACHE_MAX_BYTES', 1024 * 1024 * 1024)),
+)
+TOKEN_CACHE_CONTROL = os.getenv('TOKEN_CACHE_CONTROL', 'public, max-age=86400')
+
+# Request fields that must be strings when present
+TOKEN_TEXT_FIELDS = ('card_name', 'card_id', 'subtype', 'frame')
+# Request fields that may also be numbers, drawn as str(value)
+TOKEN_STAT_FIELDS = ('power', 'toughness')
 
+# Batch generation limits
+BATCH_MAX_TOKENS = int(os.getenv('BATCH_MAX_TOKENS', 200))
+BATCH_DOWNLOAD_THREADS = int(os.getenv('BATCH_DOWNLOAD_THREADS', 8))
+# Print sheets are streamed a strip at a time, so they can hold more tokens than a batch
+SHEET_MAX_TOKENS = int(os.getenv('SHEET_MAX_TOKENS', 500))
 
-@app.route('/')
+# Asynchronous render jobs share the batch render pool; past RENDER_JOBS_MAX_PENDING
+# queued jobs new submissions get a 503 with Retry-After
+render_jobs = RenderJobs(
+    lambda spec: run_render_job(spec),
+    workers=int(os.getenv('RENDER_JOBS_WORKERS', os.cpu_count() or 1)),
+    max_pending=int(os.getenv('RENDER_JOBS_MAX_PENDING', 64)),
+)
+
+
+@api.route('/')
 def index():
     """Main page for the token creator"""
     return render_template('index.html')
 
-@app.route('/api/search', methods=['GET'])
+@api.route('/api/search', methods=['GET'])
 def search_cards():
     """Search for cards using Scryfall API"""
     query = request.args.get('q', '')
     if not query:
         return jsonify({'error': 'Query parameter required'}), 400
+    limit = max(1, min(request.args.get('limit', 5, type=int), SEARCH_MAX_RESULTS))
+    try:
+        fields = parse_fields(request.args.get('fields'))
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
     
     try:
         # Search for cards
-        search_url = f"{SCRYFALL_BASE_URL}/cards/search"
-        params = {'q': query}
-        response = requests.get(search_url, params=params)
-        response.raise_for_status()
-        
-        data = response.json()
-        if data.get('data'):
-            # Return first few results
-            cards = data['data'][:5]  # Limit to 5 results
+        data = search_scryfall(query)
+        if data and data.get('data'):
+            cards = data['data'][:limit]
+            total = data.get('total_cards', 0)
+            if len(cards) > SEARCH_STREAM_THRESHOLD:
+                # Large result sets are encoded (and compressed) as they are sent
+                chunks = stream_json_list('cards', (project(card, fields) for card in cards), {'total': total})
+                return Response(chunks, mimetype='application/json')
             return jsonify({
-                'cards': cards,
-                'total': data.get('total_cards', 0)
+                'cards': [project(card, fields) for card in cards],
+                'total': total
             })
         else:
             return jsonify({'cards': [], 'total': 0})
             
+    except UpstreamBusy as e:
+        return busy_response(e)
     except requests.exceptions.RequestException as e:
         return jsonify({'error': f'API request failed: {str(e)}'}), 500
     except Exception as e:
         return jsonify({'error': f'Unexpected error: {str(e)}'}), 500
 
-@app.route('/api/card/<card_id>')
+@api.route('/api/autocomplete')
+def autocomplete():
+    """Suggest cards (id, name and type line only) for a partially typed name"""
+    query = request.args.get('q', '').strip()
+    limit = max(1, min(request.args.get('limit', 10, type=int), 25))
+    if not query:
+        return jsonify({'cards': []})
+
+    index = get_name_index()
+    if index is None:
+        # Proxying every keystroke to Scryfall would spend the shared rate limit on
+        # suggestions, so they are only offered with a local snapshot
+        return jsonify({'error': 'Autocomplete needs SCRYFALL_BULK_DB', 'cards': []}), 501
+    return jsonify({'cards': index.search(query, limit)})
+
+@api.route('/api/card/<card_id>')
 def get_card_details(card_id):
     """Get detailed information about a specific card"""
     try:
-        response = requests.get(f"{SCRYFALL_BASE_URL}/cards/{card_id}")
-        response.raise_for_status()
-        return jsonify(response.json())
+        fields = parse_fields(request.args.get('fields'))
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+    try:
+        card = lookup_card(card_id)
+        if card is None:
+            return jsonify({'error': 'Card not found'}), 404
+        return jsonify(project(card, fields))
+    except UpstreamBusy as e:
+        return busy_response(e)
     except requests.exceptions.RequestException as e:
         return jsonify({'error': f'Failed to fetch card: {str(e)}'}), 500
 
-@app.route('/api/token/generate', methods=['POST'])
+@api.route('/api/cache/stats')
+def cache_stats():
+    """Report hit/miss/eviction counters for the server-side caches"""
+    return jsonify({
+        'cards': card_cache.stats(),
+        'art': art_cache.stats(),
+        'renders': render_cache.stats(),
+        'fonts': assets.fonts.stats(),
+        'text': glyph_cache.runs.stats(),
+    })
+
+@api.route('/api/token/jobs/stats')
+def token_job_stats():
+    """Report render job queue depth, rejections and average queue/render times"""
+    return jsonify(render_jobs.stats())
+
+@api.route('/api/upstream/stats')
+def upstream_stats():
+    """Report Scryfall request queue depths and throttling counters"""
+    return jsonify(scryfall_scheduler.stats())
+
+@api.route('/metrics')
+def prometheus_metrics():
+    """Render stage and request latency histograms plus cache counters, for Prometheus"""
+    return Response(metrics.prometheus_text(), mimetype=metrics.PROMETHEUS_CONTENT_TYPE)
+
+def collect_cache_metrics():
+    """Cache and render job counters for /metrics, from the same stats the JSON endpoints report"""
+    caches = {'cards': card_cache.stats(), 'art': art_cache.stats(), 'fonts': assets.fonts.stats(),
+              'text': glyph_cache.runs.stats()}
+    renders = render_cache.stats()
+    hits = {name: stats['hits'] + stats.get('negative_hits', 0) for name, stats in caches.items()}
+    hits['renders'] = renders['memory_hits'] + renders['disk_hits']
+    misses = {name: stats['misses'] for name, stats in caches.items()}
+    misses['renders'] = renders['misses']
+    jobs = render_jobs.stats()
+    return [
+        ('token_cache_hits_total', 'counter', 'Cache lookups answered from the cache.',
+         [({'cache': name}, value) for name, value in sorted(hits.items())]),
+        ('token_cache_misses_total', 'counter', 'Cache lookups that had to fetch or render.',
+         [({'cache': name}, value) for name, value in sorted(misses.items())]),
+        ('token_render_jobs_total', 'counter', 'Asynchronous render jobs by outcome.',
+         [({'outcome': outcome}, jobs[outcome]) for outcome in ('completed', 'failed', 'rejected', 'coalesced')]),
+        ('token_render_jobs_pending', 'gauge', 'Render jobs queued or running.', [({}, jobs['pending'])]),
+    ]
+
+metrics.register_collector(collect_cache_metrics)
+
+def busy_response(error):
+    """503 telling the client when the upstream queue should have room again"""
+    response = jsonify({'error': 'Scryfall request queue is full, please retry shortly'})
+    response.status_code = 503
+    response.headers['Retry-After'] = str(max(1, math.ceil(error.retry_after)))
+    return response
+
+@api.route('/api/token/generate', methods=['POST'])
 def generate_token():
     """Generate a token using card art and custom parameters"""
     try:
-        data = request.json
-        card_name = data.get('card_name')
-        power = data.get('power', '')
-        toughness = data.get('toughness', '')
-        subtype = data.get('subtype', '')
+        spec, error = spec_from_request(request.json or {})
+        if error is not None:
+            return error
         
-        if not card_name:
-            return jsonify({'error': 'Card name is required'}), 400
+        # Identical inputs always produce the same image, so serve repeats from the render cache
+        etag = token_spec_key(spec)
+        if request.if_none_match.contains(etag):
+            return token_response(None, etag)
         
-        # Search for the card
-        search_url = f"{SCRYFALL_BASE_URL}/cards/search"
-        params = {'q': f'name:"{card_name}"'}
-        response = requests.get(search_url, params=params)
-        response.raise_for_status()
+        image_data = render_cache.get(etag)
+        if image_data is None:
+            image_data = render_token(spec)
+            render_cache.put(etag, image_data)
         
-        search_data = response.json()
-        if not search_data.get('data'):
-            return jsonify({'error': 'Card not found'}), 404
+        response = token_response(image_data, etag, encoders.MIMETYPES[spec['format']])
+        # Browsers and CDNs don't cache POST responses; the same image can be fetched,
+        # cached and revalidated with GET at this address
+        response.headers['Content-Location'] = token_url(etag, spec['format'])
+        return response
         
-        card = search_data['data'][0]
-
-        # Get the types
-        if 'type_line' in card:
-            type_line = card['type_line']
-            if '—' in type_line:
-                meta_types, subtypes = type_line.split('—', 1)
-                meta_types = meta_types.strip()
-                subtypes = subtypes.strip()
-            else:
-                # No separator, treat the whole thing as meta types
-                meta_types = type_line.strip()
-                subtypes = ""
-            
-            # Ensure meta_types ends with 'Creature' if it's a creature type
-            if 'Creature' in meta_types and not meta_types.endswith('Creature'):
-                meta_types += ' Creature'
-        else:
-            meta_types = "Creature"
-            subtypes = ""
+    except UpstreamBusy as e:
+        return busy_response(e)
+    except Exception as e:
+        return jsonify({'error': f'Failed to generate token: {str(e)}'}), 500
 
-        if "oracle_text" in card:
-            oracle_text = card['oracle_text']
-        else:
-            oracle_text = ""
+@api.route('/api/token/<key>.<output_format>')
+def get_rendered_token(key, output_format):
+    """A previously rendered token by its ETag, as a cacheable GET"""
+    if output_format not in encoders.MIMETYPES:
+        return jsonify({'error': f'Unknown format: {output_format}'}), 404
+    image_data = render_cache.get(key)
+    # The key fixes the format it was rendered in; any other extension names nothing
+    if image_data is None or encoders.sniff_mimetype(image_data) != encoders.MIMETYPES[output_format]:
+        return jsonify({'error': 'Token not found, generate it again'}), 404
+    if request.if_none_match.contains(key):
+        return token_response(None, key, vary_accept=False)
+    return token_response(image_data, key, encoders.MIMETYPES[output_format], vary_accept=False)
+
+def token_url(key, output_format):
+    return f"/api/token/{key}.{output_format}"
+
+def token_request_error(data):
+    """Why a token request can't be used, or None; only checks the shape of the fields"""
+    if not isinstance(data, dict):
+        return 'Each token must be a JSON object'
+    for field in TOKEN_TEXT_FIELDS:
+        if data.get(field) is not None and not isinstance(data[field], str):
+            return f'{field} must be a string'
+    for field in TOKEN_STAT_FIELDS:
+        value = data.get(field)
+        if value is not None and (isinstance(value, bool) or not isinstance(value, (str, int, float))):
+            return f'{field} must be a string or a number'
+    return None
+
+def stat_text(value):
+    """Power or toughness as drawn: numbers are accepted as well as strings like '*'"""
+    return '' if value is None else str(value)
+
+def spec_from_request(data):
+    """Resolve a token request body to a token spec, returning (spec, None) or (None, error response)"""
+    error = token_request_error(data)
+    if error is not None:
+        return None, (jsonify({'error': error}), 400)
+    card_name = data.get('card_name')
+    power = stat_text(data.get('power'))
+    toughness = stat_text(data.get('toughness'))
+    subtype = data.get('subtype', '')
+    frame_name = data.get('frame', DEFAULT_FRAME)
+    # Previews are rendered small and fast while the user is editing
+    scale = PREVIEW_SCALE if data.get('preview') else 1
+    
+    if not card_name:
+        return None, (jsonify({'error': 'Card name is required'}), 400)
+    if frame_name not in frame_templates:
+        return None, (jsonify({'error': f'Unknown frame: {frame_name}'}), 400)
+    try:
+        # An explicit format wins over the Accept header
+        output_format = encoders.negotiate_format(data.get('format') or request.args.get('format'),
+                                                  request.accept_mimetypes)
+        preset = encoders.get_preset(data.get('preset') or request.args.get('preset')).name
+    except ValueError as e:
+        return None, (jsonify({'error': str(e)}), 400)
+    
+    # Search for the card
+    with metrics.stage('lookup'):
+        search_data = search_scryfall(f'name:"{card_name}"')
+    if not search_data or not search_data.get('data'):
+        return None, (jsonify({'error': 'Card not found'}), 404)
+    
+    card = search_data['data'][0]
+    spec = token_spec(card, power, toughness, subtype, frame_name, output_format, preset, scale)
+    if spec is None:
+        return None, (jsonify({'error': 'No art available for this card'}), 404)
+    return spec, None
+
+@api.route('/api/token/jobs', methods=['POST'])
+def submit_token_job():
+    """Queue a token render and return a job to poll instead of waiting for the image"""
+    try:
+        spec, error = spec_from_request(request.json or {})
+        if error is not None:
+            return error
         
-        if "mana_cost" in card:
-            mana_cost = card['mana_cost']
-        else:
-            mana_cost = ""
+        job = render_jobs.submit(token_spec_key(spec), spec, encoders.MIMETYPES[spec['format']])
+        response = jsonify(job_document(job))
+        response.status_code = 202
+        response.headers['Location'] = f"/api/token/jobs/{job.id}"
+        return response
         
-        # Get the art crop image
-        if 'image_uris' in card and 'art_crop' in card['image_uris']:
-            art_url = card['image_uris']['art_crop']
-        else:
-            # For double-faced cards, try to get the first face
-            if 'card_faces' in card and card['card_faces']:
-                art_url = card['card_faces'][0].get('image_uris', {}).get('art_crop')
-            else:
-                return jsonify({'error': 'No art available for this card'}), 404
+    except JobQueueFull as e:
+        response = jsonify({'error': 'Render queue is full, please retry shortly'})
+        response.status_code = 503
+        response.headers['Retry-After'] = str(max(1, math.ceil(e.retry_after)))
+        return response
+    except UpstreamBusy as e:
+        return busy_response(e)
+    except Exception as e:
+        return jsonify({'error': f'Failed to queue token: {str(e)}'}), 500
+
+@api.route('/api/token/jobs/<job_id>')
+def token_job_status(job_id):
+    """Status and timings of a render job"""
+    job = render_jobs.get(job_id)
+    if job is None:
+        return jsonify({'error': 'Job not found'}), 404
+    return jsonify(job_document(job))
+
+@api.route('/api/token/jobs/<job_id>/result')
+def token_job_result(job_id):
+    """The rendered token once its job is done"""
+    job = render_jobs.get(job_id)
+    if job is None:
+        return jsonify({'error': 'Job not found'}), 404
+    if job.status == JOB_FAILED:
+        return jsonify(job_document(job)), 500
+    if job.status != JOB_DONE:
+        response = jsonify(job_document(job))
+        response.status_code = 202
+        response.headers['Retry-After'] = '1'
+        return response
+    
+    if request.if_none_match.contains(job.key):
+        return token_response(None, job.key)
+    image_data = render_cache.get(job.key)
+    if image_data is None:
+        return jsonify({'error': 'Result has expired, submit the job again'}), 410
+    return token_response(image_data, job.key, job.mimetype)
+
+def job_document(job):
+    document = job.to_dict()
+    document['status_url'] = f"/api/token/jobs/{job.id}"
+    document['result_url'] = f"/api/token/jobs/{job.id}/result"
+    return document
+
+def run_render_job(spec):
+    """Render a queued job into the render cache, using the render pool when there is one"""
+    key = token_spec_key(spec)
+    if render_cache.get(key) is not None:
+        return
+    pool = batch.get_render_pool()
+    if pool is None:
+        image_data = render_token(spec)
+    else:
+        art_data = art_cache.get_art(spec['art_url'], lambda: download_art(spec['art_url']))
+        image_data = pool.submit(batch.render_item, spec, art_data).result()
+    render_cache.put(key, image_data)
+
+@api.route('/api/token/batch', methods=['POST'])
+def generate_token_batch():
+    """Generate many tokens in one request and return them as a ZIP or multi-page PDF"""
+    try:
+        data = request.json or {}
+        if not isinstance(data, dict):
+            return jsonify({'error': 'The request body must be a JSON object'}), 400
+        items = data.get('tokens') or []
+        output_format = data.get('format', 'zip')
+        preset = data.get('preset', encoders.DEFAULT_PRESET)
         
-        if not art_url:
-            return jsonify({'error': 'No art available for this card'}), 404
+        if not items or not isinstance(items, list):
+            return jsonify({'error': 'A non-empty tokens list is required'}), 400
+        if len(items) > BATCH_MAX_TOKENS:
+            return jsonify({'error': f'At most {BATCH_MAX_TOKENS} tokens per batch'}), 400
+        if not isinstance(output_format, str) or output_format.lower() not in ('zip', 'pdf'):
+            return jsonify({'error': 'format must be zip or pdf'}), 400
+        output_format = output_format.lower()
+        if not isinstance(preset, str) or preset not in encoders.PRESETS:
+            return jsonify({'error': f'Unknown preset: {preset}'}), 400
         
+        results = render_batch(items, preset)
+        failures = [{'index': r['index'], 'error': r['error']} for r in results if r.get('png') is None]
+        if len(failures) == len(results):
+            return jsonify({'error': 'No tokens could be generated', 'items': failures}), 422
         
-        # Download the art
-        art_response = requests.get(art_url)
-        art_response.raise_for_status()
+        if output_format == 'pdf':
+            response = Response(batch.build_pdf(results), mimetype='application/pdf')
+            response.headers['Content-Disposition'] = 'attachment; filename=tokens.pdf'
+        else:
+            response = send_file(io.BytesIO(batch.build_zip(results)), mimetype='application/zip',
+                                 download_name='tokens.zip')
+        response.headers['X-Batch-Errors'] = json.dumps(failures)
+        return response
         
-        # Create the token
-        artist_name = card.get('artist', '')
-        token_image = create_token(
-            art_response.content,
-            card['name'],
-            power,
-            toughness,
-            meta_types,
-            subtype,
-            oracle_text,
-            mana_cost,
-            artist_name
-        )
+    except UpstreamBusy as e:
+        return busy_response(e)
+    except Exception as e:
+        return jsonify({'error': f'Failed to generate tokens: {str(e)}'}), 500
+
+@api.route('/api/token/sheet', methods=['POST'])
+def generate_sheet():
+    """Lay tokens out on printable Letter/A4 sheets, streamed as a PDF (or one sheet as a PNG)"""
+    try:
+        data = request.json or {}
+        if not isinstance(data, dict):
+            return jsonify({'error': 'The request body must be a JSON object'}), 400
+        items = data.get('tokens') or []
+        output_format = data.get('format', 'pdf')
+        output_format = output_format.lower() if isinstance(output_format, str) else output_format
         
-        # Return the token image
-        img_io = io.BytesIO()
-        token_image.save(img_io, 'PNG')
-        img_io.seek(0)
+        if not items or not isinstance(items, list):
+            return jsonify({'error': 'A non-empty tokens list is required'}), 400
+        if len(items) > SHEET_MAX_TOKENS:
+            return jsonify({'error': f'At most {SHEET_MAX_TOKENS} tokens per sheet request'}), 400
+        if output_format not in ('pdf', 'png'):
+            return jsonify({'error': 'format must be pdf or png'}), 400
+        try:
+            layout = imposition.SheetLayout(
+                paper=str(data.get('paper', 'letter')).lower(),
+                dpi=int(data.get('dpi', 300)),
+                bleed=float(data.get('bleed', 0)),
+                margin=float(data.get('margin', 0.25)),
+                cut_marks=bool(data.get('cut_marks', True)),
+            )
+            page = int(data.get('page', 1))
+        except (TypeError, ValueError) as e:
+            return jsonify({'error': str(e)}), 400
         
-        return send_file(img_io, mimetype='image/png')
+        # Every token is rendered straight at the size of its slot
+        specs, errors = batch_specs(items, scale=lambda name: layout.card_width / frame_templates[name].size[0])
+        if not specs:
+            failures = [{'index': index, 'error': error} for index, error in sorted(errors.items())]
+            return jsonify({'error': 'No tokens could be generated', 'items': failures}), 422
+        specs = [spec for _, spec in sorted(specs.items())]
+        pages = [specs[start:start + layout.per_page] for start in range(0, len(specs), layout.per_page)]
+        if output_format == 'png' and not 1 <= page <= len(pages):
+            return jsonify({'error': f'page must be between 1 and {len(pages)}'}), 400
         
+        # Fetch all the art up front (concurrently) so the stream only has to render
+        with ThreadPoolExecutor(max_workers=BATCH_DOWNLOAD_THREADS) as downloads:
+            for url in {spec['art_url'] for spec in specs}:
+                downloads.submit(art_cache.get_art, url, lambda url=url: download_art(url))
+        
+        if output_format == 'png':
+            body = imposition.write_png(layout, imposition.page_strips(layout, pages[page - 1], render_sheet_token))
+            response = Response(body, mimetype='image/png')
+        else:
+            body = imposition.write_pdf(layout, (imposition.page_strips(layout, tokens, render_sheet_token)
+                                                 for tokens in pages))
+            response = Response(body, mimetype='application/pdf')
+        response.headers['Content-Disposition'] = f'attachment; filename=tokens-sheet.{output_format}'
+        response.headers['X-Sheet-Pages'] = str(len(pages))
+        response.headers['X-Batch-Errors'] = json.dumps(
+            [{'index': index, 'error': error} for index, error in sorted(errors.items())])
+        return response
+        
+    except UpstreamBusy as e:
+        return busy_response(e)
     except Exception as e:
-        return jsonify({'error': f'Failed to generate token: {str(e)}'}), 500
+        return jsonify({'error': f'Failed to generate sheet: {str(e)}'}), 500
 
-def wrap_text(text, font, max_width):
-    """Wrap text to fit within a specified width, breaking at word boundaries"""
-    if not text:
-        return []
-    
-    words = text.split()
-    lines = []
-    current_line = []
-    
-    for word in words:
-        # Test if adding this word would exceed the width
-        test_line = ' '.join(current_line + [word])
-        bbox = font.getbbox(test_line)
-        line_width = bbox[2] - bbox[0]
-        
-        if line_width <= max_width:
-            current_line.append(word)
+def render_sheet_token(spec):
+    """Render one token for a print sheet, or None (an empty slot) if it fails mid-stream"""
+    try:
+        return render_token_image(spec)
+    except Exception as e:
+        logger.warning("Leaving a sheet slot empty for %s: %s", spec['token_name'], e)
+        return None
+
+def render_batch(items, preset=encoders.DEFAULT_PRESET):
+    """Render a list of token requests to PNGs, reporting failures per item instead of raising"""
+    results = [{'index': index} for index in range(len(items))]
+    
+    specs, errors = batch_specs(items, preset=preset)
+    for index, error in errors.items():
+        results[index]['error'] = error
+    for index, spec in specs.items():
+        results[index]['name'] = spec['token_name']
+    
+    # Serve what we can from the render cache; only the rest needs art and a renderer
+    to_render = {}
+    for index, spec in specs.items():
+        png_data = render_cache.get(token_spec_key(spec))
+        if png_data is not None:
+            results[index]['png'] = png_data
         else:
-            if current_line:
-                lines.append(' '.join(current_line))
-                current_line = [word]
+            to_render[index] = spec
+    
+    # Download each distinct piece of art once, concurrently
+    art_urls = {spec['art_url'] for spec in to_render.values()}
+    downloads = ThreadPoolExecutor(max_workers=BATCH_DOWNLOAD_THREADS)
+    art_futures = {
+        url: downloads.submit(art_cache.get_art, url, lambda url=url: download_art(url))
+        for url in art_urls
+    }
+    
+    # Hand each token to the render pool as soon as its art arrives
+    pool = batch.get_render_pool()
+    render_futures = {}
+    try:
+        for index, spec in to_render.items():
+            try:
+                art_data = art_futures[spec['art_url']].result()
+            except Exception as e:
+                results[index]['error'] = f'Failed to download art: {str(e)}'
+                continue
+            if pool is None:
+                render_futures[index] = (spec, None, art_data)
             else:
-                # Single word is too long, force break it
-                lines.append(word)
-    
-    # Add the last line
-    if current_line:
-        lines.append(' '.join(current_line))
-    
-    return lines
+                render_futures[index] = (spec, pool.submit(batch.render_item, spec, art_data), None)
+    finally:
+        downloads.shutdown()
+    
+    for index, (spec, future, art_data) in render_futures.items():
+        try:
+            png_data = future.result() if future else render_token(spec, art_data)
+        except Exception as e:
+            results[index]['error'] = f'Failed to generate token: {str(e)}'
+            continue
+        render_cache.put(token_spec_key(spec), png_data)
+        results[index]['png'] = png_data
+    
+    return results
 
-def create_token(art_data, token_name, power, toughness, meta_types, subtype, oracle_text, mana_cost, artist_name=""):
-    """Create a token image using the black frame template"""
-    # Load the art
-    art_image = Image.open(io.BytesIO(art_data))
-    
-    # Get frame dimensions
-    frame_width, frame_height = frame.size
-    
-    # Resize art to fit the transparent area (approximate dimensions for the art box)
-    # These coordinates are estimates - you may need to adjust based on your actual frame
-    art_box_width = int(frame_width * 0.85)  # Art box is roughly 85% of frame width
-    art_box_height = int(frame_height * 0.45)  # Art box is roughly 45% of frame height
-    art_box_x = int(frame_width * 0.075)      # Art box starts at roughly 7.5% from left
-    art_box_y = int(frame_height * 0.11)     # Art box starts at roughly 10% from top
-    
-    # Resize art to fit the art box while maintaining aspect ratio
-    art_image = art_image.resize((art_box_width, art_box_height), Image.Resampling.LANCZOS)
-    
-    # Create a new image with the frame dimensions
-    token = Image.new('RGBA', (frame_width, frame_height), (0, 0, 0, 0))
-    
-    # Paste the art in the center of the art box
-    art_x = art_box_x + (art_box_width - art_image.width) // 2
-    art_y = art_box_y + (art_box_height - art_image.height) // 2
-    token.paste(art_image, (art_x, art_y))
+def batch_specs(items, preset=encoders.DEFAULT_PRESET, scale=None):
+    """Resolve token requests to specs, returning ({index: spec}, {index: error}).
 
-    # Overlay the frame
-    token.paste(frame, (0, 0), frame)
-    
-    # Add text elements
-    draw = ImageDraw.Draw(token)
-    
-    # Add token name in the top title box (approximate coordinates)
-    text_x = int(frame_width * 0.09)
-    title_y = int(frame_height * 0.06)  # Roughly 8% from top
-    
-    # Center the title text horizontally across the entire frame
-    draw.text((text_x, title_y), token_name, fill=(0, 0, 0), font=title_font)
+    scale(frame_name) gives the render scale for a frame; the default is full size.
+    """
+    # Resolve every distinct card with batched /cards/collection lookups
+    with metrics.stage('lookup'):
+        cards = batch.lookup_cards(items, card_cache, fetch_scryfall_collection)
+    
+    specs, errors = {}, {}
+    for index, item in enumerate(items):
+        error = token_request_error(item)
+        if error is not None:
+            errors[index] = error
+            continue
+        key, _ = batch.identifier_for(item)
+        frame_name = item.get('frame', DEFAULT_FRAME)
+        if key is None:
+            errors[index] = 'Card name is required'
+        elif frame_name not in frame_templates:
+            errors[index] = f'Unknown frame: {frame_name}'
+        elif cards.get(key) is None:
+            errors[index] = 'Card not found'
+        else:
+            spec = token_spec(cards[key], stat_text(item.get('power')), stat_text(item.get('toughness')),
+                              item.get('subtype', ''), frame_name, 'png', preset,
+                              scale(frame_name) if scale else 1)
+            if spec is None:
+                errors[index] = 'No art available for this card'
+            else:
+                specs[index] = spec
+    return specs, errors
 
-    # Add mana cost
-    mana_cost_y = title_y
-    mana_cost_x = int(frame_width * 0.91)
-    draw.text((mana_cost_x, mana_cost_y), mana_cost, fill=(0, 0, 0), font=title_font, anchor='ra')
-    
-    # Add token type below the art (approximate coordinates)
-    type_y = int(frame_height * 0.575)  # Roughly 50% from top
-    
-    # Build type text with meta types
-    type_text = f"{meta_types} - {subtype}"
-    draw.text((text_x, type_y), type_text, fill=(0, 0, 0), font=type_font)
+def token_spec(card, power, toughness, subtype, frame_name=None,
+               output_format=encoders.DEFAULT_FORMAT, preset=encoders.DEFAULT_PRESET, scale=1):
+    """Collect everything needed to render and encode a token from a Scryfall card, or None if it has no art"""
+    # Get the types
+    if 'type_line' in card:
+        type_line = card['type_line']
+        if '—' in type_line:
+            meta_types, subtypes = type_line.split('—', 1)
+            meta_types = meta_types.strip()
+            subtypes = subtypes.strip()
+        else:
+            # No separator, treat the whole thing as meta types
+            meta_types = type_line.strip()
+            subtypes = ""
+        
+        # Ensure meta_types ends with 'Creature' if it's a creature type
+        if 'Creature' in meta_types and not meta_types.endswith('Creature'):
+            meta_types += ' Creature'
+    else:
+        meta_types = "Creature"
+        subtypes = ""
+
+    if "oracle_text" in card:
+        oracle_text = card['oracle_text']
+    else:
+        oracle_text = ""
+    
+    if "mana_cost" in card:
+        mana_cost = card['mana_cost']
+    else:
+        mana_cost = ""
+    
+    # Get the art crop image
+    if 'image_uris' in card and 'art_crop' in card['image_uris']:
+        art_url = card['image_uris']['art_crop']
+    elif 'card_faces' in card and card['card_faces']:
+        # For double-faced cards, try to get the first face
+        art_url = card['card_faces'][0].get('image_uris', {}).get('art_crop')
+    else:
+        art_url = None
+    
+    if not art_url:
+        return None
+    
+    return {
+        'frame': frame_name or DEFAULT_FRAME,
+        'card_id': card.get('id'),
+        'art_url': art_url,
+        'token_name': card['name'],
+        'power': power,
+        'toughness': toughness,
+        'meta_types': meta_types,
+        'subtype': subtype,
+        'oracle_text': oracle_text,
+        'mana_cost': mana_cost,
+        'artist_name': card.get('artist', ''),
+        'format': output_format,
+        'preset': preset,
+        'scale': scale,
+    }
+
+def token_spec_key(spec):
+    """Render cache key / ETag for a token spec"""
+    # The fingerprint comes from the layout file alone, so a cache hit never decodes a frame
+    fingerprint = frame_templates.fingerprint(spec['frame'])
+    return render_key(dict(spec, assets=fingerprint, renderer=RENDERER_REVISION))
 
-    # Add oracle text below the type text (approximate coordinates)
-    oracle_y = int(frame_height * 0.65)  # Roughly 65% from top
+def render_token(spec, art_data=None):
+    """Render a token spec and return it encoded in the spec's format and size preset.
+
+    The art is fetched through the art cache unless its encoded bytes are passed in.
+    """
+    token_image = render_token_image(spec, art_data)
+    with metrics.stage('encode'):
+        return encoders.encode_image(token_image, spec['format'], spec['preset'])
+
+def render_token_image(spec, art_data=None):
+    """Render a token spec to an RGBA image at the spec's scale of its frame"""
+    art_url = spec['art_url']
+    template = frame_templates[spec['frame']].scaled(spec['scale'])
+    
+    if art_data is not None:
+        art_image = art_data
+    else:
+        # Download the art (or reuse the cached, already resized copy)
+        art_size = template.art_box[2:]
+        art_image = art_cache.get_resized_art(
+            art_url,
+            art_size,
+            lambda: download_art(art_url),
+            lambda data: resize_art(data, art_size)
+        )
     
-    # Calculate the width of the rules text box (approximate)
-    rules_box_width = int(frame_width - 2*text_x)
+    # Create the token
+    return create_token(
+        art_image,
+        spec['token_name'],
+        spec['power'],
+        spec['toughness'],
+        spec['meta_types'],
+        spec['subtype'],
+        spec['oracle_text'],
+        spec['mana_cost'],
+        spec['artist_name'],
+        template
+    )
+
+def token_response(image_data, etag, mimetype='image/png', vary_accept=True):
+    """Build a token image response with validators, or a 304 when image_data is None"""
+    if image_data is None:
+        response = Response(status=304)
+    else:
+        response = send_file(io.BytesIO(image_data), mimetype=mimetype)
+    response.set_etag(etag)
+    if vary_accept:
+        # Without an explicit format the representation depends on the Accept header
+        response.vary.add('Accept')
+    response.headers['Cache-Control'] = TOKEN_CACHE_CONTROL
+    return response
+
+def fetch_scryfall_json(url, params=None, priority='interactive'):
+    """GET a Scryfall URL and return the decoded JSON, or None if Scryfall answers 404"""
+    response = upstream.get(url, priority=priority, params=params)
+    if response.status_code == 404:
+        return None
+    response.raise_for_status()
+    return response.json()
+
+def fetch_scryfall_collection(identifiers):
+    """Look up to 75 cards in one /cards/collection call, returning (cards, not_found)"""
+    if bulk_store is not None:
+        return bulk_store.lookup_collection(identifiers)
+    response = upstream.post(f"{SCRYFALL_BASE_URL}/cards/collection", priority='batch',
+                             json={'identifiers': identifiers})
+    response.raise_for_status()
+    data = response.json()
+    return data.get('data', []), data.get('not_found', [])
+
+def search_scryfall(query):
+    """Run a Scryfall card search through the card cache"""
+    if bulk_store is not None:
+        return bulk_store.search(query)
+
+    def fetch():
+        data = fetch_scryfall_json(f"{SCRYFALL_BASE_URL}/cards/search", {'q': query})
+        # Prime the per-card entries so a follow-up /api/card/<id> is free
+        for card in (data or {}).get('data', []):
+            if 'id' in card:
+                card_cache.put(('card', card['id']), card)
+        return data
+
+    return card_cache.get_or_fetch(('search', query), fetch)
+
+def get_name_index():
+    """Name index for the current bulk-data snapshot, or None when running online"""
+    global _name_index, _name_index_version
+    if bulk_store is None:
+        return None
+    version = bulk_store.version()
+    if version != _name_index_version:
+        with _name_index_lock:
+            if version != _name_index_version:
+                _name_index = NameIndex(bulk_store.iter_names(), max_names=AUTOCOMPLETE_MAX_NAMES)
+                _name_index_version = version
+    return _name_index
+
+def lookup_card(card_id):
+    """Fetch a single card by Scryfall id through the card cache"""
+    if bulk_store is not None:
+        return bulk_store.get(card_id)
+    return card_cache.get_or_fetch(
+        ('card', card_id),
+        lambda: fetch_scryfall_json(f"{SCRYFALL_BASE_URL}/cards/{card_id}")
+    )
+
+def download_art(art_url):
+    """Download an art image and return its encoded bytes"""
+    # Scryfall's image CDN isn't rate limited, so art downloads skip the scheduler
+    with metrics.stage('download'):
+        response = upstream.get(art_url)
+        response.raise_for_status()
+        return response.content
+
+def get_template(name=None):
+    """Return a loaded frame template by name (the default frame if None)"""
+    return frame_templates[name or DEFAULT_FRAME]
+
+def warm_up():
+    """Render a throwaway token per frame (full size and preview) so fonts, scaled
+    templates and layout caches are ready before the first real request"""
+    art = Image.new('RGB', (64, 64), (128, 128, 128))
+    token = None
+    for template in frame_templates.values():
+        for scale in (1, PREVIEW_SCALE):
+            token = create_token(art, 'Warmup Token', '1', '1', 'Creature', 'Spirit',
+                                 'Flying, vigilance\nWhen this token dies, draw a card.', '{1}{W}',
+                                 'Warmup', template=template.scaled(scale))
+    if token is not None:
+        encoders.encode_image(token, encoders.DEFAULT_FORMAT, 'thumbnail')
+
+def resize_art(art_data, size):
+    """Decode art bytes and crop/resize them to fill an art box of the given size.
+
+    The result is RGBA so compositing it onto the token canvas is a plain copy.
+    """
+    return fit_art(art_data, size)
+
+def wrap_text(text, font, max_width, symbols=None):
+    """Wrap text to fit within a specified width, breaking at word boundaries and newlines.
+
+    Pass a template's symbols to measure mana symbols at their drawn width.
+    """
+    return text_layout.wrap_lines(text, font, max_width, symbols)
+
+def create_token(art_data, token_name, power, toughness, meta_types, subtype, oracle_text, mana_cost, artist_name="", template=None):
+    """Create a token image by filling in a frame template (the default frame if None).
+
+    art_data may be the encoded art bytes or an image already resized to the art box.
+    """
+    if template is None:
+        template = get_template()
+    
+    # Resize art to fit the transparent area of the frame
+    art_box_x, art_box_y, art_box_width, art_box_height = template.art_box
+    if isinstance(art_data, Image.Image) and art_data.size == (art_box_width, art_box_height):
+        art_image = art_data
+    else:
+        art_image = fit_art(art_data, (art_box_width, art_box_height))
+    
+    # Start from the precomposited frame and blend the art into its window
+    with metrics.stage('composite'):
+        token = template.compose(art_image)
+    
+    with metrics.stage('text'):
+        draw_token_text(token, template, token_name, power, toughness, meta_types, subtype,
+                        oracle_text, mana_cost, artist_name)
+    return token
+
+def draw_token_text(token, template, token_name, power, toughness, meta_types, subtype, oracle_text, mana_cost, artist_name):
+    """Draw every text slot of a template onto a composited token"""
+    draw = ImageDraw.Draw(token)
+    text = template.text
+    symbols = template.symbols
     
-    # Wrap the oracle text to fit within the rules box
-    wrapped_lines = wrap_text(oracle_text, oracle_font, rules_box_width)
+    # Add token name and mana cost (as mana symbols) in the title bar
+    draw_slot(token, draw, text['title'], token_name, symbols)
+    draw_slot(token, draw, text['mana_cost'], mana_cost, symbols)
     
-    # Draw each wrapped line
-    line_height = oracle_font.getbbox("Ay")[3]  # Get approximate line height
+    # Add the type line below the art
+    draw_slot(token, draw, text['type_line'], f"{meta_types} - {subtype}", symbols)
+
+    # Wrap the oracle text to fit within the rules box, shrinking the font if it would overflow
+    oracle = text['oracle']
+    oracle_symbols = symbols if oracle.symbols else None
+    if oracle.height:
+        oracle_font, wrapped_lines, line_height = text_layout.fit_text(
+            oracle_text,
+            lambda size: template.font_at(oracle, size),
+            oracle.font.size,
+            oracle.min_size,
+            oracle.width,
+            oracle.height,
+            oracle_symbols
+        )
+    else:
+        oracle_font, line_height = oracle.font, template.oracle_line_height
+        wrapped_lines = wrap_text(oracle_text, oracle_font, oracle.width, oracle_symbols)
     for i, line in enumerate(wrapped_lines):
-        line_y = oracle_y + (i * line_height)
-        draw.text((text_x, line_y), line, fill=(0, 0, 0), font=oracle_font)
+        line_y = oracle.y + (i * line_height)
+        if oracle_symbols is not None:
+            oracle_symbols.draw_line(token, draw, (oracle.x, line_y), line, oracle.fill, oracle_font)
+        else:
+            glyph_cache.draw_text(draw, (oracle.x, line_y), line, oracle.fill, oracle_font)
     
-    # Add power/toughness if provided (approximate coordinates)
+    # Add power/toughness if provided
     if power and toughness:
-        pt_text = f"{power}/{toughness}"
-        pt_x = int(frame_width * 0.86)  # Roughly 80% from left
-        pt_y = int(frame_height * 0.92)  # Roughly 80% from top
-        
-        # Center the power/toughness text
-        draw.text((pt_x, pt_y), pt_text, fill=(0, 0, 0), font=pt_font, anchor='mm')
+        draw_slot(token, draw, text['pt'], f"{power}/{toughness}", symbols)
     
-    # Add artist attribution at the bottom (approximate coordinates)
+    # Add artist attribution at the bottom
     if artist_name:
-        artist_y = int(frame_height * 0.955)  # Roughly 95% from top
-        artist_x = int(frame_width * 0.195)  # Roughly 20% from left
-        
-        # Center the artist text
-        draw.text((artist_x, artist_y), artist_name, fill=(255, 255, 255), font=artist_font)
-    
-    return token
+        draw_slot(token, draw, text['artist'], artist_name, symbols)
+
+def draw_slot(token, draw, slot, value, symbols=None):
+    """Draw a single line of text at a template text slot, reusing cached glyph masks.
+
+    Symbols such as {W} are drawn inline in slots the layout marks with "symbols".
+    """
+    if symbols is not None and slot.symbols:
+        symbols.draw_line(token, draw, (slot.x, slot.y), value, slot.fill, slot.font, slot.anchor)
+    else:
+        glyph_cache.draw_text(draw, (slot.x, slot.y), value, slot.fill, slot.font, slot.anchor)
 
 def create_basic_token(art_data, token_name, power, toughness, token_type, colors, meta_type=""):
     """Fallback token creation method if frame template fails"""
@@ -311,13 +955,10 @@ def create_basic_token(art_data, token_name, power, toughness, token_type, color
     # Add text elements
     draw = ImageDraw.Draw(token)
     
-    # Try to load a font, fall back to default if not available
-    try:
-        title_font = ImageFont.truetype("arial.ttf", 24)
-        stats_font = ImageFont.truetype("arial.ttf", 20)
-    except:
-        title_font = ImageFont.load_default()
-        stats_font = ImageFont.load_default()
+    # The face is resolved once (falling back to the built-in font) and shared through the font pool
+    face = assets.fonts.find_face(*BASIC_FONT_FACES)
+    title_font = assets.load_font(face, 24)
+    stats_font = assets.load_font(face, 20)
     
     # Add token name at the top
     text_bbox = draw.textbbox((0, 0), token_name, font=title_font)
@@ -347,5 +988,26 @@ def create_basic_token(art_data, token_name, power, toughness, token_type, color
     
     return token
 
+def create_app(preload=None):
+    """Build the Flask application.
+
+    Frames and fonts load on first use; pass preload=True (or set PRELOAD_ASSETS=1)
+    to load every frame template before returning, e.g. in a preforking server.
+    """
+    app = Flask(__name__)
+    CORS(app)
+    init_compression(app, min_size=COMPRESS_MIN_BYTES, level=COMPRESS_LEVEL)
+    metrics.init_metrics(app, timing_header=RENDER_TIMING_HEADERS, profile_dir=PROFILE_DIR,
+                         profile_sample_rate=PROFILE_SAMPLE_RATE)
+    app.register_blueprint(api)
+
+    if preload is None:
+        preload = os.getenv('PRELOAD_ASSETS', '0') == '1'
+    if preload:
+        frame_templates.preload()
+    return app
+
+app = create_app()
+
 if __name__ == '__main__':
     app.run(debug=True, host='0.0.0.0', port=5000)
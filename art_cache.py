@@ -0,0 +1,88 @@
+"""
+Persistent cache for Scryfall art_crop images
+Scryfall art URLs embed a version timestamp, so the downloaded bytes for a URL never
+change and can be kept on disk indefinitely (subject to the size cap). Optionally a
+pre-decoded copy already resized to the frame's art box is stored as well, so repeat
+renders skip both the download and the JPEG decode + resize. Raw pixels are about a
+hundred times larger than the JPEG (8.6 MB against 60 KB at the full art box), so the
+resized copies live in their own directory under their own cap and can never evict
+the originals.
+"""
+
+import os
+
+from PIL import Image
+
+from disk_cache import DiskCache
+
+RAW_MAGIC = b'PILRAW1'
+# Part of the key for stored resized art; bump when the resize changes (2: crop, not stretch)
+RESIZED_REVISION = 2
+
+
+def encode_raw(image):
+    """Serialize a decoded image as a small header followed by its raw pixels"""
+    header = f"{image.mode} {image.width} {image.height}\n".encode('ascii')
+    return RAW_MAGIC + b' ' + header + image.tobytes()
+
+
+def decode_raw(data):
+    """Inverse of encode_raw; returns None if the data isn't a raw image"""
+    if not data.startswith(RAW_MAGIC + b' '):
+        return None
+    header_end = data.index(b'\n')
+    mode, width, height = data[len(RAW_MAGIC) + 1:header_end].decode('ascii').split()
+    return Image.frombytes(mode, (int(width), int(height)), data[header_end + 1:])
+
+
+class ArtCache:
+    """Art download cache backed by a DiskCache"""
+
+    def __init__(self, directory, max_bytes=512 * 1024 * 1024, store_resized=True,
+                 resized_max_bytes=256 * 1024 * 1024):
+        self.store = DiskCache(directory, max_bytes=max_bytes)
+        self.resized = DiskCache(os.path.join(directory, 'resized'), max_bytes=resized_max_bytes)
+        self.store_resized = store_resized
+
+    def get_art(self, art_url, download):
+        """Return the encoded art bytes for a URL, calling download() on a miss"""
+        key = f"art:{art_url}"
+        data = self.store.get(key)
+        if data is None:
+            data = download()
+            self.store.put(key, data)
+        return data
+
+    def get_resized_art(self, art_url, size, download, resize):
+        """Return the art decoded and resized to size.
+
+        resize(art_data) turns the encoded bytes into an image of the requested size; its
+        result is stored pre-decoded so the next call only has to read raw pixels back.
+        """
+        if not self.store_resized:
+            return resize(self.get_art(art_url, download))
+
+        key = f"art:{art_url}@{size[0]}x{size[1]}r{RESIZED_REVISION}"
+        data = self.resized.get(key)
+        if data is not None:
+            image = decode_raw(data)
+            if image is not None and image.size == tuple(size):
+                return image
+
+        image = resize(self.get_art(art_url, download))
+        if image.mode not in ('RGB', 'RGBA', 'L'):
+            image = image.convert('RGBA')
+        self.resized.put(key, encode_raw(image))
+        return image
+
+    def stats(self):
+        """Counters summed over the originals and the resized copies, and each on its own"""
+        originals, resized = self.store.stats(), self.resized.stats()
+        stats = {name: originals[name] + resized[name]
+                 for name in ('hits', 'misses', 'writes', 'evictions', 'bytes', 'max_bytes')}
+        lookups = stats['hits'] + stats['misses']
+        stats['hit_rate'] = stats['hits'] / lookups if lookups else 0.0
+        stats['originals'] = originals
+        stats['resized'] = resized
+        return stats
+
@@ -0,0 +1,158 @@
+"""
+Lazy asset registry
+Fonts and frame templates are loaded on first use rather than at import time, so
+importing the app (tests, CLI tools, the dev server) costs nothing until something is
+rendered. Fonts are shared by (file, size) through a bounded pool that counts hits, and
+frames by layout name; both are safe to use from many threads, and preload() loads
+every frame up front for servers that would rather pay the cost at startup.
+"""
+
+import glob
+import json
+import os
+import threading
+from collections import OrderedDict
+from collections.abc import Mapping
+
+from PIL import ImageFont
+
+class FontPool:
+    """Bounded LRU pool of fonts keyed by (file, point size), with hit counters.
+
+    Text that is fitted to its box asks for the same face at many sizes, so the pool
+    is capped at max_entries and evicts the least recently used size. A path of None
+    stands for Pillow's built-in bitmap font.
+    """
+
+    def __init__(self, max_entries=256):
+        self.max_entries = max_entries
+        self._fonts = OrderedDict()
+        self._faces = {}
+        self._lock = threading.Lock()
+        self._counters = {'hits': 0, 'misses': 0, 'evictions': 0}
+
+    def get(self, path, size):
+        """The font for path at size, loading it on a miss"""
+        key = (path, size)
+        with self._lock:
+            font = self._fonts.get(key)
+            if font is not None:
+                self._fonts.move_to_end(key)
+                self._counters['hits'] += 1
+                return font
+
+            self._counters['misses'] += 1
+            font = ImageFont.load_default() if path is None else ImageFont.truetype(path, size)
+            self._fonts[key] = font
+            while len(self._fonts) > self.max_entries:
+                self._fonts.popitem(last=False)
+                self._counters['evictions'] += 1
+        return font
+
+    def find_face(self, *candidates):
+        """The first candidate font file that can be opened, or None for the built-in font.
+
+        The answer is remembered, so missing fonts are probed once rather than per call.
+        """
+        with self._lock:
+            if candidates in self._faces:
+                return self._faces[candidates]
+        face = None
+        for candidate in candidates:
+            try:
+                ImageFont.truetype(candidate, 10)
+            except OSError:
+                continue
+            face = candidate
+            break
+        with self._lock:
+            self._faces[candidates] = face
+        return face
+
+    def loaded(self):
+        """(path, size) of every font currently in the pool"""
+        with self._lock:
+            return sorted(self._fonts, key=lambda key: (key[0] or '', key[1]))
+
+    def stats(self):
+        """Return a snapshot of the pool counters"""
+        with self._lock:
+            stats = dict(self._counters)
+            stats['size'] = len(self._fonts)
+            stats['max_entries'] = self.max_entries
+            stats['faces'] = len({path for path, _ in self._fonts})
+        lookups = stats['hits'] + stats['misses']
+        stats['hit_rate'] = stats['hits'] / lookups if lookups else 0.0
+        return stats
+
+
+fonts = FontPool()
+
+
+def load_font(path, size):
+    """Load a font once per (file, size) from the shared pool"""
+    return fonts.get(path, size)
+
+
+def loaded_fonts():
+    """(path, size) of every font in the shared pool"""
+    return fonts.loaded()
+
+
+class FrameRegistry(Mapping):
+    """Frame templates by name, each loaded from its layout file on first access.
+
+    Only the small JSON layout files are read up front (to learn the frame names).
+    """
+
+    def __init__(self, layouts_dir):
+        self.layouts_dir = layouts_dir
+        self._paths = {}
+        for layout_path in sorted(glob.glob(os.path.join(layouts_dir, '*.json'))):
+            with open(layout_path) as f:
+                name = json.load(f).get('name', os.path.splitext(os.path.basename(layout_path))[0])
+            self._paths[name] = layout_path
+        self._templates = {}
+        self._fingerprints = {}
+        self._lock = threading.Lock()
+
+    def __getitem__(self, name):
+        template = self._templates.get(name)
+        if template is None:
+            layout_path = self._paths[name]
+            with self._lock:
+                template = self._templates.get(name)
+                if template is None:
+                    from frame_template import FrameTemplate
+                    template = self._templates[name] = FrameTemplate.load(layout_path)
+        return template
+
+    def __iter__(self):
+        return iter(self._paths)
+
+    def __len__(self):
+        return len(self._paths)
+
+    def __contains__(self, name):
+        return name in self._paths
+
+    def fingerprint(self, name):
+        """A frame's asset fingerprint, computed from the files without decoding them"""
+        template = self._templates.get(name)
+        if template is not None:
+            return template.fingerprint
+        fingerprint = self._fingerprints.get(name)
+        if fingerprint is None:
+            from frame_template import read_layout
+            fingerprint = self._fingerprints[name] = read_layout(self._paths[name])[4]
+        return fingerprint
+
+    def loaded(self):
+        """Names of the frames decoded so far"""
+        return sorted(self._templates)
+
+    def preload(self):
+        """Load every frame now"""
+        for name in self:
+            self[name]
+        return self
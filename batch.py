@@ -0,0 +1,152 @@
+"""
+Helpers for rendering many tokens in one request
+Card lookups are deduplicated and resolved through Scryfall's /cards/collection
+endpoint, art is downloaded concurrently, and rendering runs in a process pool so a
+batch uses every core instead of one request thread.
+"""
+
+import io
+import json
+import multiprocessing
+import os
+import re
+import threading
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
+
+from PIL import Image
+
+import imposition
+
+# Scryfall accepts at most 75 identifiers per /cards/collection request
+COLLECTION_CHUNK_SIZE = 75
+
+_MISSING = object()
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def identifier_for(item):
+    """Return (cache_key, scryfall_identifier) for a batch item, or (None, None)"""
+    if not isinstance(item, dict):
+        return None, None
+    if item.get('card_id') and isinstance(item['card_id'], str):
+        return ('card', item['card_id']), {'id': item['card_id']}
+    if item.get('card_name') and isinstance(item['card_name'], str):
+        return ('named', item['card_name'].strip().lower()), {'name': item['card_name'].strip()}
+    return None, None
+
+
+def lookup_cards(items, card_cache, fetch_collection):
+    """Resolve the card for every item, returning a dict of cache key -> card (or None).
+
+    Items already in the card cache are not requested again; the rest are deduplicated
+    and fetched with as few /cards/collection calls as possible.
+    """
+    found = {}
+    missing = {}
+    for item in items:
+        key, identifier = identifier_for(item)
+        if key is None or key in found or key in missing:
+            continue
+        card = card_cache.get(key, _MISSING)
+        if card is _MISSING:
+            missing[key] = identifier
+        else:
+            found[key] = card
+
+    pending = list(missing.items())
+    for start in range(0, len(pending), COLLECTION_CHUNK_SIZE):
+        chunk = pending[start:start + COLLECTION_CHUNK_SIZE]
+        cards, not_found = fetch_collection([identifier for _, identifier in chunk])
+
+        # Scryfall returns cards in request order, skipping the identifiers it couldn't find
+        remaining = iter(cards)
+        for key, identifier in chunk:
+            card = None if identifier in not_found else next(remaining, None)
+            card_cache.put(key, card)
+            found[key] = card
+
+    return found
+
+
+def get_render_pool():
+    """Shared process pool for CPU-bound rendering, or None when RENDER_POOL_WORKERS=0"""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            workers = int(os.getenv('RENDER_POOL_WORKERS', os.cpu_count() or 1))
+            if workers <= 0:
+                return None
+            # forkserver children start from a clean process with every frame already
+            # loaded (via wsgi) rather than forking a multi-threaded web worker
+            if 'forkserver' in multiprocessing.get_all_start_methods():
+                context = multiprocessing.get_context('forkserver')
+                context.set_forkserver_preload(['wsgi'])
+            else:
+                context = multiprocessing.get_context('spawn')
+            _pool = ProcessPoolExecutor(max_workers=workers, mp_context=context)
+        return _pool
+
+
+def render_item(spec, art_data):
+    """Process-pool entry point: render one token spec to encoded image bytes"""
+    import app
+    return app.render_token(spec, art_data)
+
+
+def safe_filename(index, name):
+    slug = re.sub(r'[^a-z0-9]+', '-', name.lower()).strip('-') or 'token'
+    return f"{index + 1:03d}-{slug}.png"
+
+
+def build_zip(results):
+    """Package rendered tokens plus a manifest of per-item results as a ZIP"""
+    buffer = io.BytesIO()
+    manifest = []
+    with zipfile.ZipFile(buffer, 'w', zipfile.ZIP_STORED) as archive:
+        for result in results:
+            entry = {'index': result['index']}
+            if result.get('png') is not None:
+                entry['file'] = safe_filename(result['index'], result['name'])
+                # PNG data is already deflated, so storing it is as small and much faster
+                archive.writestr(entry['file'], result['png'])
+            else:
+                entry['error'] = result['error']
+            manifest.append(entry)
+        archive.writestr('manifest.json', json.dumps(manifest, indent=2))
+    return buffer.getvalue()
+
+
+class CardPage:
+    """Page geometry for imposition.write_pdf when every page holds a single token"""
+
+    def __init__(self, size, page_width_inches):
+        self.width, self.height = size
+        self.dpi = self.width / page_width_inches
+
+
+def build_pdf(results, page_width_inches=2.5):
+    """Yield a PDF with one page per token, sized like a real card
+
+    Pages are decoded and written one at a time, so only a single
+    full-resolution page is ever held in memory.
+    """
+    rendered = [result['png'] for result in results if result.get('png') is not None]
+    if not rendered:
+        return iter(())
+    with Image.open(io.BytesIO(rendered[0])) as first:
+        page = CardPage(first.size, page_width_inches)
+
+    def pages():
+        for data in rendered:
+            image = Image.open(io.BytesIO(data))
+            if image.size != (page.width, page.height):
+                image = image.resize((page.width, page.height), Image.LANCZOS)
+            # PDF pages have no alpha channel, so flatten the rounded corners onto white
+            flat = Image.new('RGB', image.size, (255, 255, 255))
+            flat.paste(image, (0, 0), image.convert('RGBA'))
+            del image
+            yield [(0, flat)]
+
+    return imposition.write_pdf(page, pages())
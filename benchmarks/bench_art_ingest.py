@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""
+Benchmark: art decode + resize, the original stretch path against art_ingest.fit_art
+For several source sizes (Scryfall's art_crop and larger user art) and both the full
+and preview art boxes, reports the median time to decode and fit the art, and the
+peak memory it took, measured as the growth of the process's max RSS in a fresh
+interpreter per case (Pillow allocates pixels outside Python's allocator).
+
+Linux only (reads /proc).
+
+Usage: python benchmarks/bench_art_ingest.py [repeats]
+"""
+
+import os
+import subprocess
+import sys
+import tempfile
+
+import common
+
+SOURCES = [(626, 457), (1252, 914), (2504, 1828), (5008, 3656)]
+
+MEASURE = '''
+import io, statistics, sys, time
+from PIL import Image
+from art_ingest import fit_art
+
+def high_water_kb():
+    with open('/proc/self/status') as f:
+        return next(int(line.split()[1]) for line in f if line.startswith('VmHWM:'))
+
+def original(data, size):
+    return Image.open(io.BytesIO(data)).resize(size, Image.Resampling.LANCZOS).convert('RGBA')
+
+path, width, height, repeats = sys.argv[1], int(sys.argv[2]), int(sys.argv[3]), int(sys.argv[4])
+func = original if sys.argv[5] == 'original' else fit_art
+data = open(path, 'rb').read()
+before = high_water_kb()
+samples = []
+for _ in range(repeats):
+    start = time.perf_counter()
+    func(data, (width, height))
+    samples.append(time.perf_counter() - start)
+peak = high_water_kb() - before
+print(statistics.median(samples) * 1000, peak / 1024)
+'''
+
+
+def measure(path, size, repeats, method):
+    result = subprocess.run([sys.executable, '-c', MEASURE, path, str(size[0]), str(size[1]), str(repeats), method],
+                            cwd=common.ROOT, capture_output=True, text=True, check=True)
+    ms, peak_mb = result.stdout.split()
+    return float(ms), float(peak_mb)
+
+
+def main():
+    repeats = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+    import app
+    template = app.get_template()
+    boxes = {'full': template.art_box[2:], 'preview': template.scaled(app.PREVIEW_SCALE).art_box[2:]}
+
+    print(f"🎨 art decode + fit (median of {repeats}, peak = high-water RSS growth)")
+    with tempfile.TemporaryDirectory() as directory:
+        for source in SOURCES:
+            path = os.path.join(directory, f'{source[0]}x{source[1]}.jpg')
+            with open(path, 'wb') as f:
+                f.write(common.make_art_jpeg(3, size=source))
+            for box_name, box in boxes.items():
+                original_ms, original_mb = measure(path, box, repeats, 'original')
+                fit_ms, fit_mb = measure(path, box, repeats, 'fit_art')
+                label = f"{source[0]}x{source[1]} -> {box_name} {box[0]}x{box[1]}"
+                print(f"   {label:32s} original {original_ms:7.1f} ms {original_mb:6.1f} MB   "
+                      f"fit_art {fit_ms:7.1f} ms {fit_mb:6.1f} MB   speedup {original_ms / fit_ms:4.1f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""
+Benchmark: autocomplete name index at Oracle-card scale
+Builds a NameIndex over synthetic card names (~30k, like Scryfall's oracle cards),
+reports build time and memory held by the index, then times prefix, substring and
+misspelled queries.
+
+Usage: python benchmarks/bench_autocomplete.py [names] [queries]
+"""
+
+import random
+import sys
+import time
+import tracemalloc
+
+import common  # noqa: F401  (puts the repo on sys.path)
+
+from name_index import NameIndex
+
+WORDS = (
+    'angel archon ashen blade bloom bog cinder circle council crypt dawn dragon dread ember '
+    'esper eternal fang fiend forge gate ghoul glade golem grave grove guardian harbinger '
+    'hollow horizon hydra iron kraken lance lich lotus marsh mind moon necromancer oath '
+    'oracle phoenix pyre raven relic rune sage sentinel serpent shade shrine siren sky '
+    'spirit storm sun temple thorn throne tide titan tomb vault vengeance warden watch '
+    'wild wind wisp wraith wurm zealot'
+).split()
+
+
+def make_names(count, rng):
+    names = set()
+    while len(names) < count:
+        words = rng.sample(WORDS, rng.randint(1, 4))
+        names.add(' '.join(word.capitalize() for word in words) + (f' {len(names)}' if rng.random() < 0.5 else ''))
+    return sorted(names)
+
+
+def misspell(name, rng):
+    chars = list(name.lower())
+    position = rng.randrange(1, len(chars) - 1)
+    chars[position], chars[position + 1] = chars[position + 1], chars[position]
+    return ''.join(chars)
+
+
+def percentile(samples, fraction):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+
+def time_queries(index, queries):
+    samples = []
+    for query in queries:
+        start = time.perf_counter()
+        index.search(query, 10)
+        samples.append((time.perf_counter() - start) * 1000)
+    return percentile(samples, 0.5), percentile(samples, 0.99)
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 30000
+    query_count = int(sys.argv[2]) if len(sys.argv) > 2 else 500
+    rng = random.Random(42)
+    names = make_names(count, rng)
+    records = [(f'id-{i}', name, 'Creature — Spirit') for i, name in enumerate(names)]
+
+    start = time.perf_counter()
+    index = NameIndex(records)
+    build_s = time.perf_counter() - start
+
+    # Build again under tracemalloc (which slows it down) to see what the index keeps
+    del index
+    tracemalloc.start()
+    index = NameIndex(records)
+    held_mb = tracemalloc.get_traced_memory()[0] / 1024 / 1024
+    tracemalloc.stop()
+
+    picks = [rng.choice(names) for _ in range(query_count)]
+    workloads = {
+        'prefix (3 chars)': [name[:3] for name in picks],
+        'prefix (full word)': [name.split()[0] for name in picks],
+        'substring (2nd word)': [name.split()[-1] if ' ' in name else name for name in picks],
+        'misspelled name': [misspell(name, rng) for name in picks if len(name) > 4],
+    }
+
+    print(f"🔎 NameIndex over {len(index)} names")
+    print(f"   build: {build_s:.2f} s, memory held by index: {held_mb:.1f} MB")
+    for label, queries in workloads.items():
+        p50, p99 = time_queries(index, queries)
+        print(f"   {label:22s} p50 {p50:6.3f} ms   p99 {p99:6.3f} ms")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,52 @@
+#!/usr/bin/env python3
+"""
+Benchmark: batch endpoint vs. one /api/token/generate POST per token
+Both paths start with cold caches against a local Scryfall stub with simulated latency.
+
+Usage: python benchmarks/bench_batch.py [token_count] [latency_seconds]
+"""
+
+import sys
+
+from common import populate_stub, timed
+
+from scryfall_stub import ScryfallStub, stubbed_app
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 16
+    latency = float(sys.argv[2]) if len(sys.argv) > 2 else 0.05
+    items = [
+        {'card_name': f'Bench Card {i}', 'power': '2', 'toughness': '2', 'subtype': 'Zombie'}
+        for i in range(count)
+    ]
+    timings = {}
+
+    with ScryfallStub(latency=latency) as stub:
+        populate_stub(stub, count)
+
+        with stubbed_app(stub) as token_app:
+            client = token_app.app.test_client()
+            with timed(timings, 'serial'):
+                for item in items:
+                    assert client.post('/api/token/generate', json=item).status_code == 200
+
+        with stubbed_app(stub) as token_app:
+            client = token_app.app.test_client()
+            # Start the worker processes outside the timed region, like a warmed-up server
+            import batch
+            pool = batch.get_render_pool()
+            if pool is not None:
+                pool.submit(sum, []).result()
+            with timed(timings, 'batch'):
+                response = client.post('/api/token/batch', json={'tokens': items})
+                assert response.status_code == 200
+
+    print(f"🃏 {count} tokens, {latency * 1000:.0f} ms simulated upstream latency")
+    for name, seconds in timings.items():
+        print(f"   {name:>6}: {seconds:6.2f} s  ({count / seconds:5.2f} tokens/s)")
+    print(f"   speedup: {timings['serial'] / timings['batch']:.1f}x")
+
+
+if __name__ == '__main__':
+    main()
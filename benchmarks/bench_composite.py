@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark: frame compositing in create_token, before and after precompositing
+"legacy" reproduces the old path (full-size canvas, art paste, full-frame alpha paste);
+"precomposed" is FrameTemplate.compose. Each variant runs in its own process so the
+peak RSS numbers don't mix.
+
+Usage: python benchmarks/bench_composite.py [iterations]
+"""
+
+import json
+import resource
+import subprocess
+import sys
+import time
+
+from common import make_art_jpeg
+
+
+def legacy_compose(template, frame, art_image):
+    token = Image.new('RGBA', template.size, (0, 0, 0, 0))
+    token.paste(art_image, template.art_box[:2])
+    token.paste(frame, (0, 0), frame)
+    return token
+
+
+def run_variant(variant, iterations):
+    import app
+
+    template = app.get_template()
+    art_image = app.resize_art(make_art_jpeg(), template.art_box[2:])
+    if variant == 'legacy':
+        art_image = art_image.convert('RGB')  # the old path pasted the decoded JPEG as-is
+    # The template no longer keeps the raw frame; its precomposited base has the same
+    # size and mode, so it stands in for the frame without loading a second copy
+    frame = template.base
+
+    rss_before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    start = time.perf_counter()
+    for _ in range(iterations):
+        if variant == 'legacy':
+            legacy_compose(template, frame, art_image)
+        elif variant == 'precomposed':
+            template.compose(art_image)
+        else:
+            app.create_token(art_image, 'Zombie', '2', '2', 'Creature', 'Zombie',
+                             'Deathtouch', '{1}{B}', 'Bench Artist')
+    elapsed = time.perf_counter() - start
+    rss_after = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+    return {
+        'variant': variant,
+        'ms_per_call': elapsed / iterations * 1000,
+        'peak_rss_mb': rss_after / 1024,
+        'render_peak_growth_mb': max(rss_after - rss_before, 0) / 1024,
+    }
+
+
+def main():
+    iterations = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+    print(f"🃏 compositing benchmark, {iterations} iterations per variant")
+    for variant in ('legacy', 'precomposed', 'create_token'):
+        output = subprocess.run(
+            [sys.executable, __file__, '--variant', variant, str(iterations)],
+            check=True, capture_output=True, text=True,
+        ).stdout
+        result = json.loads(output)
+        print(f"   {variant:>12}: {result['ms_per_call']:7.1f} ms/call  "
+              f"peak RSS {result['peak_rss_mb']:6.1f} MB  "
+              f"(+{result['render_peak_growth_mb']:.1f} MB while rendering)")
+
+
+from PIL import Image  # noqa: E402
+
+if __name__ == '__main__':
+    if len(sys.argv) > 2 and sys.argv[1] == '--variant':
+        print(json.dumps(run_variant(sys.argv[2], int(sys.argv[3]))))
+    else:
+        main()
@@ -0,0 +1,55 @@
+#!/usr/bin/env python3
+"""
+Benchmark: token output encoding per format and size preset
+Renders one token from synthetic art, then reports encode time (including the
+downscale) and output size for every format/preset pair next to the original
+full-size default-level PNG.
+
+Usage: python benchmarks/bench_encode.py [repeats]
+"""
+
+import io
+import statistics
+import sys
+import time
+
+import common
+
+import app
+import encoders
+
+
+def median_ms(func, repeats):
+    samples = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        result = func()
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples), result
+
+
+def legacy_png(image):
+    buffer = io.BytesIO()
+    image.save(buffer, 'PNG')
+    return buffer.getvalue()
+
+
+def main():
+    repeats = int(sys.argv[1]) if len(sys.argv) > 1 else 3
+    token = app.create_token(common.make_art_jpeg(3), 'Grizzly Bears', '2', '2', 'Creature', 'Bear',
+                             'Vigilance', '{1}{G}', 'Jeff A. Menges')
+
+    baseline_ms, baseline = median_ms(lambda: legacy_png(token), repeats)
+    print(f"🖼️  encoding a {token.width}x{token.height} token ({repeats} runs each)")
+    print(f"   {'original PNG':18s} {baseline_ms:8.1f} ms {len(baseline) / 1024:9.1f} KB")
+
+    for preset in encoders.PRESETS:
+        for output_format in encoders.available_formats():
+            ms, data = median_ms(lambda: encoders.encode_image(token, output_format, preset), repeats)
+            label = f"{preset}/{output_format}"
+            print(f"   {label:18s} {ms:8.1f} ms {len(data) / 1024:9.1f} KB"
+                  f"  ({len(data) / len(baseline):6.1%} of original)")
+
+
+if __name__ == '__main__':
+    main()
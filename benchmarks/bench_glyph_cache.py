@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+Benchmark: text stage with and without the glyph-run cache
+Renders every fixture card (art already fitted, so only compositing and text run) at
+full size and preview scale three ways: with the cache off (plain ImageDraw.text),
+with an empty cache at the start of each pass over the cards (runs repeated between
+cards, such as "2/2" or a shared type line, still hit), and with a warm cache. Reports
+the median time of the text stage per token, the hit rate and the cache size, and
+checks every cached render is pixel-identical to the uncached one.
+
+Usage: python benchmarks/bench_glyph_cache.py [repeats]
+"""
+
+import statistics
+import sys
+
+from PIL import ImageChops
+
+import common  # noqa: F401  (puts the repo on sys.path)
+
+import app
+import glyph_cache
+import metrics
+from art_ingest import fit_art
+from bench_render import fixture_tokens
+from glyph_cache import GlyphRunCache
+
+
+def text_pass(template, tokens):
+    """Render every token once; returns (text stage seconds per token, images)"""
+    seconds, images = [], []
+    for card, art in tokens:
+        spec = app.token_spec(card, '2', '2', 'Spirit', frame_name='black')
+        with metrics.collect_timings() as timings:
+            images.append(app.create_token(art, spec['token_name'], spec['power'], spec['toughness'],
+                                           spec['meta_types'], spec['subtype'], spec['oracle_text'],
+                                           spec['mana_cost'], spec['artist_name'], template))
+        seconds.append(timings['text'])
+    return seconds, images
+
+
+def main():
+    repeats = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+    app.warm_up()
+    original = glyph_cache.runs
+
+    print(f"🔤 text stage per token, {repeats} passes over the fixture cards")
+    for label, scale in (('full size', 1), ('preview', app.PREVIEW_SCALE)):
+        template = app.get_template('black').scaled(scale)
+        art_size = template.art_box[2:]
+        tokens = [(card, fit_art(art, art_size)) for card, art in fixture_tokens()]
+
+        glyph_cache.runs = GlyphRunCache(max_bytes=0)
+        uncached, expected = [], None
+        for _ in range(repeats):
+            seconds, expected = text_pass(template, tokens)
+            uncached.extend(seconds)
+
+        cold, cold_stats = [], None
+        for _ in range(repeats):
+            glyph_cache.runs = GlyphRunCache()
+            seconds, images = text_pass(template, tokens)
+            cold.extend(seconds)
+            cold_stats = glyph_cache.runs.stats()
+
+        warm = []
+        for _ in range(repeats):
+            seconds, images = text_pass(template, tokens)
+            warm.extend(seconds)
+        warm_stats = glyph_cache.runs.stats()
+        # Hit rate of the warm passes alone, not counting the cold pass that filled the cache
+        hits = warm_stats['hits'] - cold_stats['hits']
+        misses = warm_stats['misses'] - cold_stats['misses']
+        warm_stats['hit_rate'] = hits / (hits + misses)
+        glyph_cache.runs = original
+
+        identical = sum(ImageChops.difference(image, reference).getbbox() is None
+                        for image, reference in zip(images, expected))
+        base = statistics.median(uncached) * 1000
+        print(f"   {label} ({template.size[0]}x{template.size[1]}):")
+        print(f"      cache off:   {base:7.2f} ms")
+        for name, samples, stats in (('cold cache', cold, cold_stats), ('warm cache', warm, warm_stats)):
+            median = statistics.median(samples) * 1000
+            print(f"      {name}:  {median:7.2f} ms  ({(median / base - 1) * 100:+4.0f}%, "
+                  f"hit rate {stats['hit_rate']:.0%}, {stats['size']} runs, {stats['bytes'] / 1024 / 1024:.1f} MB)")
+        print(f"      pixel-identical to uncached: {identical}/{len(expected)}")
+
+
+if __name__ == '__main__':
+    main()
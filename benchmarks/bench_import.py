@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""
+Benchmark: cost of importing the app module
+Runs `python -X importtime -c "import app"` in a fresh interpreter and lists the
+slowest modules by cumulative import time, then compares wall time and peak RSS of a
+bare import (assets load lazily) against an import followed by preloading every frame
+template, which is what the production entry point does.
+
+Usage: python benchmarks/bench_import.py [top]
+"""
+
+import statistics
+import subprocess
+import sys
+
+import common
+
+REPEATS = 5
+
+MEASURE = '''
+import resource, sys, time
+start = time.perf_counter()
+import app
+if sys.argv[1] == 'preload':
+    app.frame_templates.preload()
+elapsed = time.perf_counter() - start
+import assets
+print(elapsed, resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+      len(app.frame_templates.loaded()), len(assets.loaded_fonts()))
+'''
+
+
+def import_times():
+    """(cumulative us, self us, module) for every module imported by `import app`"""
+    result = subprocess.run([sys.executable, '-X', 'importtime', '-c', 'import app'],
+                            cwd=common.ROOT, capture_output=True, text=True, check=True)
+    rows = []
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        own, cumulative, module = line[len('import time:'):].split('|')
+        rows.append((int(cumulative), int(own), module.rstrip()))
+    return rows
+
+
+def measure(mode):
+    samples = []
+    for _ in range(REPEATS):
+        result = subprocess.run([sys.executable, '-c', MEASURE, mode],
+                                cwd=common.ROOT, capture_output=True, text=True, check=True)
+        elapsed, rss_kb, frames, fonts = result.stdout.split()
+        samples.append((float(elapsed), int(rss_kb), int(frames), int(fonts)))
+    return (statistics.median(sample[0] for sample in samples),
+            statistics.median(sample[1] for sample in samples) / 1024,
+            samples[0][2], samples[0][3])
+
+
+def main():
+    top = int(sys.argv[1]) if len(sys.argv) > 1 else 10
+    rows = import_times()
+    total = next(cumulative for cumulative, _, module in rows if module.strip() == 'app')
+    print(f"📦 import app: {total / 1000:.1f} ms cumulative (python -X importtime)")
+    for cumulative, own, module in sorted(rows, reverse=True)[:top]:
+        print(f"   {cumulative / 1000:8.1f} ms  (self {own / 1000:6.1f} ms)  {module.strip()}")
+
+    print(f"\n⏱️  fresh interpreter, median of {REPEATS}")
+    for mode in ('lazy', 'preload'):
+        elapsed, rss_mb, frames, fonts = measure(mode)
+        print(f"   {mode:8s} {elapsed * 1000:8.1f} ms  peak RSS {rss_mb:6.1f} MB  "
+              f"frames loaded {frames}  fonts loaded {fonts}")
+
+
+if __name__ == '__main__':
+    main()
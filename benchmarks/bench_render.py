@@ -0,0 +1,154 @@
+#!/usr/bin/env python3
+"""
+Benchmark: every stage of a token render, offline
+Renders each recorded fixture card (art from fixtures/art) at full size and at preview
+scale and times the decode, resize, composite, text and encode stages through the
+same metrics.stage() timers the server reports, plus wrap_text (cold and warm width
+cache), fit_text and create_basic_token on their own. Each result is the median, p95,
+min and mean over the repeats, in milliseconds.
+
+--json writes the results with the commit and library versions they were measured
+with; compare two such files with benchmarks/compare_bench.py.
+
+Usage: python benchmarks/bench_render.py [--repeats 5] [--json results.json]
+"""
+
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+
+import PIL
+
+import common
+
+import app
+import encoders
+import metrics
+import text_layout
+from scryfall_stub import FIXTURES_DIR, read_fixture_art
+
+RENDER_STAGES = ('decode', 'resize', 'composite', 'text', 'encode')
+
+
+def fixture_tokens():
+    """(spec arguments, art bytes) for every fixture card with art"""
+    with open(os.path.join(FIXTURES_DIR, 'cards.json'), encoding='utf-8') as f:
+        cards = json.load(f)
+    tokens = []
+    for card in cards:
+        spec = app.token_spec(card, '2', '2', 'Spirit', frame_name='black')
+        if spec is not None:
+            tokens.append((card, read_fixture_art(spec['art_url'])))
+    return tokens
+
+
+def summarize(samples):
+    ordered = sorted(samples)
+    return {
+        'runs': len(ordered),
+        'median_ms': statistics.median(ordered) * 1000,
+        'p95_ms': common.percentile(ordered, 0.95) * 1000,
+        'min_ms': ordered[0] * 1000,
+        'mean_ms': statistics.fmean(ordered) * 1000,
+    }
+
+
+def time_calls(samples, name, func, *args):
+    start = time.perf_counter()
+    result = func(*args)
+    samples.setdefault(name, []).append(time.perf_counter() - start)
+    return result
+
+
+def render_samples(tokens, scale, repeats, samples):
+    """Render every token repeats times at scale, recording each stage and the total"""
+    prefix = 'full' if scale == 1 else 'preview'
+    for _ in range(repeats):
+        for card, art in tokens:
+            spec = app.token_spec(card, '2', '2', 'Spirit', frame_name='black', scale=scale)
+            start = time.perf_counter()
+            with metrics.collect_timings() as timings:
+                image = app.render_token_image(spec, art)
+                with metrics.stage('encode'):
+                    encoders.encode_image(image, spec['format'], spec['preset'])
+            samples.setdefault(f'{prefix}/total', []).append(time.perf_counter() - start)
+            for stage in RENDER_STAGES:
+                samples.setdefault(f'{prefix}/{stage}', []).append(timings.get(stage, 0.0))
+
+
+def text_samples(texts, repeats, samples):
+    template = app.get_template('black')
+    oracle = template.text['oracle']
+    for _ in range(repeats):
+        text_layout._widths.clear()
+        for text in texts:
+            time_calls(samples, 'wrap_text/cold', app.wrap_text, text, oracle.font, oracle.width)
+        for text in texts:
+            time_calls(samples, 'wrap_text/warm', app.wrap_text, text, oracle.font, oracle.width)
+            time_calls(samples, 'fit_text', text_layout.fit_text, text,
+                       lambda size: template.font_at(oracle, size),
+                       oracle.font.size, oracle.min_size, oracle.width, oracle.height)
+
+
+def basic_samples(tokens, repeats, samples):
+    for _ in range(repeats):
+        for card, art in tokens:
+            time_calls(samples, 'create_basic_token', app.create_basic_token,
+                       art, card['name'], '2', '2', 'Creature', card.get('colors', []), 'Spirit')
+
+
+def environment():
+    try:
+        commit = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=common.ROOT,
+                                capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        'commit': commit,
+        'python': platform.python_version(),
+        'pillow': PIL.__version__,
+        'machine': platform.machine(),
+        'cpus': os.cpu_count(),
+        'time': time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--repeats', type=int, default=5)
+    parser.add_argument('--json', help='write the results to this file')
+    args = parser.parse_args(argv)
+
+    tokens = fixture_tokens()
+    texts = [card.get('oracle_text', '') for card, _ in tokens if card.get('oracle_text')]
+
+    # Load frames, fonts and scaled templates before anything is timed
+    app.warm_up()
+    samples = {}
+    render_samples(tokens, 1, args.repeats, samples)
+    render_samples(tokens, app.PREVIEW_SCALE, args.repeats, samples)
+    text_samples(texts, args.repeats, samples)
+    basic_samples(tokens, args.repeats, samples)
+    results = {name: summarize(values) for name, values in samples.items()}
+
+    print(f"🎨 {len(tokens)} fixture tokens x {args.repeats} repeats "
+          f"(Pillow {PIL.__version__}, Python {platform.python_version()})")
+    print(f"   {'benchmark':<22} {'runs':>5} {'median ms':>10} {'p95 ms':>9} {'min ms':>9}")
+    for name, stats in results.items():
+        print(f"   {name:<22} {stats['runs']:>5} {stats['median_ms']:>10.2f} "
+              f"{stats['p95_ms']:>9.2f} {stats['min_ms']:>9.2f}")
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump({'config': {'repeats': args.repeats, 'tokens': len(tokens)},
+                       'environment': environment(), 'results': results}, f, indent=2)
+        print(f"   results written to {args.json}")
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""
+Benchmark: print sheet imposition for a large job
+Runs a token job (100 distinct cards by default) through /api/token/sheet against a
+local Scryfall stub and reports pages/minute, peak RSS and output size. For
+comparison the same job is also built the straightforward way: every token rendered
+at full frame size, downscaled, pasted into whole-page images kept in memory and
+saved with Pillow's multi-page PDF writer. Each variant runs in a fresh interpreter
+so the peak RSS (VmHWM from /proc) is its own. Linux only.
+
+Usage: python benchmarks/bench_sheet.py [token_count] [dpi]
+"""
+
+import io
+import os
+import subprocess
+import sys
+import time
+
+import common
+
+from scryfall_stub import ScryfallStub, stubbed_app
+
+
+def high_water_mb():
+    with open('/proc/self/status') as f:
+        return next(int(line.split()[1]) for line in f if line.startswith('VmHWM:')) / 1024
+
+
+def streamed(token_app, items, dpi):
+    """The sheet endpoint, consuming the streamed PDF without keeping it"""
+    response = token_app.app.test_client().post('/api/token/sheet', json={'tokens': items, 'dpi': dpi})
+    assert response.status_code == 200, response.get_data()
+    size = sum(len(chunk) for chunk in response.response)
+    return int(response.headers['X-Sheet-Pages']), size
+
+
+def in_memory(token_app, items, dpi):
+    """Full-size renders composed into whole pages held in memory, saved in one go"""
+    import imposition
+    from PIL import Image
+
+    layout = imposition.SheetLayout(dpi=dpi)
+    specs, _ = token_app.batch_specs(items)
+    specs = [spec for _, spec in sorted(specs.items())]
+    pages = []
+    for start in range(0, len(specs), layout.per_page):
+        page = Image.new('RGB', (layout.width, layout.height), (255, 255, 255))
+        for position, spec in enumerate(specs[start:start + layout.per_page]):
+            token = token_app.render_token_image(spec)
+            token = token.resize((layout.card_width, layout.card_height), Image.Resampling.LANCZOS)
+            page.paste(token, layout.card_box(position)[:2], token)
+        pages.append(page)
+    buffer = io.BytesIO()
+    pages[0].save(buffer, 'PDF', save_all=True, append_images=pages[1:], resolution=dpi)
+    return len(pages), len(buffer.getvalue())
+
+
+def run_variant(name, count, dpi):
+    items = [{'card_name': f'Bench Card {i}', 'power': '2', 'toughness': '2', 'subtype': 'Zombie'}
+             for i in range(count)]
+    with ScryfallStub() as stub:
+        common.populate_stub(stub, count)
+        with stubbed_app(stub) as token_app:
+            start = time.perf_counter()
+            pages, size = {'streamed': streamed, 'in-memory': in_memory}[name](token_app, items, dpi)
+            elapsed = time.perf_counter() - start
+    print(elapsed, pages, size, high_water_mb())
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 100
+    dpi = int(sys.argv[2]) if len(sys.argv) > 2 else 300
+    print(f"🖨️  {count} tokens on Letter sheets at {dpi} DPI")
+    for name in ('streamed', 'in-memory'):
+        result = subprocess.run([sys.executable, __file__, '--variant', name, str(count), str(dpi)],
+                                env=dict(os.environ, RENDER_POOL_WORKERS='0'),
+                                capture_output=True, text=True, check=True)
+        elapsed, pages, size, peak = result.stdout.split()[-4:]
+        elapsed, pages = float(elapsed), int(pages)
+        print(f"   {name:10s} {elapsed:7.1f} s  {pages} pages  {pages / elapsed * 60:6.1f} pages/min  "
+              f"peak RSS {float(peak):7.1f} MB  output {int(size) / 1024 / 1024:6.1f} MB")
+
+
+if __name__ == '__main__':
+    if len(sys.argv) > 1 and sys.argv[1] == '--variant':
+        run_variant(sys.argv[2], int(sys.argv[3]), int(sys.argv[4]))
+    else:
+        main()
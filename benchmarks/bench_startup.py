@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+Benchmark: gunicorn startup time and per-worker memory, with and without preload
+Starts gunicorn with gunicorn.conf.py, times how long until the first request is
+answered, then reads each process's RSS and PSS (proportional set size, which splits
+shared copy-on-write pages between the processes that share them) from /proc.
+Linux only; needs gunicorn installed.
+
+Usage: python benchmarks/bench_startup.py [workers]
+"""
+
+import os
+import signal
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.request
+
+import common
+
+STARTUP_TIMEOUT = 60
+
+
+def memory_kb(pid):
+    """(RSS, PSS) of a process in kB"""
+    values = {}
+    with open(f'/proc/{pid}/smaps_rollup') as f:
+        for line in f:
+            parts = line.split()
+            if parts[0] in ('Rss:', 'Pss:'):
+                values[parts[0]] = int(parts[1])
+    return values['Rss:'], values['Pss:']
+
+
+def measure(preload, workers):
+    port = common.free_port()
+    env = dict(os.environ, GUNICORN_PRELOAD='1' if preload else '0', RENDER_POOL_WORKERS='0',
+               GUNICORN_ACCESS_LOG='/dev/null')
+    with tempfile.TemporaryFile() as log:
+        start = time.perf_counter()
+        server = subprocess.Popen(
+            [sys.executable, '-m', 'gunicorn', '-c', 'gunicorn.conf.py',
+             '--bind', f'127.0.0.1:{port}', '--workers', str(workers)],
+            cwd=common.ROOT, env=env, stdout=log, stderr=subprocess.STDOUT)
+        try:
+            while True:
+                try:
+                    urllib.request.urlopen(f'http://127.0.0.1:{port}/api/upstream/stats', timeout=1).read()
+                    break
+                except OSError:
+                    if time.perf_counter() - start > STARTUP_TIMEOUT or server.poll() is not None:
+                        log.seek(0)
+                        raise RuntimeError('gunicorn did not start:\n' + log.read().decode(errors='replace'))
+                    time.sleep(0.05)
+            first_response = time.perf_counter() - start
+
+            # Give the remaining workers time to finish booting and warming up
+            time.sleep(2)
+            worker_pids = common.children(server.pid)
+            master = memory_kb(server.pid)
+            worker_memory = [memory_kb(pid) for pid in worker_pids]
+        finally:
+            server.send_signal(signal.SIGTERM)
+            server.wait(10)
+
+    return first_response, master, worker_memory
+
+
+def main():
+    workers = int(sys.argv[1]) if len(sys.argv) > 1 else 2
+    print(f"🚀 gunicorn startup with {workers} workers")
+    for preload in (True, False):
+        first_response, master, worker_memory = measure(preload, workers)
+        worker_rss = sum(rss for rss, _ in worker_memory) / len(worker_memory) / 1024
+        worker_pss = sum(pss for _, pss in worker_memory) / len(worker_memory) / 1024
+        total_pss = (master[1] + sum(pss for _, pss in worker_memory)) / 1024
+        print(f"   preload={'on ' if preload else 'off'}  first response {first_response:5.2f} s   "
+              f"per worker RSS {worker_rss:6.1f} MB  PSS {worker_pss:6.1f} MB   "
+              f"master RSS {master[0] / 1024:6.1f} MB   total PSS {total_pss:6.1f} MB")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""
+Benchmark: drawing rules text with inline mana symbols vs. plain text
+Draws lines of rules text that carry symbols ("{T}: Add {G}{G}.") through the symbol
+atlas, and the same lines with every symbol replaced by a short word, at the full-size
+rules font with warm glyph-run, width and atlas caches. Also reports the one-off cost of
+rasterizing an atlas, which startup pays per symbol size.
+
+Usage: python benchmarks/bench_symbols.py [repeats]
+"""
+
+import sys
+import time
+
+from PIL import ImageDraw
+
+import common  # noqa: F401  (puts the repo on sys.path)
+
+import app
+from mana_symbols import SymbolAtlas, SYMBOL_PATTERN
+
+LINES = [
+    '{T}: Add {G}{G}.',
+    '{2}{W}, {T}: Create a 1/1 white Soldier creature token.',
+    '{X}{R}{R}: This creature deals X damage to any target.',
+    'Pay {W/U} or {2/B}, {Q}: Draw a card. You get {E}{E}.',
+    '{1}{G/P}: Target creature gets +2/+2 until end of turn.',
+]
+
+
+def time_lines(draw_line, lines, repeats):
+    start = time.perf_counter()
+    for _ in range(repeats):
+        for line in lines:
+            draw_line(line)
+    return (time.perf_counter() - start) / (repeats * len(lines)) * 1000
+
+
+def main():
+    repeats = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    template = app.get_template('black')
+    oracle = template.text['oracle']
+    symbols = template.symbols
+    token = template.base.copy()
+    draw = ImageDraw.Draw(token)
+    plain = [SYMBOL_PATTERN.sub('mana', line) for line in LINES]
+    position = (oracle.x, oracle.y)
+
+    def draw_line(line):
+        symbols.draw_line(token, draw, position, line, oracle.fill, oracle.font)
+
+    # Warm the glyph-run, word width and symbol run caches
+    time_lines(draw_line, LINES + plain, 1)
+    symbols_ms = time_lines(draw_line, LINES, repeats)
+    plain_ms = time_lines(draw_line, plain, repeats)
+
+    diameter = symbols.diameter(oracle.font)
+    start = time.perf_counter()
+    SymbolAtlas(symbols, diameter)
+    atlas_ms = (time.perf_counter() - start) * 1000
+
+    print(f"🔣 {len(LINES)} rules lines at {oracle.font.size}pt, {repeats} repeats")
+    print(f"   with symbols:              {symbols_ms:7.3f} ms/line")
+    print(f"   symbols replaced by words: {plain_ms:7.3f} ms/line  ({symbols_ms / plain_ms:.2f}x)")
+    print(f"   one atlas ({len(symbols.styles)} symbols at {diameter}px): {atlas_ms:.0f} ms, paid once per size")
+
+
+if __name__ == '__main__':
+    main()
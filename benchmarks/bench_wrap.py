@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+Benchmark: rules-text wrapping, legacy quadratic wrapper vs. text_layout
+Runs over a set of long oracle texts at the frame's 80pt MPlantin size, cold (empty
+width cache) and warm, and checks short texts still wrap identically.
+
+Usage: python benchmarks/bench_wrap.py [repeats]
+"""
+
+import sys
+import time
+
+import common  # noqa: F401  (puts the repo on sys.path)
+
+import app
+import text_layout
+
+LONG_TEXTS = {
+    'Emrakul, the Aeons Torn': (
+        "This spell can't be countered.\n"
+        "When you cast this spell, take an extra turn after this one.\n"
+        "Flying, protection from spells that are one or more colors, annihilator 6\n"
+        "When Emrakul, the Aeons Torn is put into a graveyard from anywhere, its owner "
+        "shuffles their graveyard into their library."
+    ),
+    'Teferi\'s Protection': (
+        "Until your next turn, your life total can't change and you gain protection from "
+        "everything. All permanents you control phase out. (While they're phased out, "
+        "they're treated as though they don't exist. They phase in before you untap during "
+        "your untap step.)\nExile Teferi's Protection."
+    ),
+    'Urza, Lord High Artificer': (
+        "When Urza, Lord High Artificer enters the battlefield, create a 0/0 colorless "
+        "Construct artifact creature token with \"This creature gets +1/+1 for each artifact "
+        "you control.\"\nTap an untapped artifact you control: Add {U}.\n{5}: Shuffle your "
+        "library, then exile the top card. Until end of turn, you may play that card without "
+        "paying its mana cost."
+    ),
+    'Mindslaver': (
+        "{4}, {T}, Sacrifice Mindslaver: You control target player during that player's next "
+        "turn. (You see all cards that player could see and make all decisions for the "
+        "player.)"
+    ),
+    'Thassa\'s Oracle': (
+        "When Thassa's Oracle enters the battlefield, look at the top X cards of your library, "
+        "where X is your devotion to blue. Put up to one of them on top of your library and "
+        "the rest on the bottom of your library in a random order. If X is greater than or "
+        "equal to the number of cards in your library, you win the game. (Each {U} in the mana "
+        "costs of permanents you control counts toward your devotion to blue.)"
+    ),
+}
+
+SHORT_TEXTS = ['Flying', 'Vigilance, trample', 'Sacrifice this artifact: Add one mana of any color.']
+
+
+def legacy_wrap(text, font, max_width):
+    """The original wrapper: re-measures the whole growing line for every word"""
+    if not text:
+        return []
+    words = text.split()
+    lines = []
+    current_line = []
+    for word in words:
+        test_line = ' '.join(current_line + [word])
+        bbox = font.getbbox(test_line)
+        if bbox[2] - bbox[0] <= max_width:
+            current_line.append(word)
+        elif current_line:
+            lines.append(' '.join(current_line))
+            current_line = [word]
+        else:
+            lines.append(word)
+    if current_line:
+        lines.append(' '.join(current_line))
+    return lines
+
+
+def time_per_call(func, repeats):
+    start = time.perf_counter()
+    for _ in range(repeats):
+        for text in LONG_TEXTS.values():
+            func(text)
+    return (time.perf_counter() - start) / (repeats * len(LONG_TEXTS)) * 1000
+
+
+def main():
+    repeats = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+    oracle = app.get_template().text['oracle']
+    font, width = oracle.font, oracle.width
+
+    for text in SHORT_TEXTS:
+        assert legacy_wrap(text, font, width) == text_layout.wrap_lines(text, font, width), text
+
+    legacy_ms = time_per_call(lambda text: legacy_wrap(text, font, width), repeats)
+
+    text_layout._widths.clear()
+    cold_ms = time_per_call(lambda text: text_layout.wrap_lines(text, font, width), 1)
+    warm_ms = time_per_call(lambda text: text_layout.wrap_lines(text, font, width), repeats)
+
+    fit_ms = time_per_call(lambda text: text_layout.fit_text(
+        text, lambda size: app.get_template().font_at(oracle, size),
+        font.size, oracle.min_size, width, oracle.height), repeats)
+
+    print(f"🃏 wrapping {len(LONG_TEXTS)} long oracle texts at {font.size}pt, {width}px wide")
+    print(f"   legacy wrap_text:        {legacy_ms:7.3f} ms/text")
+    print(f"   wrap_lines (cold cache): {cold_ms:7.3f} ms/text")
+    print(f"   wrap_lines (warm cache): {warm_ms:7.3f} ms/text  ({legacy_ms / warm_ms:.0f}x faster)")
+    print(f"   fit_text with shrinking: {fit_ms:7.3f} ms/text")
+    print(f"   short texts wrap identically: {len(SHORT_TEXTS)}/{len(SHORT_TEXTS)}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,78 @@
+"""
+Shared helpers for the benchmark scripts
+Builds synthetic cards/art for a local Scryfall stub (scryfall_stub.stubbed_app points
+the app at it with cold caches), plus timing and process helpers.
+"""
+
+import contextlib
+import io
+import os
+import socket
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+from PIL import Image, ImageDraw  # noqa: E402
+
+
+def make_art_jpeg(seed=0, size=(626, 457)):
+    """Synthetic art_crop-sized JPEG with some detail so encoders have work to do"""
+    art = Image.effect_noise(size, 40 + seed % 20).convert('RGB')
+    draw = ImageDraw.Draw(art)
+    for i in range(12):
+        x = (seed * 37 + i * 53) % size[0]
+        y = (seed * 11 + i * 29) % size[1]
+        draw.ellipse((x, y, x + 120, y + 90), fill=((seed * 40 + i * 20) % 256, 90, 160))
+    buffer = io.BytesIO()
+    art.save(buffer, 'JPEG', quality=90)
+    return buffer.getvalue()
+
+
+def make_card(stub_url, index):
+    return {
+        'object': 'card',
+        'id': f'bench-card-{index}',
+        'name': f'Bench Card {index}',
+        'mana_cost': '{2}{B}',
+        'type_line': 'Creature — Zombie',
+        'oracle_text': 'When this creature enters, create a 2/2 black Zombie creature token.',
+        'artist': 'Bench Artist',
+        'image_uris': {'art_crop': f"{stub_url}/art/{index}.jpg"},
+    }
+
+
+def populate_stub(stub, count):
+    """Add count distinct cards (each with its own art) to a ScryfallStub"""
+    for index in range(count):
+        stub.cards.append(make_card(stub.url, index))
+        stub.images[f'/art/{index}.jpg'] = ('image/jpeg', make_art_jpeg(index))
+
+
+@contextlib.contextmanager
+def timed(results, name):
+    start = time.perf_counter()
+    yield
+    results[name] = time.perf_counter() - start
+
+
+def percentile(sorted_values, fraction):
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return None
+    rank = max(1, round(fraction * len(sorted_values)))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def children(pid):
+    """Direct child process ids (Linux /proc)"""
+    with open(f'/proc/{pid}/task/{pid}/children') as f:
+        return [int(child) for child in f.read().split()]
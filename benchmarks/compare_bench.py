@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+"""
+Compare two benchmark result files
+Reads the --json output of bench_render.py (or loadtest.py) from two runs, usually
+the base and head of a change, and prints every benchmark's change in the chosen
+metric. A benchmark regressed when it is both more than --threshold percent and more
+than --min-ms slower; with --fail the exit status is 1 if anything regressed.
+
+Usage: python benchmarks/compare_bench.py base.json head.json [--metric median_ms] [--threshold 10] [--fail]
+"""
+
+import argparse
+import json
+import sys
+
+
+def load_results(path):
+    with open(path) as f:
+        data = json.load(f)
+    # bench_render.py writes 'results', loadtest.py 'endpoints'
+    return data.get('results') or data.get('endpoints') or {}, data.get('environment', {})
+
+
+def compare(base, head, metric, threshold, min_ms):
+    """[(name, base value, head value, percent change, regressed)] for benchmarks in both runs"""
+    rows = []
+    for name in base:
+        if name not in head or metric not in base[name] or metric not in head[name]:
+            continue
+        before, after = base[name][metric], head[name][metric]
+        change = (after - before) / before * 100 if before else 0.0
+        regressed = change > threshold and after - before > min_ms
+        rows.append((name, before, after, change, regressed))
+    return rows
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('base')
+    parser.add_argument('head')
+    parser.add_argument('--metric', default='median_ms', help='e.g. median_ms, p95_ms, min_ms (p95_ms for loadtest)')
+    parser.add_argument('--threshold', type=float, default=10, help='percent slowdown that counts as a regression')
+    parser.add_argument('--min-ms', type=float, default=0.5, help='ignore slowdowns smaller than this')
+    parser.add_argument('--fail', action='store_true', help='exit with status 1 on any regression')
+    args = parser.parse_args(argv)
+
+    base, base_env = load_results(args.base)
+    head, head_env = load_results(args.head)
+    rows = compare(base, head, args.metric, args.threshold, args.min_ms)
+
+    print(f"📊 {args.metric}: {base_env.get('commit') or args.base} -> {head_env.get('commit') or args.head}")
+    if base_env.get('pillow') != head_env.get('pillow') or base_env.get('machine') != head_env.get('machine'):
+        print('   ⚠️  the runs used different Pillow versions or machines')
+    print(f"   {'benchmark':<22} {'base':>10} {'head':>10} {'change':>8}")
+    for name, before, after, change, regressed in rows:
+        marker = '  ❌ slower' if regressed else ('  ✅ faster' if change < -args.threshold else '')
+        print(f"   {name:<22} {before:>10.2f} {after:>10.2f} {change:>+7.1f}%{marker}")
+    missing = sorted(set(base) ^ set(head))
+    if missing:
+        print(f"   only in one run: {', '.join(missing)}")
+
+    regressions = [row[0] for row in rows if row[4]]
+    if regressions:
+        print(f"   {len(regressions)} regression(s): {', '.join(regressions)}")
+        if args.fail:
+            return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
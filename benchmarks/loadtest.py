@@ -0,0 +1,304 @@
+#!/usr/bin/env python3
+"""
+Load test: throughput and tail latency of the app under concurrent clients
+Starts the Scryfall stub (serving the recorded fixtures with simulated latency and
+errors) and the app under gunicorn (or Werkzeug's threaded server), then drives
+/api/search, /api/card/<id> and /api/token/generate from several client threads for
+a fixed time. Reports requests/second and p50/p95/p99 latency per endpoint, plus the
+server's CPU use and RSS sampled from /proc. Runs fully offline; Linux only.
+
+--json writes the results for comparison across commits, and --max-p95-ms /
+--max-error-rate turn the run into a pass/fail gate (exit status 1 on failure).
+
+Usage: python benchmarks/loadtest.py [--clients 8] [--duration 30] [--mix search=4,card=4,generate=1]
+"""
+
+import argparse
+import json
+import os
+import random
+import signal
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+import requests
+
+import common
+
+from scryfall_stub import FIXTURES_DIR
+
+STARTUP_TIMEOUT = 60
+ENDPOINTS = ('search', 'card', 'generate')
+
+
+def parse_mix(text):
+    weights = {}
+    for part in text.split(','):
+        name, _, weight = part.partition('=')
+        if name not in ENDPOINTS:
+            raise argparse.ArgumentTypeError(f'unknown endpoint {name!r} (choose from {", ".join(ENDPOINTS)})')
+        weights[name] = float(weight or 1)
+    return weights
+
+
+def process_tree(pid):
+    pids = [pid]
+    for child in common.children(pid):
+        pids.extend(process_tree(child))
+    return pids
+
+
+def cpu_seconds(pid):
+    """User + system CPU time of a process"""
+    with open(f'/proc/{pid}/stat') as f:
+        fields = f.read().rsplit(')', 1)[1].split()
+    return (int(fields[11]) + int(fields[12])) / os.sysconf('SC_CLK_TCK')
+
+
+def rss_mb(pid):
+    with open(f'/proc/{pid}/status') as f:
+        return next(int(line.split()[1]) for line in f if line.startswith('VmRSS:')) / 1024
+
+
+class ResourceSampler:
+    """Samples CPU time and RSS of a process and its children on a background thread"""
+
+    def __init__(self, pid, interval=0.5):
+        self.pid = pid
+        self.interval = interval
+        self.cpu = {}
+        self.peak_rss = {}
+        self.peak_total_rss = 0.0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def start(self):
+        self._baseline = self._sample()
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+        self._sample()
+
+    def cpu_used(self):
+        """CPU seconds used by each process since start()"""
+        return {pid: seconds - self._baseline.get(pid, 0.0) for pid, seconds in self.cpu.items()}
+
+    def _sample(self):
+        total = 0.0
+        snapshot = {}
+        for pid in process_tree(self.pid):
+            try:
+                snapshot[pid] = cpu_seconds(pid)
+                rss = rss_mb(pid)
+            except (OSError, StopIteration):
+                continue  # exited between listing and reading
+            total += rss
+            self.peak_rss[pid] = max(self.peak_rss.get(pid, 0.0), rss)
+        self.cpu.update(snapshot)
+        self.peak_total_rss = max(self.peak_total_rss, total)
+        return snapshot
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self._sample()
+
+
+def start_server(args, port, stub_url, cache_dir, log):
+    env = dict(os.environ, SCRYFALL_BASE_URL=stub_url,
+               ART_CACHE_DIR=os.path.join(cache_dir, 'art'),
+               RENDER_CACHE_DIR=os.path.join(cache_dir, 'renders'),
+               GUNICORN_ACCESS_LOG='/dev/null', WEB_CONCURRENCY=str(args.workers),
+               GUNICORN_THREADS=str(args.threads))
+    if args.server == 'gunicorn':
+        command = [sys.executable, '-m', 'gunicorn', '-c', 'gunicorn.conf.py', '--bind', f'127.0.0.1:{port}']
+    else:
+        command = [sys.executable, '-c',
+                   'import sys; from werkzeug.serving import run_simple; from wsgi import application; '
+                   'run_simple("127.0.0.1", int(sys.argv[1]), application, threaded=True)', str(port)]
+    return subprocess.Popen(command, cwd=common.ROOT, env=env, stdout=log, stderr=subprocess.STDOUT)
+
+
+def wait_for_stub(url, process):
+    start = time.perf_counter()
+    while True:
+        try:
+            requests.get(f'{url}/cards/search', params={'q': 'name:"-"'}, timeout=1)
+            return
+        except requests.RequestException:
+            if process.poll() is not None or time.perf_counter() - start > STARTUP_TIMEOUT:
+                raise RuntimeError('Scryfall stub did not start')
+            time.sleep(0.05)
+
+
+def wait_until_ready(url, process, log):
+    start = time.perf_counter()
+    while True:
+        try:
+            requests.get(f'{url}/api/upstream/stats', timeout=1)
+            return time.perf_counter() - start
+        except requests.RequestException:
+            if process.poll() is not None or time.perf_counter() - start > STARTUP_TIMEOUT:
+                log.seek(0)
+                raise RuntimeError('server did not start:\n' + log.read().decode(errors='replace'))
+            time.sleep(0.1)
+
+
+def make_request(session, base_url, endpoint, cards, rng, args):
+    card = rng.choice(cards)
+    if endpoint == 'search':
+        # A word from a card name, so results vary in size
+        word = rng.choice(card['name'].replace(',', '').split())
+        return session.get(f'{base_url}/api/search', params={'q': word}, timeout=args.timeout)
+    if endpoint == 'card':
+        return session.get(f'{base_url}/api/card/{card["id"]}', timeout=args.timeout)
+    name = card['card_faces'][0]['name'] if 'card_faces' in card else card['name']
+    payload = {'card_name': name, 'power': str(rng.randint(1, 5)), 'toughness': str(rng.randint(1, 5)),
+               'subtype': 'Token', 'preset': args.preset, 'preview': args.preview}
+    return session.post(f'{base_url}/api/token/generate', json=payload, timeout=args.timeout)
+
+
+def run_clients(base_url, cards, args):
+    """Drive the server from args.clients threads for args.duration seconds"""
+    names = list(args.mix)
+    weights = [args.mix[name] for name in names]
+    results = []
+    lock = threading.Lock()
+    deadline = time.perf_counter() + args.duration
+
+    def client(index):
+        rng = random.Random(args.seed + index)
+        session = requests.Session()
+        samples = []
+        while time.perf_counter() < deadline:
+            endpoint = rng.choices(names, weights)[0]
+            start = time.perf_counter()
+            try:
+                status = make_request(session, base_url, endpoint, cards, rng, args).status_code
+            except requests.RequestException:
+                status = None
+            samples.append((endpoint, status, time.perf_counter() - start))
+        with lock:
+            results.extend(samples)
+
+    threads = [threading.Thread(target=client, args=(index,)) for index in range(args.clients)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return results, time.perf_counter() - start
+
+
+def summarize(results, elapsed):
+    report = {}
+    for endpoint in list(ENDPOINTS) + ['all']:
+        samples = [sample for sample in results if endpoint == 'all' or sample[0] == endpoint]
+        if not samples:
+            continue
+        latencies = sorted(latency for _, _, latency in samples)
+        errors = sum(1 for _, status, _ in samples if status is None or status >= 500)
+        report[endpoint] = {
+            'requests': len(samples),
+            'errors': errors,
+            'error_rate': errors / len(samples),
+            'rps': len(samples) / elapsed,
+            'p50_ms': common.percentile(latencies, 0.50) * 1000,
+            'p95_ms': common.percentile(latencies, 0.95) * 1000,
+            'p99_ms': common.percentile(latencies, 0.99) * 1000,
+            'max_ms': latencies[-1] * 1000,
+        }
+    return report
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--clients', type=int, default=8)
+    parser.add_argument('--duration', type=float, default=30, help='seconds of load')
+    parser.add_argument('--mix', type=parse_mix, default=parse_mix('search=4,card=4,generate=1'),
+                        help='endpoint weights, e.g. search=4,card=4,generate=1')
+    parser.add_argument('--server', choices=('gunicorn', 'werkzeug'), default='gunicorn')
+    parser.add_argument('--workers', type=int, default=2, help='gunicorn worker processes')
+    parser.add_argument('--threads', type=int, default=4, help='gunicorn threads per worker')
+    parser.add_argument('--latency', type=float, default=0.05, help='stub latency in seconds')
+    parser.add_argument('--jitter', type=float, default=0.02, help='extra random stub latency, up to this')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='fraction of stub responses that are 503')
+    parser.add_argument('--preset', default='screen', help='size preset for generated tokens')
+    parser.add_argument('--preview', action='store_true', help='generate low-resolution previews')
+    parser.add_argument('--timeout', type=float, default=60)
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--json', help='write the results to this file')
+    parser.add_argument('--max-p95-ms', type=float, help='fail if the overall p95 latency is higher')
+    parser.add_argument('--max-error-rate', type=float, help='fail if the overall error rate is higher')
+    args = parser.parse_args(argv)
+
+    with open(os.path.join(FIXTURES_DIR, 'cards.json'), encoding='utf-8') as f:
+        cards = json.load(f)
+
+    stub_port, port = common.free_port(), common.free_port()
+    stub = subprocess.Popen([sys.executable, 'scryfall_stub.py', '--port', str(stub_port),
+                             '--latency', str(args.latency), '--jitter', str(args.jitter),
+                             '--error-rate', str(args.error_rate)],
+                            cwd=common.ROOT, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    wait_for_stub(f'http://127.0.0.1:{stub_port}', stub)
+    with tempfile.TemporaryDirectory() as cache_dir, tempfile.TemporaryFile() as log:
+        server = start_server(args, port, f'http://127.0.0.1:{stub_port}', cache_dir, log)
+        try:
+            base_url = f'http://127.0.0.1:{port}'
+            startup = wait_until_ready(base_url, server, log)
+            sampler = ResourceSampler(server.pid).start()
+            results, elapsed = run_clients(base_url, cards, args)
+            sampler.stop()
+        finally:
+            server.send_signal(signal.SIGTERM)
+            stub.terminate()
+            server.wait(10)
+            stub.wait(10)
+
+    report = summarize(results, elapsed)
+    cpu = sampler.cpu_used()
+    resources = {
+        'cpu_seconds': sum(cpu.values()),
+        'cpu_percent': sum(cpu.values()) / elapsed * 100,
+        'peak_rss_mb': {str(pid): round(rss, 1) for pid, rss in sampler.peak_rss.items()},
+        'peak_total_rss_mb': sampler.peak_total_rss,
+    }
+
+    shape = f"{args.workers} workers x {args.threads} threads" if args.server == 'gunicorn' else 'threaded'
+    print(f"🔥 {args.clients} clients for {elapsed:.1f} s against {args.server} "
+          f"({shape}, started in {startup:.1f} s), "
+          f"stub latency {args.latency * 1000:.0f}±{args.jitter * 1000:.0f} ms, error rate {args.error_rate:.1%}")
+    print(f"   {'endpoint':10s} {'requests':>8s} {'errors':>6s} {'req/s':>7s} "
+          f"{'p50 ms':>8s} {'p95 ms':>8s} {'p99 ms':>8s} {'max ms':>8s}")
+    for endpoint, stats in report.items():
+        print(f"   {endpoint:10s} {stats['requests']:8d} {stats['errors']:6d} {stats['rps']:7.1f} "
+              f"{stats['p50_ms']:8.1f} {stats['p95_ms']:8.1f} {stats['p99_ms']:8.1f} {stats['max_ms']:8.1f}")
+    print(f"   server CPU {resources['cpu_seconds']:.1f} s ({resources['cpu_percent']:.0f}% of one core), "
+          f"peak RSS {resources['peak_total_rss_mb']:.1f} MB total across {len(sampler.peak_rss)} processes")
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump({'config': {key: value for key, value in vars(args).items() if key != 'json'},
+                       'elapsed': elapsed, 'endpoints': report, 'resources': resources}, f, indent=2)
+
+    failures = []
+    overall = report.get('all')
+    if overall is None:
+        failures.append('no requests completed')
+    else:
+        if args.max_p95_ms is not None and overall['p95_ms'] > args.max_p95_ms:
+            failures.append(f"p95 {overall['p95_ms']:.1f} ms > {args.max_p95_ms:.1f} ms")
+        if args.max_error_rate is not None and overall['error_rate'] > args.max_error_rate:
+            failures.append(f"error rate {overall['error_rate']:.2%} > {args.max_error_rate:.2%}")
+    for failure in failures:
+        print(f"❌ {failure}")
+    return 1 if failures else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,260 @@
+#!/usr/bin/env python3
+"""
+Offline card store built from Scryfall bulk data
+Streams a bulk "oracle cards" / "default cards" JSON file (optionally gzipped) one card
+at a time into a SQLite database indexed by id and normalized name, so the app can
+answer lookups locally instead of calling the Scryfall API. Refreshing builds a new
+database next to the old one and swaps it in atomically; open stores notice the swap
+and reconnect.
+
+Usage: python bulk_store.py refresh oracle-cards.json [cards.db]
+"""
+
+import gzip
+import json
+import os
+import re
+import sqlite3
+import sys
+import tempfile
+import threading
+import unicodedata
+
+DEFAULT_DB_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), '.cache', 'cards.db')
+
+SCHEMA = """
+CREATE TABLE cards (
+    id TEXT PRIMARY KEY,
+    name TEXT NOT NULL,
+    norm_name TEXT NOT NULL,
+    type_line TEXT,
+    released_at TEXT,
+    data TEXT NOT NULL
+);
+CREATE TABLE names (
+    norm_name TEXT NOT NULL,
+    card_id TEXT NOT NULL
+);
+"""
+
+INDEXES = """
+CREATE INDEX cards_norm_name ON cards (norm_name);
+CREATE INDEX names_norm_name ON names (norm_name);
+"""
+
+_WHITESPACE = re.compile(r'\s+')
+
+
+def normalize_name(name):
+    """Case-, accent- and whitespace-insensitive form of a card name"""
+    decomposed = unicodedata.normalize('NFKD', name)
+    stripped = ''.join(c for c in decomposed if not unicodedata.combining(c))
+    return _WHITESPACE.sub(' ', stripped).strip().casefold()
+
+
+def iter_json_array(f, chunk_size=1024 * 1024):
+    """Yield the elements of a top-level JSON array from a text file without loading it all"""
+    decoder = json.JSONDecoder()
+    buffer = ''
+    pos = 0
+    at_eof = False
+
+    def fill():
+        nonlocal buffer, pos, at_eof
+        chunk = f.read(chunk_size)
+        at_eof = not chunk
+        buffer = buffer[pos:] + chunk
+        pos = 0
+        return not at_eof
+
+    def skip(chars):
+        nonlocal pos
+        while True:
+            while pos < len(buffer) and buffer[pos] in chars:
+                pos += 1
+            if pos < len(buffer) or not fill():
+                return
+
+    skip(' \t\r\n')
+    if pos >= len(buffer) or buffer[pos] != '[':
+        raise ValueError('Bulk data file must contain a JSON array')
+    pos += 1
+
+    while True:
+        skip(' \t\r\n,')
+        if pos >= len(buffer):
+            raise ValueError('Unterminated JSON array')
+        if buffer[pos] == ']':
+            return
+        try:
+            item, end = decoder.raw_decode(buffer, pos)
+        except json.JSONDecodeError:
+            # Most likely the element continues in the next chunk
+            if not fill():
+                raise
+            continue
+        pos = end
+        yield item
+
+
+def open_bulk_file(path):
+    if path.endswith('.gz'):
+        return gzip.open(path, 'rt', encoding='utf-8')
+    return open(path, 'r', encoding='utf-8')
+
+
+def build_store(json_path, db_path=DEFAULT_DB_PATH, batch_size=1000):
+    """Stream a bulk data file into a fresh database and atomically replace db_path.
+
+    Returns the number of cards stored.
+    """
+    directory = os.path.dirname(os.path.abspath(db_path))
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix='.tmp-cards-', suffix='.db')
+    os.close(fd)
+
+    count = 0
+    try:
+        connection = sqlite3.connect(tmp_path)
+        connection.executescript(SCHEMA)
+        cards, names = [], []
+        with open_bulk_file(json_path) as f:
+            for card in iter_json_array(f):
+                if card.get('object') != 'card' or 'id' not in card:
+                    continue
+                norm_name = normalize_name(card['name'])
+                cards.append((card['id'], card['name'], norm_name, card.get('type_line'), card.get('released_at'),
+                              json.dumps(card, separators=(',', ':'), ensure_ascii=False)))
+                # Also index each face of split/double-faced cards ("Fire // Ice" -> "fire", "ice")
+                face_names = {norm_name} | {normalize_name(face['name']) for face in card.get('card_faces', [])
+                                            if face.get('name')}
+                names.extend((face_name, card['id']) for face_name in face_names)
+                count += 1
+                if len(cards) >= batch_size:
+                    _insert(connection, cards, names)
+                    cards, names = [], []
+        _insert(connection, cards, names)
+        connection.executescript(INDEXES)
+        connection.commit()
+        connection.close()
+        os.replace(tmp_path, db_path)
+    except BaseException:
+        try:
+            os.unlink(tmp_path)
+        except OSError:
+            pass
+        raise
+
+    return count
+
+
+def _insert(connection, cards, names):
+    connection.executemany('INSERT OR REPLACE INTO cards VALUES (?, ?, ?, ?, ?, ?)', cards)
+    connection.executemany('INSERT INTO names VALUES (?, ?)', names)
+
+
+class BulkCardStore:
+    """Read-only lookups against a database written by build_store"""
+
+    def __init__(self, db_path=DEFAULT_DB_PATH):
+        self.db_path = db_path
+        self._local = threading.local()
+
+    def get(self, card_id):
+        """Card by Scryfall id, or None"""
+        row = self._query('SELECT data FROM cards WHERE id = ?', (card_id,)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def find_by_name(self, name):
+        """Newest printing of the card with exactly this (normalized) name, or None"""
+        row = self._query(
+            'SELECT cards.data FROM names JOIN cards ON cards.id = names.card_id '
+            'WHERE names.norm_name = ? ORDER BY cards.released_at DESC LIMIT 1',
+            (normalize_name(name),)
+        ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def search(self, query, limit=175):
+        """Scryfall-style search result for a query.
+
+        Supports the subset the app uses: name:"..." for an exact name, anything else is
+        a case-insensitive name substring match. Returns None when nothing matches,
+        like a Scryfall 404.
+        """
+        match = re.fullmatch(r'name:"(.*)"', query.strip())
+        if match:
+            card = self.find_by_name(match.group(1))
+            cards = [card] if card else []
+        else:
+            pattern = '%' + normalize_name(query).replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_') + '%'
+            rows = self._query(
+                "SELECT data FROM cards WHERE norm_name LIKE ? ESCAPE '\\' "
+                'ORDER BY norm_name, released_at DESC LIMIT ?',
+                (pattern, limit)
+            ).fetchall()
+            cards = [json.loads(row[0]) for row in rows]
+
+        if not cards:
+            return None
+        return {'object': 'list', 'total_cards': len(cards), 'has_more': False, 'data': cards}
+
+    def lookup_collection(self, identifiers):
+        """Resolve /cards/collection style identifiers, returning (cards, not_found)"""
+        cards, not_found = [], []
+        for identifier in identifiers:
+            if 'id' in identifier:
+                card = self.get(identifier['id'])
+            else:
+                card = self.find_by_name(identifier.get('name', ''))
+            if card is None:
+                not_found.append(identifier)
+            else:
+                cards.append(card)
+        return cards, not_found
+
+    def iter_names(self):
+        """Yield (id, name, type_line) for the newest printing of every distinct name"""
+        previous = None
+        rows = self._query('SELECT id, name, type_line, norm_name FROM cards ORDER BY norm_name, released_at DESC')
+        for card_id, name, type_line, norm_name in rows:
+            if norm_name != previous:
+                previous = norm_name
+                yield card_id, name, type_line
+
+    def version(self):
+        """Changes whenever a refresh swaps in a new snapshot"""
+        stat = os.stat(self.db_path)
+        return stat.st_ino, stat.st_mtime_ns
+
+    def count(self):
+        return self._query('SELECT COUNT(*) FROM cards').fetchone()[0]
+
+    def _query(self, sql, params=()):
+        return self._connection().execute(sql, params)
+
+    def _connection(self):
+        """Per-thread connection, reopened when a refresh has replaced the database file"""
+        inode = os.stat(self.db_path).st_ino
+        connection = getattr(self._local, 'connection', None)
+        if connection is None or self._local.inode != inode:
+            if connection is not None:
+                connection.close()
+            connection = sqlite3.connect(f'file:{self.db_path}?mode=ro', uri=True, check_same_thread=False)
+            self._local.connection = connection
+            self._local.inode = inode
+        return connection
+
+
+def main(argv):
+    if len(argv) < 2 or argv[0] != 'refresh':
+        print(__doc__.strip().splitlines()[-1])
+        return 1
+    db_path = argv[2] if len(argv) > 2 else DEFAULT_DB_PATH
+    print(f"📦 Loading {argv[1]} into {db_path}...")
+    count = build_store(argv[1], db_path)
+    print(f"✅ Stored {count} cards")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv[1:]))
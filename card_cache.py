@@ -0,0 +1,130 @@
+"""
+Card metadata cache for Scryfall lookups
+Keeps recently used search results and cards in memory with a TTL and LRU eviction,
+remembers "not found" answers for a shorter time, and coalesces concurrent misses
+for the same key into a single upstream fetch.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+
+
+class _Flight:
+    """An in-progress fetch that other callers can wait on"""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.value = None
+        self.error = None
+
+
+class CardCache:
+    """Thread-safe TTL + LRU cache with negative caching and single-flight fetches"""
+
+    def __init__(self, max_entries=2048, ttl=6 * 3600, negative_ttl=300, clock=time.monotonic):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self._clock = clock
+        self._entries = OrderedDict()  # key -> (expires_at, value)
+        self._flights = {}
+        self._lock = threading.Lock()
+        self._counters = {
+            'hits': 0,
+            'negative_hits': 0,
+            'misses': 0,
+            'coalesced': 0,
+            'evictions': 0,
+            'expirations': 0,
+        }
+
+    def get_or_fetch(self, key, fetch):
+        """Return the cached value for key, calling fetch() on a miss.
+
+        A fetch result of None is cached as a negative entry ("not found").
+        Exceptions raised by fetch are passed to every waiting caller and are not cached.
+        """
+        with self._lock:
+            found, value = self._lookup(key)
+            if found:
+                return value
+
+            flight = self._flights.get(key)
+            if flight is not None:
+                self._counters['coalesced'] += 1
+                leader = False
+            else:
+                self._counters['misses'] += 1
+                flight = self._flights[key] = _Flight()
+                leader = True
+
+        if not leader:
+            flight.done.wait()
+            if flight.error is not None:
+                raise flight.error
+            return flight.value
+
+        try:
+            flight.value = fetch()
+        except Exception as e:
+            flight.error = e
+            raise
+        else:
+            self.put(key, flight.value)
+        finally:
+            with self._lock:
+                self._flights.pop(key, None)
+            flight.done.set()
+
+        return flight.value
+
+    def get(self, key, default=None):
+        """Return the cached value for key without fetching"""
+        with self._lock:
+            found, value = self._lookup(key)
+            return value if found else default
+
+    def put(self, key, value):
+        """Store a value (None for a negative entry) and evict the oldest entries if full"""
+        ttl = self.negative_ttl if value is None else self.ttl
+        with self._lock:
+            self._entries[key] = (self._clock() + ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self._counters['evictions'] += 1
+
+    def clear(self):
+        """Drop every cached entry (counters are kept)"""
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        """Return a snapshot of the cache counters"""
+        with self._lock:
+            stats = dict(self._counters)
+            stats['size'] = len(self._entries)
+            stats['max_entries'] = self.max_entries
+        lookups = stats['hits'] + stats['negative_hits'] + stats['misses'] + stats['coalesced']
+        stats['hit_rate'] = (stats['hits'] + stats['negative_hits']) / lookups if lookups else 0.0
+        return stats
+
+    def _lookup(self, key):
+        """Return (found, value) for key; caller must hold the lock"""
+        entry = self._entries.get(key)
+        if entry is None:
+            return False, None
+
+        expires_at, value = entry
+        if expires_at <= self._clock():
+            del self._entries[key]
+            self._counters['expirations'] += 1
+            return False, None
+
+        self._entries.move_to_end(key)
+        if value is None:
+            self._counters['negative_hits'] += 1
+        else:
+            self._counters['hits'] += 1
+        return True, value
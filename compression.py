@@ -0,0 +1,102 @@
+"""
+Response compression and streaming JSON
+JSON and text responses are compressed with brotli (when the optional brotli package
+is installed) or gzip, whichever the client prefers in Accept-Encoding. Small bodies
+are sent as-is, images are never recompressed, and streamed responses are compressed
+chunk by chunk as they are generated.
+"""
+
+import gzip
+import json
+import zlib
+
+from flask import request
+
+try:
+    import brotli
+except ImportError:  # optional: gzip only
+    brotli = None
+
+COMPRESSIBLE_TYPES = ('application/json', 'text/', 'application/javascript')
+
+
+def supported_encodings():
+    return ('br', 'gzip') if brotli is not None else ('gzip',)
+
+
+def choose_encoding(accept_encodings):
+    """Best encoding we support from a werkzeug Accept-Encoding header, or None"""
+    return accept_encodings.best_match(supported_encodings())
+
+
+def compress(data, encoding, level):
+    if encoding == 'br':
+        return brotli.compress(data, quality=min(level, 11))
+    return gzip.compress(data, compresslevel=level, mtime=0)
+
+
+def compress_stream(chunks, encoding, level):
+    """Compress an iterable of byte chunks incrementally"""
+    if encoding == 'br':
+        compressor = brotli.Compressor(quality=min(level, 11))
+        for chunk in chunks:
+            data = compressor.process(chunk)
+            if data:
+                yield data
+        yield compressor.finish()
+        return
+
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)  # gzip container
+    for chunk in chunks:
+        data = compressor.compress(chunk)
+        if data:
+            yield data
+    yield compressor.flush()
+
+
+def stream_json_list(key, items, extra=None, batch_size=50):
+    """Encode {key: [items...], **extra} lazily, a batch of items per chunk"""
+    encoder = json.JSONEncoder(ensure_ascii=False, separators=(',', ':'))
+    head = encoder.encode(extra or {})[:-1]
+    yield (head + (',' if extra else '') + json.dumps(key) + ':[').encode('utf-8')
+
+    batch = []
+    first = True
+    for item in items:
+        batch.append(encoder.encode(item))
+        if len(batch) >= batch_size:
+            yield ((',' if not first else '') + ','.join(batch)).encode('utf-8')
+            first = False
+            batch = []
+    if batch:
+        yield ((',' if not first else '') + ','.join(batch)).encode('utf-8')
+    yield b']}'
+
+
+def init_compression(app, min_size=500, level=6):
+    """Compress eligible responses of a Flask app according to the request's Accept-Encoding"""
+
+    @app.after_request
+    def compress_response(response):
+        if (response.status_code < 200 or response.status_code in (204, 304)
+                or 'Content-Encoding' in response.headers
+                or not response.mimetype.startswith(COMPRESSIBLE_TYPES)):
+            return response
+
+        response.vary.add('Accept-Encoding')
+        encoding = choose_encoding(request.accept_encodings)
+        if encoding is None:
+            return response
+
+        if response.is_streamed:
+            response.response = compress_stream(response.response, encoding, level)
+            response.headers.pop('Content-Length', None)
+        else:
+            data = response.get_data()
+            if len(data) < min_size:
+                return response
+            response.set_data(compress(data, encoding, level))
+        response.headers['Content-Encoding'] = encoding
+        return response
+
+    return app
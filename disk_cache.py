@@ -0,0 +1,197 @@
+"""
+Content-addressed on-disk cache
+Values are stored under hashed filenames, written atomically (temp file + rename) so
+several worker processes can share one directory, and evicted least-recently-used
+first once the directory grows past its size cap. The directory's total size is kept
+in a locked file next to the entries, so every process sharing the directory counts
+every other process's writes against the same cap.
+"""
+
+import hashlib
+import os
+import struct
+import tempfile
+import threading
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:  # Windows: each process only counts its own writes
+    fcntl = None
+
+# Holds the directory's total entry size; lives at the top level, beside the shards
+SIZE_FILE = '.size'
+_SIZE = struct.Struct('q')
+
+
+class DiskCache:
+    """Size-capped, multi-process safe key -> bytes store on the local filesystem"""
+
+    def __init__(self, directory, max_bytes=512 * 1024 * 1024, suffix='.bin'):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.suffix = suffix
+        self._lock = threading.Lock()
+        self._size_lock = threading.Lock()
+        self._counters = {'hits': 0, 'misses': 0, 'writes': 0, 'evictions': 0}
+        os.makedirs(directory, exist_ok=True)
+        self._size_estimate = 0
+        # Start from what is really on disk, in case the shared total has drifted
+        with self._locked_size() as fd:
+            self._write_size(fd, self._scan_size())
+
+    def path_for(self, key):
+        """Hashed location of a key, sharded by the first two hex digits"""
+        digest = hashlib.sha256(key.encode('utf-8')).hexdigest()
+        return os.path.join(self.directory, digest[:2], digest + self.suffix)
+
+    def get(self, key):
+        """Return the stored bytes for key, or None on a miss"""
+        path = self.path_for(key)
+        try:
+            with open(path, 'rb') as f:
+                data = f.read()
+        except FileNotFoundError:
+            self._count('misses')
+            return None
+
+        # Bump the mtime so eviction sees this entry as recently used
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        self._count('hits')
+        return data
+
+    def put(self, key, data):
+        """Atomically store bytes for key, evicting old entries if over the size cap"""
+        path = self.path_for(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), prefix='.tmp-')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(data)
+            try:
+                replaced = os.stat(path).st_size
+            except FileNotFoundError:
+                replaced = 0
+            os.replace(tmp_path, path)
+        except BaseException:
+            try:
+                os.unlink(tmp_path)
+            except OSError:
+                pass
+            raise
+
+        self._count('writes')
+        with self._locked_size() as fd:
+            total = self._read_size(fd) + len(data) - replaced
+            self._write_size(fd, total)
+            if total > self.max_bytes:
+                self._evict(fd)
+
+    def evict(self):
+        """Delete least recently used entries until the directory fits under max_bytes"""
+        with self._locked_size() as fd:
+            self._evict(fd)
+
+    def _evict(self, fd):
+        entries = []
+        total = 0
+        for path, stat in self._walk():
+            entries.append((stat.st_mtime, stat.st_size, path))
+            total += stat.st_size
+
+        entries.sort()
+        # Leave some headroom so we don't rescan on every subsequent write
+        target = int(self.max_bytes * 0.9)
+        evicted = 0
+        for _, size, path in entries:
+            if total <= target:
+                break
+            try:
+                os.unlink(path)
+            except FileNotFoundError:
+                pass  # Another process got there first
+            total -= size
+            evicted += 1
+
+        with self._lock:
+            self._counters['evictions'] += evicted
+        # The scan is also the chance to correct any drift in the shared total
+        self._write_size(fd, total)
+
+    def clear(self):
+        """Delete every entry in the cache directory"""
+        with self._locked_size() as fd:
+            for path, _ in self._walk():
+                try:
+                    os.unlink(path)
+                except FileNotFoundError:
+                    pass
+            self._write_size(fd, 0)
+
+    def stats(self):
+        """Return a snapshot of the cache counters"""
+        with self._lock:
+            stats = dict(self._counters)
+            stats['bytes'] = self._size_estimate
+        stats['max_bytes'] = self.max_bytes
+        lookups = stats['hits'] + stats['misses']
+        stats['hit_rate'] = stats['hits'] / lookups if lookups else 0.0
+        return stats
+
+    def _count(self, name):
+        with self._lock:
+            self._counters[name] += 1
+
+    @contextmanager
+    def _locked_size(self):
+        """Hold the lock on the shared size file; yields its descriptor (None without fcntl)"""
+        with self._size_lock:
+            if fcntl is None:
+                yield None
+                return
+            fd = os.open(os.path.join(self.directory, SIZE_FILE), os.O_RDWR | os.O_CREAT, 0o644)
+            try:
+                fcntl.flock(fd, fcntl.LOCK_EX)
+                yield fd
+            finally:
+                os.close(fd)  # also releases the flock
+
+    def _read_size(self, fd):
+        """Total entry size in the directory, as every process sharing it has counted it"""
+        if fd is None:
+            return self._size_estimate
+        data = os.pread(fd, _SIZE.size, 0)
+        if len(data) != _SIZE.size:
+            return self._scan_size()
+        return _SIZE.unpack(data)[0]
+
+    def _write_size(self, fd, total):
+        if fd is not None:
+            os.pwrite(fd, _SIZE.pack(total), 0)
+        with self._lock:
+            self._size_estimate = total
+
+    def _scan_size(self):
+        return sum(stat.st_size for _, stat in self._walk())
+
+    def _walk(self):
+        """Yield (path, stat) for every stored entry"""
+        try:
+            shards = list(os.scandir(self.directory))
+        except FileNotFoundError:
+            return
+        for shard in shards:
+            # Shards are named by two hex digits; anything else belongs to someone else
+            if len(shard.name) != 2 or not shard.is_dir():
+                continue
+            for entry in os.scandir(shard.path):
+                if entry.name.startswith('.tmp-') or not entry.name.endswith(self.suffix):
+                    continue
+                try:
+                    yield entry.path, entry.stat()
+                except FileNotFoundError:
+                    continue
@@ -0,0 +1,138 @@
+"""
+Output encoding for rendered tokens
+A rendered token is a full frame-resolution RGBA image. Before encoding it is scaled
+once to a size preset (print at 300 DPI, screen, thumbnail, or the frame's native
+resolution) and written in the negotiated format: PNG, palette-quantized PNG, WebP or
+JPEG, with compression settings tuned per preset.
+"""
+
+import io
+from collections import namedtuple
+
+from PIL import Image, features
+
+# Physical width of a token card, used to size the print preset
+CARD_WIDTH_INCHES = 2.5
+
+# width: output width in pixels (None keeps the frame's resolution)
+# png_level: zlib level; quality: WebP/JPEG quality; webp_method: WebP effort (0-6)
+Preset = namedtuple('Preset', 'name width png_level quality webp_method')
+
+# Large PNGs use zlib level 3: about 3x faster than the default 6 for a few percent
+# more bytes; small ones can afford level 9.
+PRESETS = {
+    'full': Preset('full', None, 3, 90, 4),
+    'print': Preset('print', int(CARD_WIDTH_INCHES * 300), 3, 92, 4),
+    'screen': Preset('screen', 488, 6, 82, 4),
+    'thumbnail': Preset('thumbnail', 146, 9, 75, 6),
+}
+DEFAULT_PRESET = 'full'
+
+MIMETYPES = {
+    'png': 'image/png',
+    'png8': 'image/png',
+    'webp': 'image/webp',
+    'jpeg': 'image/jpeg',
+}
+DEFAULT_FORMAT = 'png'
+
+# Formats a client can ask for by Accept header, in server preference order
+_NEGOTIABLE = [('image/png', 'png'), ('image/webp', 'webp'), ('image/jpeg', 'jpeg')]
+
+# Background for formats without transparency (the token's rounded corners)
+FLATTEN_BACKGROUND = (255, 255, 255)
+
+
+def available_formats():
+    formats = ['png', 'png8', 'jpeg']
+    if features.check('webp'):
+        formats.append('webp')
+    return formats
+
+
+def negotiate_format(requested=None, accept=None):
+    """Pick an output format from an explicit format parameter or an Accept header.
+
+    requested wins when given (ValueError if unsupported); otherwise the client's
+    most preferred image type we can produce, falling back to PNG. accept is a
+    werkzeug MIMEAccept.
+    """
+    if requested:
+        if not isinstance(requested, str):
+            raise ValueError('format must be a string')
+        requested = requested.lower()
+        if requested == 'jpg':
+            requested = 'jpeg'
+        if requested not in available_formats():
+            raise ValueError(f'Unsupported format: {requested}')
+        return requested
+
+    if accept is not None:
+        offered = [mimetype for mimetype, name in _NEGOTIABLE if name in available_formats()]
+        # Only honour explicit image types; */* and image/* keep the PNG default
+        explicit = [mimetype for mimetype in offered if mimetype in accept.values()]
+        best = accept.best_match(explicit) if explicit else None
+        if best is not None:
+            return dict(_NEGOTIABLE)[best]
+    return DEFAULT_FORMAT
+
+
+def get_preset(name=None):
+    """Preset by name (ValueError if unknown)"""
+    if name is not None and not isinstance(name, str):
+        raise ValueError('preset must be a string')
+    preset = PRESETS.get(name or DEFAULT_PRESET)
+    if preset is None:
+        raise ValueError(f'Unknown preset: {name}')
+    return preset
+
+
+def scale_to_preset(image, preset):
+    """Downscale once to the preset's width (never upscales)"""
+    if preset.width is None or preset.width >= image.width:
+        return image
+    height = round(image.height * preset.width / image.width)
+    # reducing_gap lets Pillow shrink by an integer factor first, then resample the rest
+    return image.resize((preset.width, height), Image.LANCZOS, reducing_gap=3.0)
+
+
+def flatten(image, background=FLATTEN_BACKGROUND):
+    if image.mode != 'RGBA':
+        return image.convert('RGB')
+    flat = Image.new('RGB', image.size, background)
+    flat.paste(image, (0, 0), image)
+    return flat
+
+
+def sniff_mimetype(data):
+    """Mimetype of encoded token bytes from their signature, or None if unrecognised"""
+    if data.startswith(b'\x89PNG\r\n\x1a\n'):
+        return 'image/png'
+    if data.startswith(b'\xff\xd8\xff'):
+        return 'image/jpeg'
+    if data[:4] == b'RIFF' and data[8:12] == b'WEBP':
+        return 'image/webp'
+    return None
+
+
+def encode_image(image, output_format=DEFAULT_FORMAT, preset=DEFAULT_PRESET):
+    """Scale an RGBA token to a preset and encode it; returns the encoded bytes"""
+    if not isinstance(preset, Preset):
+        preset = get_preset(preset)
+    image = scale_to_preset(image, preset)
+    buffer = io.BytesIO()
+
+    if output_format == 'png':
+        image.save(buffer, 'PNG', compress_level=preset.png_level)
+    elif output_format == 'png8':
+        quantized = image.quantize(256, method=Image.Quantize.FASTOCTREE)
+        quantized.save(buffer, 'PNG', compress_level=preset.png_level)
+    elif output_format == 'webp':
+        image.save(buffer, 'WEBP', quality=preset.quality, method=preset.webp_method)
+    elif output_format == 'jpeg':
+        flatten(image).save(buffer, 'JPEG', quality=preset.quality, optimize=True,
+                            subsampling=0 if preset.quality >= 90 else 2)
+    else:
+        raise ValueError(f'Unsupported format: {output_format}')
+
+    return buffer.getvalue()
@@ -0,0 +1,230 @@
+"""
+Frame templates
+A FrameTemplate bundles a frame image, its fonts and every text/art box position,
+loaded once from a JSON layout file in static/layouts. Geometry is stored in the
+layout as fractions of the frame size and converted to pixels when the template is
+loaded, so rendering a token only has to fill in the boxes.
+"""
+
+from PIL import Image
+from collections import namedtuple
+import glob
+import hashlib
+import json
+import os
+import threading
+
+import text_layout
+from assets import load_font
+from mana_symbols import load_symbol_set
+
+# Size of the squares the art window is split into when finding pixels that need blending
+BLEND_TILE_SIZE = 64
+
+# A text element resolved to pixel coordinates
+TextSlot = namedtuple('TextSlot', 'x y font fill anchor width height min_size symbols')
+
+
+def read_layout(layout_path):
+    """Parse a layout file without decoding any assets.
+
+    Returns (name, layout, base_dir, frame_path, fingerprint), where the fingerprint
+    hashes the layout and every file it references.
+    """
+    base_dir = os.path.dirname(os.path.abspath(layout_path))
+    with open(layout_path, 'rb') as f:
+        layout_bytes = f.read()
+    layout = json.loads(layout_bytes)
+
+    frame_path = os.path.join(base_dir, layout['frame'])
+    font_paths = {os.path.join(base_dir, spec['file']) for spec in layout['fonts'].values()}
+    symbol_paths = []
+    if 'symbols' in layout:
+        symbols_path = os.path.join(base_dir, layout['symbols'])
+        with open(symbols_path, 'rb') as f:
+            symbols_font = json.loads(f.read())['font']
+        symbol_paths = [symbols_path, os.path.join(os.path.dirname(symbols_path), symbols_font)]
+
+    # Anything that changes the rendered pixels feeds the fingerprint
+    digest = hashlib.sha256(layout_bytes)
+    for path in [frame_path] + sorted(font_paths) + symbol_paths:
+        with open(path, 'rb') as f:
+            digest.update(f.read())
+
+    name = layout.get('name', os.path.splitext(os.path.basename(layout_path))[0])
+    return name, layout, base_dir, frame_path, digest.hexdigest()[:16]
+
+
+class FrameTemplate:
+    """A frame image plus precomputed fonts and box geometry"""
+
+    def __init__(self, name, image, fonts, art_box, text, fingerprint, symbols=None):
+        self.name = name
+        self.size = image.size
+        self.fonts = fonts
+        self.art_box = art_box  # (x, y, width, height)
+        self.text = text  # element name -> TextSlot
+        self.fingerprint = fingerprint
+        self.symbols = symbols  # SymbolSet drawn inline in slots marked "symbols", or None
+        self.scale = 1
+        self._scaled = {}
+        self._scaled_lock = threading.Lock()
+
+        # Line height for wrapped rules text
+        self.oracle_line_height = text['oracle'].font.getbbox("Ay")[3]
+
+        self._precompose(image)
+
+    def font_at(self, slot, size):
+        """The font of a text slot at a different point size"""
+        if size == slot.font.size:
+            return slot.font
+        return load_font(slot.font.path, size)
+
+    def _precompose(self, image):
+        """Split the frame into a static base and the window the art shows through.
+
+        Everything outside the art box, and every part of the art box the frame covers
+        opaquely, looks the same on every token, so it is composited once here. Per
+        render the art is copied straight into the art box, the opaque frame border around
+        the window is restored, and only the tiles where the frame is partly transparent
+        (anti-aliased edges, overlays) are alpha-blended.
+        """
+        # Exactly what a token looks like before any art is added
+        self.base = Image.new('RGBA', self.size, (0, 0, 0, 0))
+        self.base.paste(image, (0, 0), image)
+
+        art_x, art_y, art_width, art_height = self.art_box
+        alpha = image.getchannel('A')
+        box_alpha = alpha.crop((art_x, art_y, art_x + art_width, art_y + art_height))
+        # Window (relative to the art box) where any art is visible
+        self.art_window = box_alpha.point(lambda a: 255 if a < 255 else 0).getbbox()
+
+        # Tiles of the window where the frame still has to be blended over the art,
+        # as (frame pixels, pre-split alpha mask, absolute position)
+        self.blend_tiles = []
+        # Opaque frame strips inside the art box but outside the window, as (pixels, position)
+        self.window_border = []
+        if self.art_window is None:
+            return
+        left, top, right, bottom = self.art_window
+        for strip in ((0, 0, art_width, top), (0, bottom, art_width, art_height),
+                      (0, top, left, bottom), (right, top, art_width, bottom)):
+            if strip[2] > strip[0] and strip[3] > strip[1]:
+                absolute = (art_x + strip[0], art_y + strip[1], art_x + strip[2], art_y + strip[3])
+                self.window_border.append((self.base.crop(absolute), absolute[:2]))
+
+        for tile_top in range(top, bottom, BLEND_TILE_SIZE):
+            for tile_left in range(left, right, BLEND_TILE_SIZE):
+                tile = (tile_left, tile_top,
+                        min(tile_left + BLEND_TILE_SIZE, right), min(tile_top + BLEND_TILE_SIZE, bottom))
+                if box_alpha.crop(tile).getbbox() is None:
+                    continue  # Frame is fully transparent here, the art shows as-is
+                absolute = (art_x + tile[0], art_y + tile[1], art_x + tile[2], art_y + tile[3])
+                frame_tile = image.crop(absolute)
+                self.blend_tiles.append((frame_tile, frame_tile.getchannel('A'), absolute[:2]))
+
+    def compose(self, art_image):
+        """Return a new token canvas with art (already sized to the art box) under the frame"""
+        token = self.base.copy()
+        if self.art_window is None:
+            return token
+
+        # Paste the whole art (cheaper than cropping it first), then put back the thin
+        # opaque frame strips around the window that it covered
+        token.paste(art_image, self.art_box[:2])
+        for strip, position in self.window_border:
+            token.paste(strip, position)
+        for frame_tile, mask, position in self.blend_tiles:
+            token.paste(frame_tile, position, mask)
+        return token
+
+    def scaled(self, scale):
+        """This template resolved from the same layout at a fraction of its size.
+
+        The frame is downscaled and the fonts are loaded at proportional sizes once per
+        scale, so previews and full renders can't drift apart.
+        """
+        if scale == self.scale:
+            return self
+        with self._scaled_lock:
+            template = self._scaled.get(scale)
+            if template is None:
+                frame = Image.open(self.frame_path).convert('RGBA')
+                size = (max(1, round(frame.width * scale)), max(1, round(frame.height * scale)))
+                frame = frame.resize(size, Image.Resampling.LANCZOS)
+                template = FrameTemplate.from_layout(self.name, self.layout, self.base_dir, self.frame_path,
+                                                     frame, self.fingerprint, scale)
+                self._scaled[scale] = template
+        return template
+
+    @classmethod
+    def load(cls, layout_path):
+        """Build a template from a JSON layout file"""
+        name, layout, base_dir, frame_path, fingerprint = read_layout(layout_path)
+        image = Image.open(frame_path).convert('RGBA')
+        return cls.from_layout(name, layout, base_dir, frame_path, image, fingerprint)
+
+    @classmethod
+    def from_layout(cls, name, layout, base_dir, frame_path, image, fingerprint, scale=1):
+        """Resolve a parsed layout against a frame image, with font sizes multiplied by scale"""
+        width, height = image.size
+
+        fonts = {}
+        for role, spec in layout['fonts'].items():
+            fonts[role] = load_font(os.path.join(base_dir, spec['file']), max(1, round(spec['size'] * scale)))
+
+        box = layout['art_box']
+        art_box = (
+            int(width * box['x']),
+            int(height * box['y']),
+            int(width * box['width']),
+            int(height * box['height']),
+        )
+
+        text = {}
+        for element, spec in layout['text'].items():
+            x = int(width * spec['x'])
+            y = int(height * spec['y'])
+            text_width = text_height = None
+            if 'margin_right' in spec:
+                text_width = width - int(width * spec['margin_right']) - x
+            if 'bottom' in spec:
+                text_height = int(height * spec['bottom']) - y
+            font = fonts[spec['font']]
+            min_size = max(1, round(spec['min_size'] * scale)) if 'min_size' in spec else font.size
+            text[element] = TextSlot(
+                x=x,
+                y=y,
+                font=font,
+                fill=tuple(spec.get('fill', (0, 0, 0))),
+                anchor=spec.get('anchor'),
+                width=text_width,
+                height=text_height,
+                min_size=min_size,
+                symbols=bool(spec.get('symbols')),
+            )
+
+        symbols = None
+        if 'symbols' in layout:
+            symbols = load_symbol_set(os.path.join(base_dir, layout['symbols']))
+            # Rasterize the symbol atlases for these slots now rather than mid-render, at
+            # every size fit_text may shrink them to
+            symbols.preload(size for slot in text.values() if slot.symbols
+                            for size in text_layout.font_sizes(slot.font.size, slot.min_size))
+
+        template = cls(name, image, fonts, art_box, text, fingerprint, symbols)
+        template.layout = layout
+        template.base_dir = base_dir
+        template.frame_path = frame_path
+        template.scale = scale
+        return template
+
+
+def load_templates(layouts_dir):
+    """Load every *.json layout in a directory, keyed by template name"""
+    templates = {}
+    for layout_path in sorted(glob.glob(os.path.join(layouts_dir, '*.json'))):
+        template = FrameTemplate.load(layout_path)
+        templates[template.name] = template
+    return templates
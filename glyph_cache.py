@@ -0,0 +1,94 @@
+"""
+Glyph-run cache
+Rasterizing a line of text with FreeType at 80-100pt costs far more than stamping the
+result onto the token, and token text repeats across renders: type lines such as
+"Creature - Zombie", P/T values such as "2/2", popular artists' names and common
+keyword lines. draw_text() keeps the mask FreeType produces for each run of text in a
+bounded LRU keyed by font, size, string and anchor, and blits it with the fill colour
+the same way ImageDraw.text does after rasterizing, so the pixels are identical.
+"""
+
+import math
+import threading
+from collections import OrderedDict
+
+
+class GlyphRunCache:
+    """Bounded LRU of rasterized text masks, sized in bytes, with hit counters.
+
+    A max_bytes of 0 turns the cache off and draw_text() falls back to ImageDraw.text.
+    """
+
+    def __init__(self, max_bytes=32 * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self._runs = OrderedDict()  # key -> (mask, offset, bytes)
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._counters = {'hits': 0, 'misses': 0, 'evictions': 0}
+
+    def mask(self, font, text, mode, anchor, start):
+        """(mask, offset) of text rasterized as font.getmask2 would, rasterizing on a miss"""
+        key = (font_identity(font), text, mode, anchor, start)
+        with self._lock:
+            run = self._runs.get(key)
+            if run is not None:
+                self._runs.move_to_end(key)
+                self._counters['hits'] += 1
+                return run[0], run[1]
+            self._counters['misses'] += 1
+
+        # Rasterize outside the lock; two threads missing on the same run both draw it
+        mask, offset = font.getmask2(text, mode, anchor=anchor, start=start)
+        size = mask.size[0] * mask.size[1]
+        with self._lock:
+            if size <= self.max_bytes and key not in self._runs:
+                self._runs[key] = (mask, offset, size)
+                self._bytes += size
+                while self._bytes > self.max_bytes:
+                    _, (_, _, evicted) = self._runs.popitem(last=False)
+                    self._bytes -= evicted
+                    self._counters['evictions'] += 1
+        return mask, offset
+
+    def clear(self):
+        with self._lock:
+            self._runs.clear()
+            self._bytes = 0
+
+    def stats(self):
+        """Return a snapshot of the cache counters"""
+        with self._lock:
+            stats = dict(self._counters)
+            stats['size'] = len(self._runs)
+            stats['bytes'] = self._bytes
+            stats['max_bytes'] = self.max_bytes
+        lookups = stats['hits'] + stats['misses']
+        stats['hit_rate'] = stats['hits'] / lookups if lookups else 0.0
+        return stats
+
+
+def font_identity(font):
+    """Cache key part for a font: its file, size and settings, or the font itself"""
+    path = getattr(font, 'path', None)
+    if path:
+        return (path, font.size, font.index, font.layout_engine)
+    # Keeping the font in the key keeps it alive, so an id can never be reused
+    return font
+
+
+runs = GlyphRunCache()
+
+
+def draw_text(draw, xy, text, fill, font, anchor=None):
+    """Draw one line of text like draw.text(xy, text, fill, font, anchor), from the cache"""
+    if not runs.max_bytes or '\n' in text or not hasattr(font, 'getmask2'):
+        draw.text(xy, text, fill=fill, font=font, anchor=anchor)
+        return
+
+    # Mirror ImageDraw.text: integer origin plus the fractional part as the start offset
+    coord = tuple(int(value) for value in xy)
+    start = tuple(math.modf(value)[0] for value in xy)
+    mask, offset = runs.mask(font, text, draw.fontmode, anchor, start)
+    # The same ink ImageDraw.text resolves fill to
+    ink, _ = draw._getink(fill)
+    draw.draw.draw_bitmap((coord[0] + offset[0], coord[1] + offset[1]), mask, ink)
@@ -0,0 +1,51 @@
+"""
+Gunicorn configuration for production
+The app is preloaded and warmed up in the master so frame images, fonts and preview
+templates are built once and shared copy-on-write by the workers; each worker then
+runs its own warmup render before it accepts traffic. Tune with WEB_CONCURRENCY (worker processes), GUNICORN_THREADS
+(threads per worker) and RENDER_POOL_WORKERS (render processes per worker).
+
+Usage: gunicorn -c gunicorn.conf.py
+"""
+
+import os
+import time
+
+wsgi_app = 'wsgi:application'
+bind = os.getenv('BIND', '0.0.0.0:5000')
+
+# Threads mostly wait on Scryfall and the render pool, so a few workers with several
+# threads each go further than many single-threaded workers
+workers = int(os.getenv('WEB_CONCURRENCY', min(4, os.cpu_count() or 1)))
+threads = int(os.getenv('GUNICORN_THREADS', 4))
+worker_class = 'gthread'
+timeout = int(os.getenv('GUNICORN_TIMEOUT', 120))
+keepalive = 5
+max_requests = int(os.getenv('GUNICORN_MAX_REQUESTS', 0))
+max_requests_jitter = max_requests // 10
+
+preload_app = os.getenv('GUNICORN_PRELOAD', '1') != '0'
+accesslog = os.getenv('GUNICORN_ACCESS_LOG', '-')
+
+# Split the cores between the workers' render pools instead of giving every worker a
+# process per core
+os.environ.setdefault('RENDER_POOL_WORKERS', str(max(1, (os.cpu_count() or 1) // workers)))
+
+
+def when_ready(server):
+    """With a preloaded app, build the preview templates and caches once in the master"""
+    if preload_app:
+        from app import warm_up
+
+        start = time.perf_counter()
+        warm_up()
+        server.log.info('Master warmed up in %.0f ms', (time.perf_counter() - start) * 1000)
+
+
+def post_fork(server, worker):
+    """Warm each worker up before it starts accepting requests"""
+    from app import warm_up
+
+    start = time.perf_counter()
+    warm_up()
+    server.log.info('Worker %s warmed up in %.0f ms', worker.pid, (time.perf_counter() - start) * 1000)
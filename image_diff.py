@@ -0,0 +1,45 @@
+"""
+Image comparison for golden-image tests
+Two renders are compared pixel by pixel on every channel, alpha included. A pixel
+counts as changed when any channel differs by more than a tolerance, so antialiasing
+and JPEG decoder noise from a different Pillow/libjpeg/FreeType build can be allowed
+for without hiding a misplaced word or a wrong crop, which change far more pixels.
+"""
+
+from collections import namedtuple
+
+from PIL import Image, ImageChops
+
+# max_delta: largest channel difference; mean_delta: mean of every pixel's largest
+# channel difference; changed: pixels over the tolerance; fraction: changed / pixels
+Difference = namedtuple('Difference', 'max_delta mean_delta changed fraction')
+
+
+def channel_delta(actual, expected):
+    """Greyscale image of each pixel's largest channel difference"""
+    actual, expected = actual.convert('RGBA'), expected.convert('RGBA')
+    bands = ImageChops.difference(actual, expected).split()
+    delta = bands[0]
+    for band in bands[1:]:
+        delta = ImageChops.lighter(delta, band)
+    return delta
+
+
+def compare_images(actual, expected, tolerance=0):
+    """Difference between two images of the same size; pixels over tolerance are changed"""
+    if actual.size != expected.size:
+        raise ValueError(f'Image sizes differ: {actual.size} vs {expected.size}')
+    histogram = channel_delta(actual, expected).histogram()
+    pixels = actual.width * actual.height
+    max_delta = max((value for value, count in enumerate(histogram) if count), default=0)
+    mean_delta = sum(value * count for value, count in enumerate(histogram)) / pixels
+    changed = sum(histogram[tolerance + 1:])
+    return Difference(max_delta, mean_delta, changed, changed / pixels)
+
+
+def diff_image(actual, expected, tolerance=0):
+    """The expected image dimmed, with pixels changed beyond tolerance marked in red"""
+    mask = channel_delta(actual, expected).point(lambda value: 255 if value > tolerance else 0)
+    base = Image.blend(expected.convert('RGB'), Image.new('RGB', expected.size, (255, 255, 255)), 0.7)
+    base.paste((255, 0, 0), mask=mask)
+    return base
@@ -0,0 +1,240 @@
+"""
+Print sheet imposition
+Lays tokens out in a grid on Letter or A4 sheets with optional bleed and cut marks,
+and writes the sheets as a PDF (or a single sheet as a PNG) without ever holding a
+whole sheet in memory. Each sheet is built one grid row at a time: the row's strip is
+allocated, every token in it is rendered straight at its slot size and pasted in, and
+the strip is encoded and written out before the next one is started. The PDF pages
+are made of one image per strip, so memory stays at about one strip whatever the
+number of pages.
+"""
+
+import io
+import math
+import struct
+import zlib
+
+from PIL import Image, ImageDraw
+
+from encoders import CARD_WIDTH_INCHES
+
+CARD_HEIGHT_INCHES = 3.5
+
+# Width x height in inches
+PAPER_SIZES = {
+    'letter': (8.5, 11.0),
+    'a4': (210 / 25.4, 297 / 25.4),
+}
+SHEET_DPIS = (150, 300, 600)
+
+# Cut marks: length, gap from the card edge and stroke width, in inches
+CUT_MARK_LENGTH = 0.125
+CUT_MARK_OFFSET = 0.0625
+CUT_MARK_WIDTH = 0.005
+
+
+class SheetLayout:
+    """Grid geometry of a sheet in pixels at the given DPI"""
+
+    def __init__(self, paper='letter', dpi=300, bleed=0.0, margin=0.25, cut_marks=True,
+                 bleed_color=(0, 0, 0)):
+        if paper not in PAPER_SIZES:
+            raise ValueError(f'Unknown paper: {paper} (choose from {", ".join(PAPER_SIZES)})')
+        if dpi not in SHEET_DPIS:
+            raise ValueError(f'dpi must be one of {", ".join(map(str, SHEET_DPIS))}')
+        if not 0 <= bleed <= 0.25:
+            raise ValueError('bleed must be between 0 and 0.25 inches')
+        if not 0 <= margin <= 1:
+            raise ValueError('margin must be between 0 and 1 inch')
+
+        self.paper = paper
+        self.dpi = dpi
+        self.cut_marks = cut_marks
+        self.bleed_color = tuple(bleed_color)
+        self.width, self.height = (round(inches * dpi) for inches in PAPER_SIZES[paper])
+        self.card_width = round(CARD_WIDTH_INCHES * dpi)
+        self.card_height = round(CARD_HEIGHT_INCHES * dpi)
+        self.bleed = round(bleed * dpi)
+        self.slot_width = self.card_width + 2 * self.bleed
+        self.slot_height = self.card_height + 2 * self.bleed
+
+        # Count the grid in inches so pixel rounding can't drop a row at low DPI
+        paper_width, paper_height = PAPER_SIZES[paper]
+        self.columns = int((paper_width - 2 * margin) / (CARD_WIDTH_INCHES + 2 * bleed) + 1e-9)
+        self.rows = int((paper_height - 2 * margin) / (CARD_HEIGHT_INCHES + 2 * bleed) + 1e-9)
+        if self.columns < 1 or self.rows < 1:
+            raise ValueError('No card fits on the sheet with this margin and bleed')
+        self.left = (self.width - self.columns * self.slot_width) // 2
+        self.top = (self.height - self.rows * self.slot_height) // 2
+
+    @property
+    def per_page(self):
+        return self.columns * self.rows
+
+    def page_count(self, tokens):
+        return max(1, math.ceil(tokens / self.per_page))
+
+    def strip_bounds(self, row):
+        """(top, bottom) of the strip holding a grid row; the first and last take the margins"""
+        top = 0 if row == 0 else self.top + row * self.slot_height
+        bottom = self.height if row == self.rows - 1 else self.top + (row + 1) * self.slot_height
+        return top, bottom
+
+    def card_box(self, position):
+        """Trim box (left, top, right, bottom) of the card at a position on the page"""
+        row, column = divmod(position, self.columns)
+        left = self.left + column * self.slot_width + self.bleed
+        top = self.top + row * self.slot_height + self.bleed
+        return left, top, left + self.card_width, top + self.card_height
+
+    def cut_marks_lines(self):
+        """Cut mark segments in the margins, lined up with every trim edge"""
+        if not self.cut_marks:
+            return []
+        length = max(1, round(CUT_MARK_LENGTH * self.dpi))
+        offset = round(CUT_MARK_OFFSET * self.dpi)
+        grid_right = self.left + self.columns * self.slot_width
+        grid_bottom = self.top + self.rows * self.slot_height
+        lines = []
+        xs = sorted({x for column in range(self.columns) for x in self.card_box(column)[0::2]})
+        ys = sorted({y for row in range(self.rows) for y in self.card_box(row * self.columns)[1::2]})
+        for x in xs:
+            lines.append((x, self.top - offset - length, x, self.top - offset))
+            lines.append((x, grid_bottom + offset, x, grid_bottom + offset + length))
+        for y in ys:
+            lines.append((self.left - offset - length, y, self.left - offset, y))
+            lines.append((grid_right + offset, y, grid_right + offset + length, y))
+        return lines
+
+
+def page_strips(layout, tokens, render):
+    """Yield (top, strip image) for each grid row of one page.
+
+    tokens are the page's items in reading order; render(token) returns the token as an
+    RGBA image (ideally already card-sized) or None to leave its slot empty.
+    """
+    marks = layout.cut_marks_lines()
+    mark_width = max(1, round(CUT_MARK_WIDTH * layout.dpi))
+    for row in range(layout.rows):
+        top, bottom = layout.strip_bounds(row)
+        strip = Image.new('RGB', (layout.width, bottom - top), (255, 255, 255))
+        for column in range(layout.columns):
+            position = row * layout.columns + column
+            if position >= len(tokens):
+                break
+            left, card_top, right, card_bottom = layout.card_box(position)
+            if layout.bleed:
+                strip.paste(layout.bleed_color, (left - layout.bleed, card_top - layout.bleed - top,
+                                                 right + layout.bleed, card_bottom + layout.bleed - top))
+            image = render(tokens[position])
+            if image is None:
+                continue
+            if image.size != (layout.card_width, layout.card_height):
+                image = image.resize((layout.card_width, layout.card_height), Image.Resampling.LANCZOS)
+            strip.paste(image, (left, card_top - top), image if image.mode == 'RGBA' else None)
+            del image
+
+        draw_lines(strip, top, marks, mark_width)
+        yield top, strip
+        # Let the strip go before the next one is allocated
+        del strip
+
+
+def draw_lines(strip, top, lines, width):
+    """Draw the sheet-coordinate line segments that cross a strip starting at top"""
+    draw = ImageDraw.Draw(strip)
+    for x0, y0, x1, y1 in lines:
+        if y1 >= top and y0 < top + strip.height:
+            draw.line((x0, y0 - top, x1, y1 - top), fill=(0, 0, 0), width=width)
+
+
+def write_pdf(layout, pages, quality=92):
+    """Yield a PDF, one page per item of pages, each an iterable of (top, strip) pairs.
+
+    Strips are JPEG-encoded into their own image XObject and written immediately;
+    only the object offsets are kept until the cross-reference table at the end.
+    """
+    offsets = {}
+    position = 0
+    page_ids = []
+    next_id = 3  # 1 is the catalog and 2 the page tree, both written last
+
+    def emit(object_id, body, stream=None):
+        nonlocal position
+        offsets[object_id] = position
+        chunk = f'{object_id} 0 obj\n'.encode('ascii') + body
+        if stream is not None:
+            chunk += b'\nstream\n' + stream + b'\nendstream'
+        chunk += b'\nendobj\n'
+        position += len(chunk)
+        return chunk
+
+    header = b'%PDF-1.4\n%\xe2\xe3\xcf\xd3\n'
+    position += len(header)
+    yield header
+
+    scale = 72 / layout.dpi
+    page_width, page_height = layout.width * scale, layout.height * scale
+    for strips in pages:
+        resources = []
+        content = []
+        for top, strip in strips:
+            buffer = io.BytesIO()
+            strip.save(buffer, 'JPEG', quality=quality, dpi=(layout.dpi, layout.dpi))
+            data = buffer.getvalue()
+            image_id = next_id
+            next_id += 1
+            yield emit(image_id, (
+                f'<< /Type /XObject /Subtype /Image /Width {strip.width} /Height {strip.height} '
+                f'/ColorSpace /DeviceRGB /BitsPerComponent 8 /Filter /DCTDecode /Length {len(data)} >>'
+            ).encode('ascii'), data)
+            name = f'Im{len(resources)}'
+            resources.append(f'/{name} {image_id} 0 R')
+            # PDF y runs upwards from the bottom of the page
+            y = (layout.height - top - strip.height) * scale
+            content.append(f'q {strip.width * scale:.4f} 0 0 {strip.height * scale:.4f} 0 {y:.4f} cm /{name} Do Q')
+            del strip, data
+
+        stream = '\n'.join(content).encode('ascii')
+        content_id, page_id = next_id, next_id + 1
+        next_id += 2
+        yield emit(content_id, f'<< /Length {len(stream)} >>'.encode('ascii'), stream)
+        yield emit(page_id, (
+            f'<< /Type /Page /Parent 2 0 R /MediaBox [0 0 {page_width:.4f} {page_height:.4f}] '
+            f'/Resources << /XObject << {" ".join(resources)} >> >> /Contents {content_id} 0 R >>'
+        ).encode('ascii'))
+        page_ids.append(page_id)
+
+    kids = ' '.join(f'{page_id} 0 R' for page_id in page_ids)
+    yield emit(2, f'<< /Type /Pages /Kids [{kids}] /Count {len(page_ids)} >>'.encode('ascii'))
+    yield emit(1, b'<< /Type /Catalog /Pages 2 0 R >>')
+
+    xref = [f'xref\n0 {next_id}\n', '0000000000 65535 f \n']
+    xref += [f'{offsets[object_id]:010d} 00000 n \n' for object_id in range(1, next_id)]
+    yield (''.join(xref) + f'trailer\n<< /Size {next_id} /Root 1 0 R >>\nstartxref\n{position}\n%%EOF\n').encode('ascii')
+
+
+def write_png(layout, strips, level=3):
+    """Yield one sheet as an RGB PNG, compressing each strip's rows as it arrives"""
+
+    def chunk(kind, data):
+        return struct.pack('>I', len(data)) + kind + data + struct.pack('>I', zlib.crc32(kind + data))
+
+    yield b'\x89PNG\r\n\x1a\n'
+    yield chunk(b'IHDR', struct.pack('>IIBBBBB', layout.width, layout.height, 8, 2, 0, 0, 0))
+    pixels_per_metre = round(layout.dpi / 0.0254)
+    yield chunk(b'pHYs', struct.pack('>IIB', pixels_per_metre, pixels_per_metre, 1))
+
+    compressor = zlib.compressobj(level)
+    for _, strip in strips:
+        raw = strip.tobytes()
+        stride = strip.width * 3
+        # Every row gets filter type 0 (None)
+        rows = b''.join(b'\x00' + raw[offset:offset + stride] for offset in range(0, len(raw), stride))
+        del raw, strip
+        data = compressor.compress(rows)
+        del rows
+        if data:
+            yield chunk(b'IDAT', data)
+    yield chunk(b'IDAT', compressor.flush())
+    yield chunk(b'IEND', b'')
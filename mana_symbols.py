@@ -0,0 +1,299 @@
+"""
+Mana and rules-text symbols
+Scryfall writes costs and rules text with symbols in braces: "{2}{W}{U}", "{T}: Add
+{G}.". A symbol set is a JSON file in static/symbols giving each symbol's colours and
+glyph; hybrid ("{W/U}"), two-brid ("{2/W}") and Phyrexian ("{G/P}") symbols are derived
+from the colours. Every symbol is rasterized once per pixel size (supersampled, then
+reduced) into a sprite atlas, one sheet holding the whole set, so a render only
+alpha-composites small regions of it. Strings are split into text and symbol runs once
+and remembered. Lines are laid out run by run with each symbol taking its advance, so
+wrapping leaves room for symbols; a line without symbols is drawn exactly as plain text.
+"""
+
+import json
+import math
+import os
+import re
+import threading
+from collections import OrderedDict, namedtuple
+
+from PIL import Image, ImageDraw
+
+import glyph_cache
+import text_layout
+from assets import load_font
+
+SYMBOL_PATTERN = re.compile(r'\{([^{}]+)\}')
+
+# Symbols are drawn at this multiple of their final size and reduced, for antialiasing
+SUPERSAMPLE = 4
+# Drop shadow offset (down and to the left), as a fraction of the symbol diameter
+SHADOW_OFFSET = 0.04
+ATLAS_COLUMNS = 16
+# Atlases kept per symbol set. Templates preload one per size rules text can shrink to:
+# 17 for the full-size and preview templates together (about 12 MB), and 29 with print
+# sheets at 150, 300 and 600 DPI
+MAX_ATLASES = 64
+# Strings remembered per symbol set before its run cache is reset
+MAX_RUNS = 20000
+
+# colors: one or two fills (two split the circle diagonally); marks: what is drawn on
+# each half, ('glyph', text) or ('icon', name); glyph_fill: colour of the marks
+SymbolStyle = namedtuple('SymbolStyle', 'colors marks glyph_fill')
+
+
+def parse(text):
+    """Split text into runs: plain strings, and symbol names in braces as 1-tuples"""
+    runs = []
+    position = 0
+    for match in SYMBOL_PATTERN.finditer(text):
+        if match.start() > position:
+            runs.append(text[position:match.start()])
+        runs.append((match.group(1),))
+        position = match.end()
+    if position < len(text):
+        runs.append(text[position:])
+    return runs
+
+
+class SymbolSet:
+    """The symbols described by a JSON file, with a sprite atlas per pixel size"""
+
+    def __init__(self, path):
+        with open(path, encoding='utf-8') as f:
+            spec = json.load(f)
+        self.path = path
+        self.name = spec.get('name', os.path.splitext(os.path.basename(path))[0])
+        self.font_path = os.path.join(os.path.dirname(os.path.abspath(path)), spec['font'])
+        self.size = spec['size']
+        self.spacing = spec['spacing']
+        self.shadow = tuple(spec['shadow'])
+        self.styles = resolve_styles(spec)
+        self._atlases = OrderedDict()
+        self._atlas_lock = threading.Lock()
+        self._runs = {}
+
+    def runs(self, text):
+        """parse(text) with unknown symbols turned back into text, remembered per string"""
+        runs = self._runs.get(text)
+        if runs is None:
+            runs = []
+            for run in parse(text):
+                if isinstance(run, tuple) and run[0] not in self.styles:
+                    run = '{' + run[0] + '}'
+                if isinstance(run, str) and runs and isinstance(runs[-1], str):
+                    runs[-1] += run
+                else:
+                    runs.append(run)
+            if len(self._runs) >= MAX_RUNS:
+                self._runs.clear()
+            runs = self._runs[text] = tuple(runs)
+        return runs
+
+    def diameter(self, font):
+        return self.diameter_at(font.size)
+
+    def diameter_at(self, size):
+        """Symbol diameter in pixels for text set at a point size"""
+        return max(1, round(size * self.size))
+
+    def advance(self, font):
+        """Horizontal space a symbol takes in a line of text set in font"""
+        return self.diameter(font) + round(font.size * self.spacing)
+
+    def atlas(self, diameter):
+        """The sprite atlas at a diameter in pixels, rasterized on first use"""
+        with self._atlas_lock:
+            atlas = self._atlases.get(diameter)
+            if atlas is None:
+                atlas = self._atlases[diameter] = SymbolAtlas(self, diameter)
+                while len(self._atlases) > MAX_ATLASES:
+                    self._atlases.popitem(last=False)
+            else:
+                self._atlases.move_to_end(diameter)
+            return atlas
+
+    def preload(self, sizes):
+        """Rasterize the atlases text set at these point sizes will need"""
+        for diameter in sorted({self.diameter_at(size) for size in sizes}):
+            self.atlas(diameter)
+
+    def measure(self, text, font):
+        """Advance width of text in font, symbols included"""
+        return self._width(self.runs(text), font)
+
+    def _width(self, runs, font):
+        advance = self.advance(font)
+        width = 0
+        for run in runs:
+            width += advance if isinstance(run, tuple) else text_layout.measure(font, run)
+        if runs and isinstance(runs[-1], tuple):
+            width -= advance - self.diameter(font)  # no spacing after the last symbol
+        return width
+
+    def draw_line(self, image, draw, xy, text, fill, font, anchor=None):
+        """Draw one line like glyph_cache.draw_text, with its symbols composited inline.
+
+        anchor works as in ImageDraw.text; the symbols sit centred on the capital height.
+        """
+        runs = self.runs(text)
+        if not any(isinstance(run, tuple) for run in runs):
+            glyph_cache.draw_text(draw, xy, text, fill, font, anchor)
+            return
+
+        horizontal, vertical = (anchor or 'la')[0], (anchor or 'la')[1]
+        x, y = xy
+        if horizontal != 'l':
+            width = self._width(runs, font)
+            x -= width if horizontal == 'r' else width / 2
+        x = round(x)
+
+        ascent, descent = font.getmetrics()
+        baseline = {'s': y, 'd': y - descent, 'm': y + (ascent - descent) / 2}.get(vertical, y + ascent)
+        cap_height = -font.getbbox('H', anchor='ls')[1]
+        diameter = self.diameter(font)
+        advance = self.advance(font)
+        top = round(baseline - cap_height / 2 - diameter / 2)
+        atlas = self.atlas(diameter)
+
+        for run in runs:
+            if isinstance(run, tuple):
+                atlas.paste(image, run[0], (x, top))
+                x += advance
+            else:
+                glyph_cache.draw_text(draw, (x, y), run, fill, font, 'l' + vertical)
+                x += round(text_layout.measure(font, run))
+
+
+class SymbolAtlas:
+    """Every symbol of a set rasterized at one diameter onto a single RGBA sheet"""
+
+    def __init__(self, symbol_set, diameter):
+        self.diameter = diameter
+        # Room left of and below the circle for the drop shadow
+        self.pad = math.ceil(diameter * SHADOW_OFFSET)
+        cell = diameter + self.pad
+        names = list(symbol_set.styles)
+        rows = math.ceil(len(names) / ATLAS_COLUMNS)
+        self.sheet = Image.new('RGBA', (cell * min(len(names), ATLAS_COLUMNS), cell * rows), (0, 0, 0, 0))
+        self.boxes = {}
+        for index, name in enumerate(names):
+            row, column = divmod(index, ATLAS_COLUMNS)
+            left, top = column * cell, row * cell
+            sprite = rasterize(symbol_set, symbol_set.styles[name], diameter, self.pad)
+            self.sheet.paste(sprite, (left, top))
+            self.boxes[name] = (left, top, left + cell, top + cell)
+
+    def paste(self, image, name, position):
+        """Composite a symbol onto image with its circle's top-left corner at position"""
+        x, y = position
+        image.alpha_composite(self.sheet, (x - self.pad, y), self.boxes[name])
+
+
+def resolve_styles(spec):
+    """Map every symbol name the set can draw to its SymbolStyle"""
+    colors = {name: tuple(value) for name, value in spec['colors'].items()}
+    glyph_fill = tuple(spec['glyph_fill'])
+    styles = {}
+
+    def color(value):
+        return colors[value] if isinstance(value, str) else tuple(value)
+
+    for name, symbol in spec['symbols'].items():
+        mark = ('icon', symbol['icon']) if 'icon' in symbol else ('glyph', symbol['glyph'])
+        styles[name] = SymbolStyle((color(symbol['color']),), (mark,),
+                                   tuple(symbol.get('glyph_fill', glyph_fill)))
+    for glyph in spec['generic_glyphs']:
+        styles[glyph] = SymbolStyle((tuple(spec['generic']),), (('glyph', glyph),), glyph_fill)
+
+    mana = [name for name in colors if name in spec['symbols']]
+    phyrexian = ('icon', 'phyrexian')
+    for name in mana:
+        glyph = ('glyph', spec['symbols'][name]['glyph'])
+        styles[f'{name}/P'] = SymbolStyle((colors[name],), (phyrexian,), glyph_fill)
+        styles[f'2/{name}'] = SymbolStyle((tuple(spec['generic']), colors[name]), (('glyph', '2'), glyph), glyph_fill)
+    for first, second in (pair.split('/') for pair in spec['hybrids']):
+        marks = (('glyph', spec['symbols'][first]['glyph']), ('glyph', spec['symbols'][second]['glyph']))
+        styles[f'{first}/{second}'] = SymbolStyle((colors[first], colors[second]), marks, glyph_fill)
+        styles[f'{first}/{second}/P'] = SymbolStyle((colors[first], colors[second]), (phyrexian, phyrexian), glyph_fill)
+    return styles
+
+
+def rasterize(symbol_set, style, diameter, pad):
+    """One symbol sprite: a coloured disc with its marks and a drop shadow"""
+    scale = SUPERSAMPLE
+    size = (diameter + pad) * scale
+    sprite = Image.new('RGBA', (size, size), (0, 0, 0, 0))
+    draw = ImageDraw.Draw(sprite)
+    disc = (pad * scale, 0, size - 1, diameter * scale - 1)
+
+    shadow = round(diameter * SHADOW_OFFSET * scale)
+    draw.ellipse((disc[0] - shadow, disc[1] + shadow, disc[2] - shadow, disc[3] + shadow), fill=symbol_set.shadow)
+    if len(style.colors) == 1:
+        draw.ellipse(disc, fill=style.colors[0])
+    else:
+        # Split from top right to bottom left: first colour upper left, second lower right
+        draw.pieslice(disc, 135, 315, fill=style.colors[0])
+        draw.pieslice(disc, -45, 135, fill=style.colors[1])
+
+    center_x, center_y = (disc[0] + disc[2]) / 2, (disc[1] + disc[3]) / 2
+    span = diameter * scale
+    if len(style.marks) == 1:
+        draw_mark(draw, symbol_set, style.marks[0], (center_x, center_y), span * 0.72, style.glyph_fill)
+    else:
+        offset = span * 0.2
+        draw_mark(draw, symbol_set, style.marks[0], (center_x - offset, center_y - offset), span * 0.42, style.glyph_fill)
+        draw_mark(draw, symbol_set, style.marks[1], (center_x + offset, center_y + offset), span * 0.42, style.glyph_fill)
+    return sprite.reduce(scale)
+
+
+def draw_mark(draw, symbol_set, mark, center, size, fill):
+    """Draw a glyph or icon of roughly size pixels centred on center"""
+    kind, value = mark
+    x, y = center
+    if kind == 'glyph':
+        font = load_font(symbol_set.font_path, max(1, round(size)))
+        # Two-digit numbers are squeezed to the width of the disc's middle
+        width = font.getlength(value)
+        if width > size:
+            font = load_font(symbol_set.font_path, max(1, round(size * size / width)))
+        draw.text((x, y), value, fill=fill, font=font, anchor='mm')
+        return
+
+    stroke = max(1, round(size * 0.12))
+    radius = size * 0.36
+    if value == 'phyrexian':
+        draw.ellipse((x - radius, y - radius * 0.8, x + radius, y + radius * 0.8), outline=fill, width=stroke)
+        draw.line((x, y - radius * 1.25, x, y + radius * 1.25), fill=fill, width=stroke)
+    elif value in ('tap', 'untap'):
+        # Three quarters of a circle ending in an arrowhead: clockwise for tap,
+        # mirrored (anticlockwise) for untap. Angles run clockwise from 3 o'clock.
+        start, end = (120, 30) if value == 'tap' else (150, 60)
+        draw.arc((x - radius, y - radius, x + radius, y + radius), start, end, fill=fill, width=stroke)
+        end = math.radians(30)  # the tap arrow's end; untap is mirrored below
+        tip_x, tip_y = x + radius * math.cos(end), y + radius * math.sin(end)
+        # Clockwise tangent at the end of the arc, and its normal
+        along, across = (-math.sin(end), math.cos(end)), (math.cos(end), math.sin(end))
+        head = size * 0.2
+        points = [(tip_x + along[0] * head * 1.2, tip_y + along[1] * head * 1.2),
+                  (tip_x + across[0] * head, tip_y + across[1] * head),
+                  (tip_x - across[0] * head, tip_y - across[1] * head)]
+        if value == 'untap':
+            points = [(2 * x - px, py) for px, py in points]
+        draw.polygon(points, fill=fill)
+    else:
+        raise ValueError(f'Unknown symbol icon: {value}')
+
+
+_sets = {}
+_sets_lock = threading.Lock()
+
+
+def load_symbol_set(path):
+    """Load a symbol set once per file"""
+    path = os.path.abspath(path)
+    with _sets_lock:
+        symbol_set = _sets.get(path)
+        if symbol_set is None:
+            symbol_set = _sets[path] = SymbolSet(path)
+        return symbol_set
@@ -0,0 +1,191 @@
+"""
+Render pipeline metrics and profiling hooks
+Each stage of a token render (lookup, download, decode, resize, composite, text,
+encode) is timed with stage() into a latency histogram, and request latency is
+recorded per endpoint. Both are exposed in the Prometheus text format. While a request
+is being handled its stage times are also collected so they can be returned in
+Server-Timing / X-Render-Timing headers, and a request can be run under cProfile with
+the stats written to a directory for later inspection.
+
+Metrics are per process: behind several gunicorn workers each scrape sees one worker.
+"""
+
+import contextlib
+import contextvars
+import cProfile
+import json
+import os
+import random
+import threading
+import time
+
+from flask import g, request
+
+STAGES = ('lookup', 'download', 'decode', 'resize', 'composite', 'text', 'encode')
+
+# Seconds; renders range from a few ms (thumbnail cache hits) to seconds (cold full size)
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+PROMETHEUS_CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+
+class Histogram:
+    """Thread-safe cumulative histogram with one label dimension"""
+
+    def __init__(self, name, help, label, buckets=DEFAULT_BUCKETS):
+        self.name = name
+        self.help = help
+        self.label = label
+        self.buckets = tuple(buckets)
+        self._series = {}  # label value -> [bucket counts..., sum, count]
+        self._lock = threading.Lock()
+
+    def observe(self, label_value, value):
+        with self._lock:
+            series = self._series.get(label_value)
+            if series is None:
+                series = self._series[label_value] = [0] * (len(self.buckets) + 2)
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[i] += 1
+            series[-2] += value
+            series[-1] += 1
+
+    def snapshot(self):
+        """{label value: {'count', 'sum', 'buckets': [(bound, cumulative count)]}}"""
+        with self._lock:
+            series = {label: list(values) for label, values in self._series.items()}
+        return {
+            label: {'count': values[-1], 'sum': values[-2],
+                    'buckets': list(zip(self.buckets, values[:-2]))}
+            for label, values in series.items()
+        }
+
+    def prometheus_lines(self):
+        lines = [f'# HELP {self.name} {self.help}', f'# TYPE {self.name} histogram']
+        for label_value, data in sorted(self.snapshot().items()):
+            label = f'{self.label}="{escape_label(label_value)}"'
+            for bound, count in data['buckets']:
+                lines.append(f'{self.name}_bucket{{{label},le="{bound}"}} {count}')
+            lines.append(f'{self.name}_bucket{{{label},le="+Inf"}} {data["count"]}')
+            lines.append(f'{self.name}_sum{{{label}}} {data["sum"]:.6f}')
+            lines.append(f'{self.name}_count{{{label}}} {data["count"]}')
+        return lines
+
+
+def escape_label(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+stage_seconds = Histogram('token_render_stage_seconds', 'Time spent in each token render stage.', 'stage')
+request_seconds = Histogram('token_http_request_seconds', 'HTTP request latency by endpoint.', 'endpoint')
+
+_collectors = []
+# Stage times of the request being handled on this thread/context, or None outside one
+_timings = contextvars.ContextVar('render_timings', default=None)
+
+
+@contextlib.contextmanager
+def stage(name):
+    """Time a block as one render stage"""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - start
+        stage_seconds.observe(name, elapsed)
+        timings = _timings.get()
+        if timings is not None:
+            timings[name] = timings.get(name, 0.0) + elapsed
+
+
+@contextlib.contextmanager
+def collect_timings():
+    """Gather the stage times of the enclosed block into the yielded dict, outside a request"""
+    timings = {}
+    token = _timings.set(timings)
+    try:
+        yield timings
+    finally:
+        _timings.reset(token)
+
+
+def register_collector(collect):
+    """Add a callable returning extra metric families for /metrics.
+
+    collect() returns a list of (name, type, help, [(labels dict, value), ...]).
+    """
+    _collectors.append(collect)
+
+
+def prometheus_text():
+    """Every metric in the Prometheus text exposition format"""
+    lines = stage_seconds.prometheus_lines() + request_seconds.prometheus_lines()
+    for collect in _collectors:
+        for name, metric_type, help, samples in collect():
+            lines.append(f'# HELP {name} {help}')
+            lines.append(f'# TYPE {name} {metric_type}')
+            for labels, value in samples:
+                label_text = ','.join(f'{key}="{escape_label(val)}"' for key, val in sorted(labels.items()))
+                lines.append(f'{name}{{{label_text}}} {value}' if label_text else f'{name} {value}')
+    return '\n'.join(lines) + '\n'
+
+
+def server_timing(timings, total=None):
+    """Server-Timing header value for a dict of stage -> seconds"""
+    entries = [f'{name};dur={seconds * 1000:.1f}' for name, seconds in timings.items()]
+    if total is not None:
+        entries.append(f'total;dur={total * 1000:.1f}')
+    return ', '.join(entries)
+
+
+def init_metrics(app, timing_header=False, profile_dir=None, profile_sample_rate=0.0):
+    """Time every request of a Flask app, and optionally add timing headers and profiles.
+
+    Stage timings are returned when timing_header is set or the request carries an
+    X-Render-Timing header. With profile_dir set, requests with ?profile=1 (plus a
+    random profile_sample_rate fraction of all requests) run under cProfile and their
+    stats are written there as <time>-<endpoint>-<pid>.prof.
+    """
+
+    @app.before_request
+    def start_request():
+        g.metrics_start = time.perf_counter()
+        g.metrics_timings = {}
+        _timings.set(g.metrics_timings)
+        g.metrics_profile = None
+        if profile_dir and (request.args.get('profile') == '1'
+                            or (profile_sample_rate and random.random() < profile_sample_rate)):
+            g.metrics_profile = cProfile.Profile()
+            g.metrics_profile.enable()
+
+    @app.after_request
+    def finish_request(response):
+        start = g.pop('metrics_start', None)
+        if start is None:
+            return response
+        elapsed = time.perf_counter() - start
+        _timings.set(None)
+        request_seconds.observe(request.endpoint or 'unmatched', elapsed)
+
+        profile = g.pop('metrics_profile', None)
+        if profile is not None:
+            profile.disable()
+            os.makedirs(profile_dir, exist_ok=True)
+            filename = f'{int(time.time() * 1000)}-{request.endpoint or "unmatched"}-{os.getpid()}.prof'
+            profile.dump_stats(os.path.join(profile_dir, filename))
+            response.headers['X-Profile'] = filename
+
+        timings = g.pop('metrics_timings', None)
+        if timings and (timing_header or 'X-Render-Timing' in request.headers):
+            response.headers['Server-Timing'] = server_timing(timings, elapsed)
+            response.headers['X-Render-Timing'] = json.dumps(
+                {name: round(seconds * 1000, 1) for name, seconds in timings.items()})
+        return response
+
+    @app.teardown_request
+    def clear_request(error=None):
+        # Worker threads are reused, so never leak one request's timings into the next
+        _timings.set(None)
+
+    return app
@@ -0,0 +1,110 @@
+"""
+In-process card name index for autocomplete
+Normalized names live in one sorted list, so prefix matches are a bisect, and an
+inverted index from word trigrams to compact array('I') postings finds names that
+contain the query or are a near-miss spelling of it. Only slim (id, name, type_line)
+records are held and max_names caps how many names are indexed.
+"""
+
+import math
+from array import array
+from bisect import bisect_left
+from collections import Counter
+
+from bulk_store import normalize_name
+
+
+def trigrams(text):
+    """Word trigrams, padded so word starts and ends count ("  e", " es", ..., "er ")"""
+    grams = set()
+    for word in text.split():
+        padded = f'  {word} '
+        grams.update(padded[i:i + 3] for i in range(len(padded) - 2))
+    return grams
+
+
+class NameIndex:
+    """Prefix, substring and fuzzy lookups over a fixed set of card names"""
+
+    def __init__(self, records, max_names=100000):
+        entries = {}
+        for card_id, name, type_line in records:
+            key = normalize_name(name)
+            if key and key not in entries:
+                entries[key] = (card_id, name, type_line or '')
+                if len(entries) >= max_names:
+                    break
+
+        self._keys = sorted(entries)
+        self._records = [entries[key] for key in self._keys]
+        self._gram_counts = array('I')
+        postings = {}
+        for position, key in enumerate(self._keys):
+            grams = trigrams(key)
+            self._gram_counts.append(len(grams))
+            for gram in grams:
+                postings.setdefault(gram, array('I')).append(position)
+        self._postings = postings
+
+    def __len__(self):
+        return len(self._keys)
+
+    def search(self, query, limit=10, min_score=0.5):
+        """Best matches for query as slim card dicts.
+
+        Names starting with the query come first (alphabetically), then names
+        containing it, then fuzzy matches sharing at least min_score of the query's
+        trigrams.
+        """
+        query = normalize_name(query)
+        if not query or limit <= 0:
+            return []
+
+        positions = self._prefix_matches(query, limit)
+        if len(positions) < limit and len(query) >= 3:
+            positions += self._trigram_matches(query, limit - len(positions), set(positions), min_score)
+
+        return [self._record(position) for position in positions]
+
+    def _prefix_matches(self, query, limit):
+        start = bisect_left(self._keys, query)
+        end = min(start + limit, len(self._keys))
+        positions = []
+        for position in range(start, end):
+            if not self._keys[position].startswith(query):
+                break
+            positions.append(position)
+        return positions
+
+    def _trigram_matches(self, query, limit, exclude, min_score):
+        grams = trigrams(query)
+        shared = Counter()
+        for gram in grams:
+            postings = self._postings.get(gram)
+            if postings is not None:
+                shared.update(postings)
+
+        # Cheap pre-filter: a fuzzy match needs min_score of the query's trigrams, and a
+        # name containing the query has at least all of its letters-only trigrams
+        needed = min(math.ceil(min_score * len(grams)), sum(1 for gram in grams if ' ' not in gram))
+        scored = []
+        for position, count in shared.items():
+            if count < needed or position in exclude:
+                continue
+            key = self._keys[position]
+            if query in key:
+                # Substring matches beat fuzzy ones; shorter names first
+                rank = (2, len(query) / len(key))
+            else:
+                coverage = count / len(grams)
+                if coverage < min_score:
+                    continue
+                rank = (1, coverage, count / (len(grams) + self._gram_counts[position] - count))
+            scored.append((rank, position))
+
+        scored.sort(key=lambda item: (item[0], -item[1]), reverse=True)
+        return [position for _, position in scored[:limit]]
+
+    def _record(self, position):
+        card_id, name, type_line = self._records[position]
+        return {'id': card_id, 'name': name, 'type_line': type_line}
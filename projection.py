@@ -0,0 +1,71 @@
+"""
+Field projection for card JSON
+Scryfall card objects carry legalities, prices, every image size and more; API
+responses only include the fields a client asks for with ?fields=a,b.c (dotted paths
+descend into objects and into every element of lists such as card_faces), or a
+compact default set covering what the frontend shows. fields=* returns whole cards.
+"""
+
+import re
+
+DEFAULT_FIELDS = (
+    'id',
+    'name',
+    'mana_cost',
+    'type_line',
+    'colors',
+    'image_uris.small',
+    'card_faces.name',
+    'card_faces.image_uris.small',
+)
+
+_FIELD = re.compile(r'[a-z0-9_]+(\.[a-z0-9_]+)*')
+
+_default_tree = None
+
+
+def parse_fields(param):
+    """Projection tree for a fields= value (None for whole cards).
+
+    Raises ValueError for a malformed field list.
+    """
+    global _default_tree
+    if param is None or not param.strip():
+        if _default_tree is None:
+            _default_tree = build_tree(DEFAULT_FIELDS)
+        return _default_tree
+    if param.strip() == '*':
+        return None
+
+    fields = [field.strip() for field in param.split(',') if field.strip()]
+    for field in fields:
+        if not _FIELD.fullmatch(field):
+            raise ValueError(f'Invalid field: {field}')
+    return build_tree(fields)
+
+
+def build_tree(fields):
+    """Turn dotted paths into a nested dict; True marks a field kept whole"""
+    tree = {}
+    for field in fields:
+        node = tree
+        parts = field.split('.')
+        for part in parts[:-1]:
+            child = node.get(part)
+            if child is True:
+                break  # a parent is already kept whole
+            node = node.setdefault(part, {})
+        else:
+            node[parts[-1]] = True
+    return tree
+
+
+def project(value, tree):
+    """Keep only the parts of value named by tree (a tree of None keeps everything)"""
+    if tree is None or tree is True:
+        return value
+    if isinstance(value, list):
+        return [project(item, tree) for item in value]
+    if not isinstance(value, dict):
+        return value
+    return {key: project(value[key], subtree) for key, subtree in tree.items() if key in value}
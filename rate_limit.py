@@ -0,0 +1,163 @@
+"""
+Rate limiting for Scryfall API traffic
+Scryfall asks clients to stay around 10 requests per second. RequestScheduler hands
+out tokens from a token bucket to waiting requests in priority order (interactive
+searches before batch renders), tracks queue depth, and fails fast with a Retry-After
+estimate when a lane is too deep to be served in reasonable time. The bucket can live
+in a shared file so several worker processes split one budget.
+"""
+
+import os
+import struct
+import threading
+import time
+from collections import deque
+
+try:
+    import fcntl
+except ImportError:  # Windows: only the in-process bucket is available
+    fcntl = None
+
+# Lanes in priority order: the first non-empty lane is always served first
+PRIORITIES = ('interactive', 'batch')
+
+
+class UpstreamBusy(Exception):
+    """Raised instead of queueing when the upstream queue is too deep"""
+
+    def __init__(self, retry_after):
+        self.retry_after = retry_after
+        super().__init__(f'Upstream is busy, retry after {retry_after:.1f}s')
+
+
+class TokenBucket:
+    """In-process token bucket"""
+
+    def __init__(self, rate, burst):
+        self.rate = rate
+        self.burst = burst
+        self._tokens = burst
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def try_take(self):
+        """Take a token; return 0 on success or the seconds until one is available"""
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            if self._tokens >= 1:
+                self._tokens -= 1
+                return 0
+            return (1 - self._tokens) / self.rate
+
+
+class FileTokenBucket:
+    """Token bucket whose state lives in a locked file shared between processes"""
+
+    _STATE = struct.Struct('dd')  # tokens, wall-clock time of last update
+
+    def __init__(self, path, rate, burst):
+        if fcntl is None:
+            raise RuntimeError('A shared rate limit file needs fcntl (POSIX only)')
+        self.path = path
+        self.rate = rate
+        self.burst = burst
+        self._lock = threading.Lock()
+
+    def try_take(self):
+        with self._lock:
+            fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+            try:
+                fcntl.flock(fd, fcntl.LOCK_EX)
+                data = os.pread(fd, self._STATE.size, 0)
+                now = time.time()
+                if len(data) == self._STATE.size:
+                    tokens, updated = self._STATE.unpack(data)
+                    tokens = min(self.burst, tokens + max(0, now - updated) * self.rate)
+                else:
+                    tokens = self.burst
+
+                wait = 0
+                if tokens >= 1:
+                    tokens -= 1
+                else:
+                    wait = (1 - tokens) / self.rate
+                os.pwrite(fd, self._STATE.pack(tokens, now), 0)
+                return wait
+            finally:
+                os.close(fd)  # also releases the flock
+
+
+class RequestScheduler:
+    """Priority queue in front of a token bucket"""
+
+    def __init__(self, rate=10, burst=10, max_queue=100, max_wait=5.0, shared_file=None):
+        self.rate = rate
+        self.max_queue = max_queue
+        self.max_wait = max_wait
+        if shared_file:
+            self.bucket = FileTokenBucket(shared_file, rate, burst)
+        else:
+            self.bucket = TokenBucket(rate, burst)
+        self._lanes = {priority: deque() for priority in PRIORITIES}
+        self._condition = threading.Condition()
+        self._counters = {'granted': 0, 'rejected': 0, 'wait_seconds': 0.0}
+        self._max_depth = {priority: 0 for priority in PRIORITIES}
+
+    def acquire(self, priority='interactive'):
+        """Block until this request may go upstream, or raise UpstreamBusy"""
+        if priority not in self._lanes:
+            raise ValueError(f'Unknown priority: {priority}')
+
+        start = time.monotonic()
+        with self._condition:
+            ahead = self._queued_ahead(priority)
+            estimated_wait = (ahead + 1) / self.rate
+            if len(self._lanes[priority]) >= self.max_queue or estimated_wait > self.max_wait:
+                self._counters['rejected'] += 1
+                raise UpstreamBusy(estimated_wait)
+
+            ticket = object()
+            lane = self._lanes[priority]
+            lane.append(ticket)
+            self._max_depth[priority] = max(self._max_depth[priority], len(lane))
+            try:
+                while True:
+                    if self._is_next(ticket):
+                        wait = self.bucket.try_take()
+                        if wait == 0:
+                            break
+                        self._condition.wait(wait)
+                    else:
+                        self._condition.wait()
+            finally:
+                lane.remove(ticket)
+                self._condition.notify_all()
+
+            self._counters['granted'] += 1
+            self._counters['wait_seconds'] += time.monotonic() - start
+
+    def stats(self):
+        """Return queue depths and grant/reject counters"""
+        with self._condition:
+            stats = dict(self._counters)
+            stats['queue_depth'] = {priority: len(lane) for priority, lane in self._lanes.items()}
+            stats['max_queue_depth'] = dict(self._max_depth)
+        stats['rate'] = self.rate
+        return stats
+
+    def _is_next(self, ticket):
+        for priority in PRIORITIES:
+            if self._lanes[priority]:
+                return self._lanes[priority][0] is ticket
+        return False
+
+    def _queued_ahead(self, priority):
+        """Requests that will be served before a new one in this lane"""
+        ahead = 0
+        for lane_priority in PRIORITIES:
+            ahead += len(self._lanes[lane_priority])
+            if lane_priority == priority:
+                break
+        return ahead
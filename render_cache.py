@@ -0,0 +1,83 @@
+"""
+Cache for rendered token images
+Rendered PNGs are keyed by a canonical hash of every input that affects the pixels
+(card, text fields, art URL and the frame/font files themselves), kept in a small
+in-memory LRU and backed by an on-disk DiskCache.
+"""
+
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+
+from disk_cache import DiskCache
+
+# Bump when a renderer change alters the output for the same inputs
+RENDERER_REVISION = 4
+
+
+def render_key(params):
+    """Canonical hash of a dict of render parameters"""
+    canonical = json.dumps(params, sort_keys=True, separators=(',', ':'), ensure_ascii=False)
+    return hashlib.sha256(canonical.encode('utf-8')).hexdigest()
+
+
+class RenderCache:
+    """Two-level (memory, then disk) cache of encoded token images"""
+
+    def __init__(self, directory, max_memory_bytes=64 * 1024 * 1024, max_disk_bytes=1024 * 1024 * 1024):
+        self.max_memory_bytes = max_memory_bytes
+        self.disk = DiskCache(directory, max_bytes=max_disk_bytes, suffix='.img')
+        self._memory = OrderedDict()
+        self._memory_bytes = 0
+        self._lock = threading.Lock()
+        self._counters = {'memory_hits': 0, 'disk_hits': 0, 'misses': 0, 'memory_evictions': 0}
+
+    def get(self, key):
+        """Return the cached image bytes for key, or None on a miss"""
+        with self._lock:
+            data = self._memory.get(key)
+            if data is not None:
+                self._memory.move_to_end(key)
+                self._counters['memory_hits'] += 1
+                return data
+
+        data = self.disk.get(key)
+        with self._lock:
+            if data is None:
+                self._counters['misses'] += 1
+                return None
+            self._counters['disk_hits'] += 1
+        self._remember(key, data)
+        return data
+
+    def put(self, key, data):
+        """Store encoded image bytes in memory and on disk"""
+        self._remember(key, data)
+        self.disk.put(key, data)
+
+    def stats(self):
+        """Return a snapshot of the cache counters"""
+        with self._lock:
+            stats = dict(self._counters)
+            stats['memory_entries'] = len(self._memory)
+            stats['memory_bytes'] = self._memory_bytes
+        stats['max_memory_bytes'] = self.max_memory_bytes
+        stats['disk'] = self.disk.stats()
+        lookups = stats['memory_hits'] + stats['disk_hits'] + stats['misses']
+        stats['hit_rate'] = (stats['memory_hits'] + stats['disk_hits']) / lookups if lookups else 0.0
+        return stats
+
+    def _remember(self, key, data):
+        if len(data) > self.max_memory_bytes:
+            return
+        with self._lock:
+            previous = self._memory.pop(key, None)
+            if previous is not None:
+                self._memory_bytes -= len(previous)
+            self._memory[key] = data
+            self._memory_bytes += len(data)
+            while self._memory_bytes > self.max_memory_bytes:
+                _, evicted = self._memory.popitem(last=False)
+                self._memory_bytes -= len(evicted)
+                self._counters['memory_evictions'] += 1
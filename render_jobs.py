@@ -0,0 +1,152 @@
+"""
+Asynchronous render jobs
+Clients submit a token render and poll for it instead of holding a web worker for the
+whole render. A fixed set of dispatcher threads feeds the jobs to the render function
+(which hands the CPU work to the shared process pool), the number of queued jobs is
+capped so bursts get a fast 503 instead of an ever-growing backlog, and identical
+pending renders are coalesced into one job. Finished jobs keep only metadata and
+timings; the image itself lives in the render cache.
+"""
+
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+QUEUED = 'queued'
+RUNNING = 'running'
+DONE = 'done'
+FAILED = 'failed'
+
+
+class JobQueueFull(Exception):
+    """Raised by submit when too many jobs are already waiting"""
+
+    def __init__(self, retry_after):
+        self.retry_after = retry_after
+        super().__init__(f'Render queue is full, retry after {retry_after:.1f}s')
+
+
+class RenderJob:
+    """One submitted render and its timings"""
+
+    def __init__(self, key, spec, mimetype):
+        self.id = uuid.uuid4().hex
+        self.key = key
+        self.spec = spec
+        self.mimetype = mimetype
+        self.status = QUEUED
+        self.error = None
+        self.submitted = time.time()
+        self.started = None
+        self.finished = None
+        self.done = threading.Event()
+
+    def to_dict(self):
+        """Status document for the job API"""
+        data = {'id': self.id, 'status': self.status, 'submitted_at': self.submitted}
+        if self.started is not None:
+            data['queue_ms'] = round((self.started - self.submitted) * 1000, 1)
+        if self.finished is not None:
+            data['render_ms'] = round((self.finished - self.started) * 1000, 1)
+            data['total_ms'] = round((self.finished - self.submitted) * 1000, 1)
+        if self.error:
+            data['error'] = self.error
+        return data
+
+
+class RenderJobs:
+    """Bounded queue of render jobs served by a few dispatcher threads.
+
+    render(spec) does the actual work (and stores the result under the job's key);
+    it is called from a dispatcher thread.
+    """
+
+    def __init__(self, render, workers=2, max_pending=64, max_finished=1024):
+        self.render = render
+        self.workers = workers
+        self.max_pending = max_pending
+        self.max_finished = max_finished
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='render-job')
+        self._lock = threading.Lock()
+        self._jobs = OrderedDict()  # id -> job, oldest first
+        self._active = {}  # key -> unfinished job, for coalescing
+        self._pending = 0
+        self._finished = 0
+        self._counters = {'submitted': 0, 'coalesced': 0, 'rejected': 0, 'completed': 0, 'failed': 0,
+                          'queue_seconds': 0.0, 'render_seconds': 0.0}
+
+    def submit(self, key, spec, mimetype):
+        """Queue a render (or join an identical unfinished one) and return its job"""
+        with self._lock:
+            job = self._active.get(key)
+            if job is not None:
+                self._counters['coalesced'] += 1
+                return job
+
+            if self._pending >= self.max_pending:
+                self._counters['rejected'] += 1
+                raise JobQueueFull(self._estimated_wait())
+
+            job = RenderJob(key, spec, mimetype)
+            self._jobs[job.id] = job
+            self._active[key] = job
+            self._pending += 1
+            self._counters['submitted'] += 1
+
+        self._executor.submit(self._run, job)
+        return job
+
+    def get(self, job_id):
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._counters)
+            stats['pending'] = self._pending
+            stats['running'] = sum(1 for job in self._active.values() if job.status == RUNNING)
+        stats['workers'] = self.workers
+        stats['max_pending'] = self.max_pending
+        finished = stats['completed'] + stats['failed']
+        stats['avg_queue_ms'] = stats['queue_seconds'] / finished * 1000 if finished else 0.0
+        stats['avg_render_ms'] = stats['render_seconds'] / finished * 1000 if finished else 0.0
+        return stats
+
+    def shutdown(self, wait=True):
+        self._executor.shutdown(wait=wait)
+
+    def _run(self, job):
+        job.started = time.time()
+        job.status = RUNNING
+        try:
+            self.render(job.spec)
+            status, error = DONE, None
+        except Exception as e:
+            status, error = FAILED, str(e)
+
+        with self._lock:
+            job.finished = time.time()
+            job.error = error
+            job.status = status
+            self._pending -= 1
+            self._active.pop(job.key, None)
+            self._counters['completed' if status == DONE else 'failed'] += 1
+            self._counters['queue_seconds'] += job.started - job.submitted
+            self._counters['render_seconds'] += job.finished - job.started
+            job.done.set()
+            self._finished += 1
+            # Forget the oldest finished jobs once there are too many
+            while self._finished > self.max_finished:
+                oldest_id = next((job_id for job_id, old in self._jobs.items() if old.status in (DONE, FAILED)), None)
+                if oldest_id is None:
+                    break
+                del self._jobs[oldest_id]
+                self._finished -= 1
+
+    def _estimated_wait(self):
+        """Rough time until a queue slot frees up, from the average render time so far"""
+        finished = self._counters['completed'] + self._counters['failed']
+        average = self._counters['render_seconds'] / finished if finished else 1.0
+        return max(1.0, average * self._pending / self.workers)
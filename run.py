@@ -10,6 +10,7 @@ if __name__ == '__main__':
     print("🃏 Starting MTG Token Creator...")
     print("📱 Open your browser and go to: http://localhost:5000")
     print("⏹️  Press Ctrl+C to stop the server")
+    print("🏭 This is the development server; for production run: gunicorn -c gunicorn.conf.py")
     print("-" * 50)
     
     try:
@@ -0,0 +1,286 @@
+"""
+Local stand-in for the Scryfall API
+Serves a fixed set of card objects (and optional images) over HTTP so tests can run
+without touching api.scryfall.com. It can load the recorded cards and art_crop images
+in fixtures/, and simulate upstream latency (with jitter) and a random error rate for
+load tests. stubbed_app() points the app at a stub with throwaway caches for a test or
+benchmark. Run it directly to serve the fixtures on a fixed port.
+"""
+
+import argparse
+import contextlib
+import json
+import os
+import random
+import re
+import tempfile
+import threading
+import time
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures')
+# Image host used in recorded card JSON; rewritten to the stub's own URL on load
+SCRYFALL_IMAGE_HOST = 'https://cards.scryfall.io'
+
+
+def fixture_art_filename(path):
+    """File under fixtures/art for an art_crop path: /art_crop/front/a/b/<id>.jpg -> front-<id>.jpg"""
+    parts = path.strip('/').split('/')
+    return f'{parts[1]}-{parts[-1]}'
+
+
+def read_fixture_art(art_url, directory=FIXTURES_DIR):
+    """Recorded art for an art_crop URL, whichever host the URL points at"""
+    with open(os.path.join(directory, 'art', fixture_art_filename(urlparse(art_url).path)), 'rb') as f:
+        return f.read()
+
+
+class ScryfallStub:
+    """Minimal Scryfall-compatible server running on a background thread"""
+
+    def __init__(self, cards=None, images=None, latency=0.0, host='127.0.0.1', port=0,
+                 jitter=0.0, error_rate=0.0, seed=None):
+        self.cards = list(cards or [])
+        self.images = dict(images or {})  # path -> (content_type, bytes)
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.errors = 0
+        self._random = random.Random(seed)
+        self.hits = Counter()
+        self.connections = 0
+        self._failures = {}  # path -> list of (status, headers) to answer with next
+        self._hits_lock = threading.Lock()
+        self._server = ThreadingHTTPServer((host, port), self._make_handler())
+        self._server.daemon_threads = True
+        self._thread = None
+
+    @property
+    def url(self):
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self):
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+    def load_fixtures(self, directory=FIXTURES_DIR):
+        """Serve the recorded cards and art in directory, pointing image URLs at this stub"""
+        with open(os.path.join(directory, 'cards.json'), encoding='utf-8') as f:
+            text = f.read()
+        cards = json.loads(text.replace(SCRYFALL_IMAGE_HOST, self.url))
+        self.cards.extend(cards)
+        for card in cards:
+            for face in [card] + card.get('card_faces', []):
+                art_url = face.get('image_uris', {}).get('art_crop')
+                if not art_url:
+                    continue
+                self.images[urlparse(art_url).path] = ('image/jpeg', read_fixture_art(art_url, directory))
+        return cards
+
+    def count(self, path):
+        """Number of requests seen for a path (without query string)"""
+        with self._hits_lock:
+            return self.hits[path]
+
+    def fail(self, path, status, headers=None, times=1):
+        """Answer the next `times` requests for path with an error status"""
+        with self._hits_lock:
+            self._failures.setdefault(path, []).extend([(status, headers or {})] * times)
+
+    def search(self, query):
+        """Very small subset of Scryfall search syntax: name:"..." exact or substring match"""
+        match = re.fullmatch(r'name:"(.*)"', query)
+        if match:
+            wanted = match.group(1).lower()
+            return [card for card in self.cards if card['name'].lower() == wanted]
+        wanted = query.lower()
+        return [card for card in self.cards if wanted in card['name'].lower()]
+
+    def find(self, identifier):
+        """Resolve a /cards/collection identifier ({'id': ...} or {'name': ...})"""
+        for card in self.cards:
+            if 'id' in identifier and card['id'] == identifier['id']:
+                return card
+            if 'name' in identifier and card['name'].lower() == identifier['name'].lower():
+                return card
+        return None
+
+    def _record(self, path):
+        """Count a request and return a queued failure for it, if any"""
+        with self._hits_lock:
+            self.hits[path] += 1
+            failures = self._failures.get(path)
+            if failures:
+                return failures.pop(0)
+            if self.error_rate and self._random.random() < self.error_rate:
+                self.errors += 1
+                return (503, {})
+            return None
+
+    def _delay(self):
+        with self._hits_lock:
+            return self.latency + (self._random.uniform(0, self.jitter) if self.jitter else 0.0)
+
+    def _make_handler(self):
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            # Keep-alive, so clients can reuse pooled connections
+            protocol_version = 'HTTP/1.1'
+
+            def log_message(self, format, *args):
+                pass
+
+            def setup(self):
+                super().setup()
+                with stub._hits_lock:
+                    stub.connections += 1
+
+            def _begin(self):
+                """Count the request, simulate latency and send any queued failure"""
+                parsed = urlparse(self.path)
+                failure = stub._record(parsed.path)
+                delay = stub._delay()
+                if delay:
+                    time.sleep(delay)
+                if failure is not None:
+                    status, headers = failure
+                    body = json.dumps({'object': 'error', 'status': status}).encode('utf-8')
+                    self.send_response(status)
+                    for name, value in headers.items():
+                        self.send_header(name, value)
+                    self.send_header('Content-Type', 'application/json')
+                    self.send_header('Content-Length', str(len(body)))
+                    self.end_headers()
+                    self.wfile.write(body)
+                    return None
+                return parsed
+
+            def do_GET(self):
+                parsed = self._begin()
+                if parsed is None:
+                    return
+
+                if parsed.path in stub.images:
+                    content_type, body = stub.images[parsed.path]
+                    return self._send(200, body, content_type)
+
+                if parsed.path == '/cards/search':
+                    query = parse_qs(parsed.query).get('q', [''])[0]
+                    found = stub.search(query)
+                    if not found:
+                        return self._not_found()
+                    return self._json(200, {
+                        'object': 'list',
+                        'total_cards': len(found),
+                        'has_more': False,
+                        'data': found,
+                    })
+
+                match = re.fullmatch(r'/cards/([^/]+)', parsed.path)
+                if match:
+                    for card in stub.cards:
+                        if card['id'] == match.group(1):
+                            return self._json(200, card)
+
+                return self._not_found()
+
+            def do_POST(self):
+                length = int(self.headers.get('Content-Length', 0))
+                body = self.rfile.read(length)
+                parsed = self._begin()
+                if parsed is None:
+                    return
+
+                if parsed.path != '/cards/collection':
+                    return self._not_found()
+
+                identifiers = json.loads(body or b'{}').get('identifiers', [])
+                found, not_found = [], []
+                for identifier in identifiers:
+                    card = stub.find(identifier)
+                    if card is None:
+                        not_found.append(identifier)
+                    else:
+                        found.append(card)
+                return self._json(200, {'object': 'list', 'not_found': not_found, 'data': found})
+
+            def _not_found(self):
+                self._json(404, {'object': 'error', 'code': 'not_found', 'status': 404})
+
+            def _json(self, status, payload):
+                self._send(status, json.dumps(payload).encode('utf-8'), 'application/json')
+
+            def _send(self, status, body, content_type):
+                self.send_response(status)
+                self.send_header('Content-Type', content_type)
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+        return Handler
+
+
+@contextlib.contextmanager
+def stubbed_app(stub):
+    """Yield the app module pointed at stub with empty, temporary art and render caches.
+
+    The Scryfall URL and the caches are put back afterwards, and the cards looked up
+    from the stub are dropped with it.
+    """
+    import app as token_app
+    from art_cache import ArtCache
+    from render_cache import RenderCache
+
+    originals = token_app.SCRYFALL_BASE_URL, token_app.art_cache, token_app.render_cache
+    with tempfile.TemporaryDirectory() as directory:
+        token_app.SCRYFALL_BASE_URL = stub.url
+        token_app.card_cache.clear()
+        token_app.art_cache = ArtCache(os.path.join(directory, 'art'))
+        token_app.render_cache = RenderCache(os.path.join(directory, 'renders'))
+        try:
+            yield token_app
+        finally:
+            token_app.SCRYFALL_BASE_URL, token_app.art_cache, token_app.render_cache = originals
+            token_app.card_cache.clear()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Serve recorded Scryfall fixtures locally')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8081)
+    parser.add_argument('--fixtures', default=FIXTURES_DIR, help='directory with cards.json and art/')
+    parser.add_argument('--latency', type=float, default=0.0, help='seconds added to every response')
+    parser.add_argument('--jitter', type=float, default=0.0, help='extra random latency, up to this many seconds')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='fraction of requests answered with 503')
+    args = parser.parse_args(argv)
+
+    stub = ScryfallStub(host=args.host, port=args.port, latency=args.latency, jitter=args.jitter,
+                        error_rate=args.error_rate)
+    cards = stub.load_fixtures(args.fixtures)
+    print(f"🧪 Serving {len(cards)} fixture cards at {stub.url} (set SCRYFALL_BASE_URL to this)")
+    try:
+        stub._server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        stub._server.server_close()
+
+
+if __name__ == '__main__':
+    main()
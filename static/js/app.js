@@ -3,6 +3,11 @@
 class TokenCreator {
     constructor() {
         this.selectedCard = null;
+        this.suggestTimer = null;
+        this.suggestRequest = null;
+        this.previewTimer = null;
+        this.previewRequest = null;
+        this.previewUrl = null;
         this.initializeEventListeners();
     }
 
@@ -12,9 +17,13 @@ class TokenCreator {
         document.getElementById('cardSearch').addEventListener('keypress', (e) => {
             if (e.key === 'Enter') this.searchCards();
         });
+        document.getElementById('cardSearch').addEventListener('input', () => this.scheduleSuggestions());
 
         // Token generation
         document.getElementById('generateTokenBtn').addEventListener('click', () => this.generateToken());
+        ['power', 'toughness', 'subtype'].forEach(id => {
+            document.getElementById(id).addEventListener('input', () => this.schedulePreview());
+        });
 
         // Navigation
         document.getElementById('newTokenBtn').addEventListener('click', () => this.resetToSearch());
@@ -48,6 +57,45 @@ class TokenCreator {
         }
     }
 
+    scheduleSuggestions() {
+        // Wait for a pause in typing before asking for suggestions
+        clearTimeout(this.suggestTimer);
+        this.suggestTimer = setTimeout(() => this.updateSuggestions(), 120);
+    }
+
+    async updateSuggestions() {
+        const query = document.getElementById('cardSearch').value.trim();
+        const datalist = document.getElementById('cardSuggestions');
+        if (this.suggestionsUnavailable) return;
+        if (query.length < 2) {
+            datalist.innerHTML = '';
+            return;
+        }
+
+        // Only the latest keystroke's answer matters
+        if (this.suggestRequest) this.suggestRequest.abort();
+        this.suggestRequest = new AbortController();
+
+        try {
+            const response = await fetch(`/api/autocomplete?q=${encodeURIComponent(query)}&limit=8`,
+                                         { signal: this.suggestRequest.signal });
+            // 501: the server has no local card index, so don't ask again
+            if (response.status === 501) this.suggestionsUnavailable = true;
+            if (!response.ok) return;
+            const data = await response.json();
+
+            datalist.innerHTML = '';
+            data.cards.forEach(card => {
+                const option = document.createElement('option');
+                option.value = card.name;
+                option.label = card.type_line;
+                datalist.appendChild(option);
+            });
+        } catch (error) {
+            if (error.name !== 'AbortError') console.error('Autocomplete error:', error);
+        }
+    }
+
     displaySearchResults(cards) {
         const resultsContainer = document.getElementById('searchResults');
         const resultsList = document.getElementById('resultsList');
@@ -98,6 +146,54 @@ class TokenCreator {
         
         // Scroll to customization section
         document.getElementById('customizationSection').scrollIntoView({ behavior: 'smooth' });
+        this.schedulePreview();
+    }
+
+    tokenRequest(extra = {}) {
+        return Object.assign({
+            card_name: this.selectedCard.name,
+            power: document.getElementById('power').value.trim(),
+            toughness: document.getElementById('toughness').value.trim(),
+            subtype: document.getElementById('subtype').value.trim()
+        }, extra);
+    }
+
+    async fetchToken(tokenData, signal) {
+        return fetch('/api/token/generate', {
+            method: 'POST',
+            headers: {
+                'Content-Type': 'application/json'
+            },
+            body: JSON.stringify(tokenData),
+            signal: signal
+        });
+    }
+
+    schedulePreview() {
+        // Re-render the low-resolution preview once the user pauses typing
+        clearTimeout(this.previewTimer);
+        this.previewTimer = setTimeout(() => this.updatePreview(), 250);
+    }
+
+    async updatePreview() {
+        if (!this.selectedCard) return;
+
+        if (this.previewRequest) this.previewRequest.abort();
+        this.previewRequest = new AbortController();
+
+        try {
+            const response = await this.fetchToken(this.tokenRequest({ preview: true, format: 'webp' }),
+                                                   this.previewRequest.signal);
+            if (!response.ok) return;
+            const blob = await response.blob();
+
+            if (this.previewUrl) URL.revokeObjectURL(this.previewUrl);
+            this.previewUrl = URL.createObjectURL(blob);
+            document.getElementById('livePreviewImage').src = this.previewUrl;
+            document.getElementById('livePreview').classList.remove('hidden');
+        } catch (error) {
+            if (error.name !== 'AbortError') console.error('Preview error:', error);
+        }
     }
 
     async generateToken() {
@@ -106,31 +202,21 @@ class TokenCreator {
             return;
         }
 
-        const tokenData = {
-            card_name: this.selectedCard.name,
-            power: document.getElementById('power').value.trim(),
-            toughness: document.getElementById('toughness').value.trim(),
-            subtype: document.getElementById('subtype').value.trim()
-        };
+        // Show a quick preview render; the full-resolution token is only rendered on download
+        const tokenData = this.tokenRequest({ preview: true });
 
         this.showLoading(true);
         this.hideAllSections();
 
         try {
-            const response = await fetch('/api/token/generate', {
-                method: 'POST',
-                headers: {
-                    'Content-Type': 'application/json'
-                },
-                body: JSON.stringify(tokenData)
-            });
+            const response = await this.fetchToken(tokenData);
 
             if (response.ok) {
                 const blob = await response.blob();
                 const imageUrl = URL.createObjectURL(blob);
                 
-                // Store the blob for download
-                this.generatedTokenBlob = blob;
+                // Remember what was generated so the download matches it
+                this.generatedTokenData = this.tokenRequest();
                 
                 this.displayToken(imageUrl);
             } else {
@@ -153,25 +239,42 @@ class TokenCreator {
         document.getElementById('previewSection').scrollIntoView({ behavior: 'smooth' });
     }
 
-    downloadToken() {
-        if (!this.generatedTokenBlob) {
+    async downloadToken() {
+        if (!this.generatedTokenData) {
             this.showError('No token to download.');
             return;
         }
 
-        const url = URL.createObjectURL(this.generatedTokenBlob);
-        const a = document.createElement('a');
-        a.href = url;
-        a.download = `mtg-token-${Date.now()}.png`;
-        document.body.appendChild(a);
-        a.click();
-        document.body.removeChild(a);
-        URL.revokeObjectURL(url);
+        this.showLoading(true);
+        try {
+            const response = await this.fetchToken(this.generatedTokenData);
+            if (!response.ok) {
+                const errorData = await response.json();
+                this.showError(errorData.error || 'Failed to generate token.');
+                return;
+            }
+            const blob = await response.blob();
+
+            const url = URL.createObjectURL(blob);
+            const a = document.createElement('a');
+            a.href = url;
+            a.download = `mtg-token-${Date.now()}.png`;
+            document.body.appendChild(a);
+            a.click();
+            document.body.removeChild(a);
+            URL.revokeObjectURL(url);
+        } catch (error) {
+            console.error('Download error:', error);
+            this.showError('Failed to download token. Please try again.');
+        } finally {
+            this.showLoading(false);
+        }
     }
 
     resetToSearch() {
         this.selectedCard = null;
-        this.generatedTokenBlob = null;
+        this.generatedTokenData = null;
+        document.getElementById('livePreview').classList.add('hidden');
         
         // Clear form
         document.getElementById('cardSearch').value = '';
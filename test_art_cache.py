@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+"""
+Test script for the on-disk art cache
+Renders tokens against a local Scryfall stub and checks repeat renders are network-free
+"""
+
+import io
+import os
+import tempfile
+
+from PIL import Image
+
+import app as token_app
+from art_cache import ArtCache, decode_raw, encode_raw
+from disk_cache import DiskCache
+from scryfall_stub import ScryfallStub, stubbed_app
+
+
+def make_art_jpeg(size=(626, 457)):
+    """Small synthetic stand-in for a Scryfall art_crop"""
+    art = Image.linear_gradient('L').resize(size).convert('RGB')
+    buffer = io.BytesIO()
+    art.save(buffer, 'JPEG')
+    return buffer.getvalue()
+
+
+def make_card(stub_url):
+    return {
+        'object': 'card',
+        'id': 'grizzly-bears-id',
+        'name': 'Grizzly Bears',
+        'mana_cost': '{1}{G}',
+        'type_line': 'Creature — Bear',
+        'artist': 'Jeff A. Menges',
+        'image_uris': {'art_crop': f"{stub_url}/art/grizzly-bears.jpg?1562"},
+    }
+
+
+def run_with_stub(check):
+    """Call check(client, stub) with the app pointed at a stub serving Grizzly Bears"""
+    with ScryfallStub() as stub, stubbed_app(stub) as token_app:
+        stub.cards.append(make_card(stub.url))
+        stub.images['/art/grizzly-bears.jpg'] = ('image/jpeg', make_art_jpeg())
+        check(token_app.app.test_client(), stub)
+
+
+def test_disk_cache_round_trip_and_eviction():
+    """Values survive a new DiskCache instance and the oldest entries are evicted first"""
+    with tempfile.TemporaryDirectory() as directory:
+        cache = DiskCache(directory, max_bytes=2500)
+        cache.put('a', b'x' * 1000)
+        cache.put('b', b'y' * 1000)
+        os.utime(cache.path_for('a'), (1, 1))  # make 'a' the least recently used
+
+        reopened = DiskCache(directory, max_bytes=2500)
+        assert reopened.get('b') == b'y' * 1000
+
+        reopened.put('c', b'z' * 1000)
+        assert reopened.get('a') is None
+        assert reopened.get('c') == b'z' * 1000
+        assert reopened.stats()['evictions'] == 1
+        assert not [name for _, _, files in os.walk(directory) for name in files if name.startswith('.tmp-')]
+
+
+def test_size_cap_holds_across_instances():
+    """Caches sharing a directory, as gunicorn workers do, count each other's writes"""
+    with tempfile.TemporaryDirectory() as directory:
+        workers = [DiskCache(directory, max_bytes=1000), DiskCache(directory, max_bytes=1000)]
+        for i in range(40):
+            workers[i % 2].put(f'key-{i}', b'x' * 95)
+
+        on_disk = sum(os.path.getsize(os.path.join(root, name))
+                      for root, _, files in os.walk(directory) for name in files
+                      if name.endswith('.bin'))
+        assert on_disk <= 1000
+        assert all(worker.stats()['bytes'] <= 1000 for worker in workers)
+        # A new instance agrees with what is really on disk
+        assert DiskCache(directory, max_bytes=1000).stats()['bytes'] == on_disk
+
+
+def test_raw_encoding_round_trip():
+    """Pre-decoded art reads back pixel-identical"""
+    image = Image.linear_gradient('L').convert('RGB').resize((40, 30))
+    restored = decode_raw(encode_raw(image))
+    assert restored.mode == 'RGB'
+    assert restored.tobytes() == image.tobytes()
+    assert decode_raw(b'\xff\xd8not raw') is None
+
+
+def test_repeat_renders_skip_download():
+    """The second render of a card neither downloads nor decodes the art again"""
+    def check(client, stub):
+        # Different P/T so the second request can't be served from the render cache
+        payload = {'card_name': 'Grizzly Bears', 'power': '2', 'toughness': '2', 'subtype': 'Bear'}
+        first = client.post('/api/token/generate', json=payload)
+        second = client.post('/api/token/generate', json=dict(payload, power='3'))
+
+        assert first.status_code == 200
+        assert second.status_code == 200
+        assert first.data != second.data
+        assert stub.count('/art/grizzly-bears.jpg') == 1
+        assert token_app.art_cache.stats()['hits'] == 1
+
+    run_with_stub(check)
+
+
+def test_resized_copy_matches_direct_resize():
+    """Rendering from the cached resized art gives the same token as rendering from bytes"""
+    art_data = make_art_jpeg()
+    with tempfile.TemporaryDirectory() as directory:
+        cache = ArtCache(directory)
+        size = token_app.get_template().art_box[2:]
+        resize = lambda data: token_app.resize_art(data, size)
+        cache.get_resized_art('http://example/art.jpg', size, lambda: art_data, resize)
+        cached = cache.get_resized_art('http://example/art.jpg', size, lambda: art_data, resize)
+
+    args = ('Bear', '2', '2', 'Creature', 'Bear', '', '{1}{G}', 'Artist')
+    from_bytes = token_app.create_token(art_data, *args)
+    from_cache = token_app.create_token(cached, *args)
+    assert from_bytes.tobytes() == from_cache.tobytes()
+
+
+def test_resized_copies_never_evict_downloads():
+    """Raw resized copies are capped on their own, apart from the downloaded originals"""
+    art_data = make_art_jpeg((64, 48))
+    size = (120, 90)  # 43 KB of raw RGBA per copy against about 1 KB of JPEG
+    resize = lambda data: token_app.resize_art(data, size)
+    with tempfile.TemporaryDirectory() as directory:
+        cache = ArtCache(directory, max_bytes=100 * 1024, resized_max_bytes=100 * 1024)
+        urls = [f'http://example/art-{i}.jpg' for i in range(10)]
+        for url in urls:
+            cache.get_resized_art(url, size, lambda: art_data, resize)
+
+        stats = cache.stats()
+        assert stats['resized']['evictions'] > 0 and stats['resized']['bytes'] <= 100 * 1024
+        assert stats['originals']['evictions'] == 0
+        assert all(cache.store.get(f'art:{url}') == art_data for url in urls)
+
+
+if __name__ == '__main__':
+    for name, func in list(globals().items()):
+        if name.startswith('test_'):
+            func()
+            print(f"✅ {name}")
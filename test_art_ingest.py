@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""
+Test script for art decoding, cropping and resizing
+"""
+
+import io
+
+from PIL import Image, ImageChops, ImageFilter, ImageStat
+
+from art_ingest import crop_box, fit_art
+
+
+def jpeg(image, quality=95):
+    buffer = io.BytesIO()
+    image.save(buffer, 'JPEG', quality=quality)
+    return buffer.getvalue()
+
+
+def test_crop_box_keeps_aspect_ratio():
+    assert crop_box((600, 200), (100, 100)) == (200, 0, 400, 200)
+    assert crop_box((200, 600), (100, 100)) == (0, 200, 200, 400)
+    assert crop_box((626, 457), (626, 457)) == (0, 0, 626, 457)
+    left, top, right, bottom = crop_box((626, 457), (1708, 1266))
+    assert abs((right - left) / (bottom - top) - 1708 / 1266) < 1e-9
+
+
+def test_fit_art_crops_instead_of_stretching():
+    # Red | green | blue thirds: a centred square crop is all green
+    source = Image.new('RGB', (1200, 400), (255, 0, 0))
+    source.paste((0, 255, 0), (400, 0, 800, 400))
+    source.paste((0, 0, 255), (800, 0, 1200, 400))
+    art = fit_art(jpeg(source), (100, 100))
+    assert art.size == (100, 100) and art.mode == 'RGBA'
+    red, green, blue, alpha = ImageStat.Stat(art).mean
+    assert green > 240 and red < 15 and blue < 15 and alpha == 255
+
+    # Already the right size: returned as is (as RGBA)
+    assert fit_art(source.resize((50, 50)), (50, 50)).size == (50, 50)
+
+
+def test_odd_sized_jpeg_box_stays_inside_the_draft_image():
+    """Sources whose sides aren't multiples of the DCT scale still fit every art box"""
+    for source_size in ((5001, 3656), (4097, 3000)):
+        data = jpeg(Image.linear_gradient('L').resize(source_size).convert('RGB'), quality=50)
+        for size in ((1708, 1266), (427, 316), (400, 300)):
+            assert fit_art(data, size).size == size
+
+
+def test_large_jpeg_is_decoded_in_draft_mode():
+    source = Image.effect_noise((4000, 3000), 30).convert('RGB').filter(ImageFilter.GaussianBlur(4))
+    data = jpeg(source)
+
+    opened = Image.open(io.BytesIO(data))
+    art = fit_art(opened, (400, 300))
+    # libjpeg scaled the decode by 1/8: still at least the target, never full size
+    assert opened.size == (500, 375)
+    assert art.size == (400, 300)
+
+    # And the result matches a full-size decode + LANCZOS closely
+    reference = Image.open(io.BytesIO(data)).resize((400, 300), Image.Resampling.LANCZOS).convert('RGBA')
+    difference = ImageStat.Stat(ImageChops.difference(art, reference).convert('L')).mean[0]
+    assert difference < 2
+
+
+if __name__ == '__main__':
+    for name, func in list(globals().items()):
+        if name.startswith('test_'):
+            func()
+            print(f"✅ {name}")
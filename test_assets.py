@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""
+Test script for lazy asset loading and the application factory
+"""
+
+import json
+import os
+import subprocess
+import sys
+import threading
+
+import assets
+from assets import FrameRegistry
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+
+IMPORT_THEN_RENDER = '''
+import json, sys
+from PIL import Image
+import app, assets
+before = {'frames': app.frame_templates.loaded(), 'fonts': len(assets.loaded_fonts()),
+          'png_decoder': 'PIL.PngImagePlugin' in sys.modules,
+          'key': app.token_spec_key(app.token_spec({'name': 'Bear', 'image_uris': {'art_crop': 'http://example/art.jpg'}}, '2', '2', 'Bear'))}
+after_key = {'frames': app.frame_templates.loaded()}
+app.create_token(Image.new('RGB', (8, 8)), 'Bear', '2', '2', 'Creature', 'Bear', '', '')
+after_render = {'frames': app.frame_templates.loaded(), 'fonts': len(assets.loaded_fonts())}
+print(json.dumps([before, after_key, after_render]))
+'''
+
+
+def test_import_decodes_nothing_until_render():
+    # A fresh interpreter, so nothing loaded by other tests can leak in
+    result = subprocess.run([sys.executable, '-c', IMPORT_THEN_RENDER], cwd=ROOT,
+                            capture_output=True, text=True, check=True)
+    before, after_key, after_render = json.loads(result.stdout.splitlines()[-1])
+    assert before['frames'] == [] and before['fonts'] == 0
+    assert not before['png_decoder']
+    # Computing a render cache key uses the layout fingerprint without decoding the frame
+    assert before['key'] and after_key['frames'] == []
+    assert after_render['frames'] == ['black'] and after_render['fonts'] > 0
+
+
+def test_registry_loads_once_across_threads():
+    registry = FrameRegistry(os.path.join(ROOT, 'static', 'layouts'))
+    assert 'black' in registry and registry.loaded() == []
+    fingerprint = registry.fingerprint('black')
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(registry['black'])) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len(results) == 8 and all(template is results[0] for template in results)
+    assert registry.loaded() == ['black']
+    assert results[0].fingerprint == fingerprint
+
+    font = assets.load_font(results[0].fonts['title'].path, 10)
+    assert assets.load_font(results[0].fonts['title'].path, 10) is font
+
+
+def test_font_pool_is_bounded_and_counts_hits():
+    path = os.path.join(ROOT, 'static', 'fonts', 'Beleren2016-Bold.ttf')
+    pool = assets.FontPool(max_entries=2)
+    first = pool.get(path, 20)
+    assert pool.get(path, 20) is first
+    pool.get(path, 21)
+    pool.get(path, 22)  # evicts size 20, the least recently used
+    assert pool.loaded() == [(path, 21), (path, 22)]
+    assert pool.get(path, 20) is not first
+    stats = pool.stats()
+    assert (stats['hits'], stats['misses'], stats['evictions'], stats['size']) == (1, 4, 2, 2)
+    assert stats['hit_rate'] == 0.2 and stats['faces'] == 1
+
+    # Missing faces are probed once and fall back to the built-in font
+    assert pool.find_face('no-such-font.ttf', path) == path
+    assert pool.find_face('no-such-font.ttf') is None
+    assert pool.get(None, 24) is pool.get(None, 24)
+
+
+def test_create_app_builds_independent_apps():
+    import app as token_app
+    first, second = token_app.create_app(), token_app.create_app()
+    assert first is not second
+    stats = first.test_client().get('/api/cache/stats').get_json()
+    assert 'hit_rate' in stats['fonts']
+    assert second.test_client().get('/api/upstream/stats').status_code == 200
+
+
+if __name__ == '__main__':
+    for name, func in list(globals().items()):
+        if name.startswith('test_'):
+            func()
+            print(f"✅ {name}")
@@ -0,0 +1,161 @@
+#!/usr/bin/env python3
+"""
+Test script for batch token generation
+Runs /api/token/batch against a local Scryfall stub
+"""
+
+import io
+import json
+import tempfile
+import zipfile
+
+from PIL import Image
+
+import app as token_app
+from card_cache import CardCache
+from render_cache import RenderCache
+from test_art_cache import run_with_stub
+
+ITEMS = [
+    {'card_name': 'Grizzly Bears', 'power': '2', 'toughness': '2', 'subtype': 'Bear'},
+    {'card_name': 'grizzly bears', 'power': '3', 'toughness': '3', 'subtype': 'Bear'},
+    {'card_name': 'No Such Card'},
+    {'power': '1', 'toughness': '1'},
+    {'card_id': 'grizzly-bears-id', 'power': '4', 'toughness': '4', 'subtype': 'Beast'},
+]
+
+
+def test_batch_zip_reports_per_item_errors():
+    """Good items are rendered, bad ones are listed in the manifest"""
+    def check(client, stub):
+        response = client.post('/api/token/batch', json={'tokens': ITEMS})
+        assert response.status_code == 200
+        assert response.mimetype == 'application/zip'
+
+        archive = zipfile.ZipFile(io.BytesIO(response.data))
+        manifest = json.loads(archive.read('manifest.json'))
+        assert [entry.get('error') for entry in manifest] == [
+            None, None, 'Card not found', 'Card name is required', None,
+        ]
+        for entry in manifest:
+            if 'file' in entry:
+                assert Image.open(io.BytesIO(archive.read(entry['file']))).size == token_app.get_template().size
+
+        assert len(json.loads(response.headers['X-Batch-Errors'])) == 2
+        # One collection call for all distinct cards, one download for the shared art
+        assert stub.count('/cards/collection') == 1
+        assert stub.count('/cards/search') == 0
+        assert stub.count('/art/grizzly-bears.jpg') == 1
+
+    run_with_stub(check)
+
+
+def test_batch_pdf_has_one_page_per_token():
+    def check(client, stub):
+        response = client.post('/api/token/batch', json={'tokens': ITEMS[:2], 'format': 'pdf'})
+        assert response.status_code == 200
+        assert response.mimetype == 'application/pdf'
+        assert response.data.count(b'/Type /Page /Parent') == 2
+        # Each page is the 2.5 inch width of a real card
+        assert b'/MediaBox [0 0 180.0000 ' in response.data
+        assert response.headers['Content-Disposition'] == 'attachment; filename=tokens.pdf'
+
+    run_with_stub(check)
+
+
+def test_batch_body_must_be_an_object():
+    def check(client, stub):
+        for path in ('/api/token/batch', '/api/token/sheet'):
+            response = client.post(path, json=ITEMS[:2])
+            assert response.status_code == 400
+            assert response.get_json()['error'] == 'The request body must be a JSON object'
+
+    run_with_stub(check)
+
+
+def test_batch_all_failed_is_an_error():
+    def check(client, stub):
+        response = client.post('/api/token/batch', json={'tokens': [{'card_name': 'Nope'}]})
+        assert response.status_code == 422
+        assert response.get_json()['items'][0]['error'] == 'Card not found'
+
+    run_with_stub(check)
+
+
+def test_batch_matches_single_render():
+    """A token rendered in the process pool is identical to the single-token endpoint's"""
+    def check(client, stub):
+        single = client.post('/api/token/generate', json=ITEMS[0]).data
+        with tempfile.TemporaryDirectory() as directory:
+            token_app.render_cache = RenderCache(directory)
+            response = client.post('/api/token/batch', json={'tokens': ITEMS[:1]})
+        archive = zipfile.ZipFile(io.BytesIO(response.data))
+        assert archive.read('001-grizzly-bears.png') == single
+
+    run_with_stub(check)
+
+
+def test_malformed_items_fail_on_their_own():
+    """Items of the wrong shape are reported per index instead of failing the batch"""
+    def check(client, stub):
+        items = [ITEMS[0], 'Grizzly Bears', {'card_name': 5}, {'card_name': 'Grizzly Bears', 'frame': ['x']}]
+        response = client.post('/api/token/batch', json={'tokens': items})
+        assert response.status_code == 200
+        assert json.loads(response.headers['X-Batch-Errors']) == [
+            {'index': 1, 'error': 'Each token must be a JSON object'},
+            {'index': 2, 'error': 'card_name must be a string'},
+            {'index': 3, 'error': 'frame must be a string'},
+        ]
+
+        response = client.post('/api/token/generate', json=dict(ITEMS[0], frame=['x']))
+        assert response.status_code == 400
+        assert response.get_json()['error'] == 'frame must be a string'
+        assert client.post('/api/token/batch', json={'tokens': 'Grizzly Bears'}).status_code == 400
+
+    run_with_stub(check)
+
+
+def test_numeric_power_and_toughness_are_drawn_as_text():
+    def check(client, stub):
+        as_text = client.post('/api/token/generate', json=ITEMS[0])
+        as_numbers = client.post('/api/token/generate', json=dict(ITEMS[0], power=2, toughness=2))
+        assert as_numbers.status_code == 200
+        assert as_numbers.headers['ETag'] == as_text.headers['ETag']
+        assert as_numbers.data == as_text.data
+
+        items = [dict(ITEMS[0], power=3, toughness=3), dict(ITEMS[0], power=True), dict(ITEMS[0], toughness=[2])]
+        response = client.post('/api/token/batch', json={'tokens': items})
+        assert response.status_code == 200
+        assert json.loads(response.headers['X-Batch-Errors']) == [
+            {'index': 1, 'error': 'power must be a string or a number'},
+            {'index': 2, 'error': 'toughness must be a string or a number'},
+        ]
+
+    run_with_stub(check)
+
+
+def test_lookup_cards_chunks_and_uses_cache():
+    """Lookups skip cached cards and split the rest into 75-identifier requests"""
+    from batch import lookup_cards
+
+    cache = CardCache()
+    cache.put(('named', 'cached'), {'name': 'Cached'})
+    calls = []
+
+    def fetch_collection(identifiers):
+        calls.append(len(identifiers))
+        return [{'name': identifier['name']} for identifier in identifiers], []
+
+    items = [{'card_name': 'Cached'}] + [{'card_name': f'Card {i}'} for i in range(100)]
+    found = lookup_cards(items, cache, fetch_collection)
+
+    assert calls == [75, 25]
+    assert found[('named', 'card 99')] == {'name': 'Card 99'}
+    assert found[('named', 'cached')] == {'name': 'Cached'}
+
+
+if __name__ == '__main__':
+    for name, func in list(globals().items()):
+        if name.startswith('test_'):
+            func()
+            print(f"✅ {name}")
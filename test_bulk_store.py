@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""
+Test script for the offline bulk-data card store
+"""
+
+import gzip
+import io
+import json
+import os
+import tempfile
+
+import app as token_app
+from bulk_store import BulkCardStore, build_store, iter_json_array, normalize_name
+
+CARDS = [
+    {'object': 'card', 'id': 'a1', 'name': 'Esper Sentinel', 'released_at': '2021-06-18',
+     'type_line': 'Artifact Creature — Human Soldier'},
+    {'object': 'card', 'id': 'a2', 'name': 'Esper Sentinel', 'released_at': '2023-01-01',
+     'type_line': 'Artifact Creature — Human Soldier'},
+    {'object': 'card', 'id': 'b1', 'name': 'Lim-Dûl the Necromancer', 'released_at': '1996-06-10'},
+    {'object': 'card', 'id': 'c1', 'name': 'Fire // Ice', 'released_at': '2001-06-04',
+     'card_faces': [{'name': 'Fire'}, {'name': 'Ice'}]},
+    {'object': 'card', 'id': 'd1', 'name': '100% Sentinel_Test', 'released_at': '2020-01-01'},
+]
+
+
+def write_bulk(directory, cards, name='cards.json'):
+    path = os.path.join(directory, name)
+    opener = gzip.open if name.endswith('.gz') else open
+    with opener(path, 'wt', encoding='utf-8') as f:
+        json.dump(cards, f, indent=1)
+    return path
+
+
+def test_streaming_parser_handles_chunk_boundaries():
+    text = json.dumps(CARDS, indent=2)
+    for chunk_size in (1, 7, 64, 1 << 20):
+        assert list(iter_json_array(io.StringIO(text), chunk_size=chunk_size)) == CARDS
+    assert list(iter_json_array(io.StringIO(' [ ] '))) == []
+
+    for bad in ('{"a": 1}', '[{"a": 1}', ''):
+        try:
+            list(iter_json_array(io.StringIO(bad), chunk_size=4))
+            raise AssertionError(f'expected an error for {bad!r}')
+        except ValueError:
+            pass
+
+
+def test_normalize_name():
+    assert normalize_name('  Lim-Dûl   the NECROMANCER ') == 'lim-dul the necromancer'
+
+
+def test_lookups_by_id_name_and_substring():
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, 'cards.db')
+        assert build_store(write_bulk(tmp, CARDS, 'cards.json.gz'), db_path) == len(CARDS)
+        store = BulkCardStore(db_path)
+
+        assert store.get('b1')['name'] == 'Lim-Dûl the Necromancer'
+        assert store.get('missing') is None
+        # Exact names pick the newest printing, ignoring case and accents
+        assert store.find_by_name('esper sentinel')['id'] == 'a2'
+        assert store.find_by_name('Lim-Dul the Necromancer')['id'] == 'b1'
+        assert store.find_by_name('Ice')['id'] == 'c1'
+
+        assert store.search('name:"Fire"')['data'][0]['id'] == 'c1'
+        assert store.search('name:"Sentinel"') is None
+        assert {card['id'] for card in store.search('sentinel')['data']} == {'a1', 'a2', 'd1'}
+        # LIKE wildcards in the query are matched literally
+        assert [card['id'] for card in store.search('0% sentinel_')['data']] == ['d1']
+
+        cards, not_found = store.lookup_collection([{'id': 'a1'}, {'name': 'Nope'}, {'name': 'fire // ice'}])
+        assert [card['id'] for card in cards] == ['a1', 'c1']
+        assert not_found == [{'name': 'Nope'}]
+
+
+def test_refresh_swaps_snapshot_atomically():
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, 'cards.db')
+        build_store(write_bulk(tmp, CARDS[:2]), db_path)
+        store = BulkCardStore(db_path)
+        assert store.count() == 2
+
+        build_store(write_bulk(tmp, CARDS), db_path)
+        assert store.count() == len(CARDS)
+        assert store.get('c1') is not None
+
+        # A failed refresh leaves the current snapshot (and no temp files) in place
+        broken = os.path.join(tmp, 'broken.json')
+        with open(broken, 'w') as f:
+            f.write('[{"object": "card", "id": "x", "name": "X"},')
+        try:
+            build_store(broken, db_path)
+            raise AssertionError('expected the truncated file to fail')
+        except ValueError:
+            pass
+        assert store.count() == len(CARDS)
+        assert sorted(os.listdir(tmp)) == ['broken.json', 'cards.db', 'cards.json']
+
+
+def test_app_serves_metadata_from_bulk_store():
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, 'cards.db')
+        build_store(write_bulk(tmp, CARDS), db_path)
+
+        original_store, original_url = token_app.bulk_store, token_app.SCRYFALL_BASE_URL
+        token_app.bulk_store = BulkCardStore(db_path)
+        # Nothing listens here, so any API call would fail the test
+        token_app.SCRYFALL_BASE_URL = 'http://127.0.0.1:9'
+        try:
+            client = token_app.app.test_client()
+            response = client.get('/api/search?q=esper')
+            assert response.status_code == 200
+            assert response.get_json()['total'] == 2
+
+            assert client.get('/api/card/b1').get_json()['name'] == 'Lim-Dûl the Necromancer'
+            assert client.get('/api/card/zzz').status_code == 404
+        finally:
+            token_app.bulk_store, token_app.SCRYFALL_BASE_URL = original_store, original_url
+
+
+if __name__ == '__main__':
+    for name, func in list(globals().items()):
+        if name.startswith('test_'):
+            func()
+            print(f"✅ {name}")
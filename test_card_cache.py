@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+"""
+Test script for the Scryfall card cache
+Runs the API routes against a local Scryfall stub instead of api.scryfall.com
+"""
+
+import threading
+
+import app as token_app
+from card_cache import CardCache
+from scryfall_stub import ScryfallStub, stubbed_app
+
+SENTINEL = {
+    'object': 'card',
+    'id': 'esper-sentinel-id',
+    'name': 'Esper Sentinel',
+    'mana_cost': '{W}',
+    'type_line': 'Artifact Creature — Human Soldier',
+    'oracle_text': 'Whenever an opponent casts their first noncreature spell each turn, '
+                   'draw a card unless that player pays {X}.',
+}
+
+
+def test_search_is_cached():
+    """Repeated searches for the same query only reach Scryfall once"""
+    with ScryfallStub([SENTINEL]) as stub, stubbed_app(stub):
+        client = token_app.app.test_client()
+
+        for _ in range(3):
+            response = client.get('/api/search?q=Esper')
+            assert response.status_code == 200
+            assert response.get_json()['cards'][0]['name'] == 'Esper Sentinel'
+
+        assert stub.count('/cards/search') == 1
+
+
+def test_search_primes_card_lookup():
+    """A card returned by a search can be fetched by id without another request"""
+    with ScryfallStub([SENTINEL]) as stub, stubbed_app(stub):
+        client = token_app.app.test_client()
+
+        client.get('/api/search?q=Esper')
+        response = client.get(f"/api/card/{SENTINEL['id']}")
+        assert response.status_code == 200
+        assert response.get_json()['name'] == 'Esper Sentinel'
+        assert stub.count(f"/cards/{SENTINEL['id']}") == 0
+
+
+def test_not_found_is_negatively_cached():
+    """A 'Card not found' answer is remembered instead of re-asking Scryfall"""
+    with ScryfallStub([SENTINEL]) as stub, stubbed_app(stub):
+        client = token_app.app.test_client()
+
+        for _ in range(3):
+            response = client.get('/api/card/missing-id')
+            assert response.status_code == 404
+            assert response.get_json()['error'] == 'Card not found'
+
+        assert stub.count('/cards/missing-id') == 1
+        assert token_app.card_cache.stats()['negative_hits'] == 2
+
+
+def test_concurrent_misses_coalesce():
+    """50 concurrent lookups of the same card trigger a single upstream fetch"""
+    with ScryfallStub([SENTINEL], latency=0.2) as stub, stubbed_app(stub):
+        barrier = threading.Barrier(50)
+        results = []
+
+        def worker():
+            barrier.wait()
+            results.append(token_app.lookup_card(SENTINEL['id']))
+
+        threads = [threading.Thread(target=worker) for _ in range(50)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert len(results) == 50
+        assert all(card['name'] == 'Esper Sentinel' for card in results)
+        assert stub.count(f"/cards/{SENTINEL['id']}") == 1
+        assert token_app.card_cache.stats()['coalesced'] == 49
+
+
+def test_ttl_and_lru_eviction():
+    """Entries expire after their TTL and the least recently used entry is evicted first"""
+    now = [0.0]
+    cache = CardCache(max_entries=2, ttl=10, negative_ttl=1, clock=lambda: now[0])
+
+    cache.put('a', 1)
+    cache.put('b', 2)
+    assert cache.get('a') == 1  # 'a' is now the most recently used
+    cache.put('c', 3)
+    assert cache.get('b') is None
+    assert cache.stats()['evictions'] == 1
+
+    now[0] = 11
+    assert cache.get('a') is None
+    assert cache.stats()['expirations'] == 1
+
+
+def test_fetch_errors_are_not_cached():
+    """A failing fetch is retried on the next lookup"""
+    cache = CardCache()
+    calls = []
+
+    def failing():
+        calls.append(1)
+        raise RuntimeError('upstream down')
+
+    for _ in range(2):
+        try:
+            cache.get_or_fetch('key', failing)
+        except RuntimeError:
+            pass
+
+    assert len(calls) == 2
+    assert cache.get_or_fetch('key', lambda: 'ok') == 'ok'
+
+
+if __name__ == '__main__':
+    for name, func in list(globals().items()):
+        if name.startswith('test_'):
+            func()
+            print(f"✅ {name}")
@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""
+Test script for output format negotiation and size presets
+"""
+
+import io
+
+from PIL import Image
+from werkzeug.datastructures import MIMEAccept
+
+import app as token_app
+import encoders
+from test_art_cache import run_with_stub
+
+
+def accept(header):
+    values = []
+    for part in header.split(','):
+        mimetype, _, quality = part.strip().partition(';q=')
+        values.append((mimetype, float(quality) if quality else 1))
+    return MIMEAccept(values)
+
+
+def test_negotiate_format():
+    assert encoders.negotiate_format() == 'png'
+    assert encoders.negotiate_format('JPG') == 'jpeg'
+    assert encoders.negotiate_format('png8', accept('image/webp')) == 'png8'
+    assert encoders.negotiate_format(None, accept('image/webp,*/*')) == 'webp'
+    assert encoders.negotiate_format(None, accept('image/jpeg,image/webp;q=0.8')) == 'jpeg'
+    # Wildcards and types we can't produce keep the PNG default
+    assert encoders.negotiate_format(None, accept('*/*')) == 'png'
+    assert encoders.negotiate_format(None, accept('image/avif,image/*')) == 'png'
+    try:
+        encoders.negotiate_format('bmp')
+        raise AssertionError('expected ValueError')
+    except ValueError:
+        pass
+
+
+def test_encode_formats_and_presets():
+    token = Image.new('RGBA', (2010, 2814), (20, 40, 60, 255))
+    token.putpixel((0, 0), (0, 0, 0, 0))  # transparent corner
+
+    for output_format in encoders.available_formats():
+        for name, preset in encoders.PRESETS.items():
+            decoded = Image.open(io.BytesIO(encoders.encode_image(token, output_format, name)))
+            assert decoded.format == encoders.MIMETYPES[output_format].split('/')[1].upper()
+            assert decoded.width == (preset.width or token.width)
+            assert abs(decoded.height - decoded.width * token.height / token.width) < 1
+
+    assert encoders.get_preset('print').width == 750  # 2.5in at 300 DPI
+    # JPEG has no alpha: transparent corners become white
+    jpeg = Image.open(io.BytesIO(encoders.encode_image(token, 'jpeg', 'full')))
+    assert min(jpeg.getpixel((0, 0))) > 200
+    # Full-size PNG keeps the exact pixels
+    png = Image.open(io.BytesIO(encoders.encode_image(token, 'png', 'full')))
+    assert png.tobytes() == token.tobytes()
+
+
+def test_generate_negotiates_format_and_preset():
+    def check(client, stub):
+        payload = {'card_name': 'Grizzly Bears', 'power': '2', 'toughness': '2', 'subtype': 'Bear'}
+
+        png = client.post('/api/token/generate', json=payload)
+        assert png.mimetype == 'image/png'
+        assert 'Accept' in png.headers['Vary']
+
+        webp = client.post('/api/token/generate', json=payload, headers={'Accept': 'image/webp,*/*'})
+        assert webp.mimetype == 'image/webp'
+        assert webp.headers['ETag'] != png.headers['ETag']
+
+        thumbnail = client.post('/api/token/generate', json=dict(payload, format='jpeg', preset='thumbnail'))
+        assert thumbnail.mimetype == 'image/jpeg'
+        assert Image.open(io.BytesIO(thumbnail.data)).width == 146
+
+        assert client.post('/api/token/generate', json=dict(payload, preset='poster')).status_code == 400
+        # Fields of the wrong type are the client's mistake, on single and batch requests alike
+        for bad in ({'format': 5}, {'preset': ['x']}):
+            assert client.post('/api/token/generate', json=dict(payload, **bad)).status_code == 400
+            assert client.post('/api/token/batch', json=dict({'tokens': [payload]}, **bad)).status_code == 400
+
+        preview = client.post('/api/token/generate', json=dict(payload, preview=True))
+        preview_image = Image.open(io.BytesIO(preview.data))
+        assert preview_image.size == token_app.get_template().scaled(token_app.PREVIEW_SCALE).size
+        assert preview.headers['ETag'] != png.headers['ETag']
+        assert len(preview.data) < len(png.data) / 4
+        # Every variant was rendered from the one cached art download
+        assert stub.count('/art/grizzly-bears.jpg') == 1
+
+    run_with_stub(check)
+
+
+if __name__ == '__main__':
+    for name, func in list(globals().items()):
+        if name.startswith('test_'):
+            func()
+            print(f"✅ {name}")
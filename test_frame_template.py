@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+"""
+Test script for frame templates loaded from layout files
+"""
+
+import json
+import os
+import tempfile
+
+import app as token_app
+from PIL import Image, ImageDraw
+
+from frame_template import FrameTemplate, load_templates
+
+
+def test_black_layout_geometry():
+    """The bundled layout resolves to the frame's pixel coordinates"""
+    template = token_app.get_template('black')
+    width, height = template.size
+
+    assert template.size == (2010, 2814)
+    assert template.art_box == (int(width * 0.075), int(height * 0.11), int(width * 0.85), int(height * 0.45))
+    assert (template.text['title'].x, template.text['title'].y) == (180, 168)
+    assert template.text['mana_cost'].anchor == 'ra'
+    assert template.text['oracle'].width == width - 2 * 180
+    assert template.text['artist'].fill == (255, 255, 255)
+    assert template.oracle_line_height == template.text['oracle'].font.getbbox("Ay")[3]
+
+
+def test_new_frame_from_layout_file():
+    """Dropping another layout file into the directory adds a frame without code changes"""
+    with tempfile.TemporaryDirectory() as directory:
+        with open(os.path.join(token_app.layouts_dir, 'black.json')) as f:
+            layout = json.load(f)
+        # Point the asset paths back at static/ since the layout is moving directories
+        layout['frame'] = os.path.join(token_app.layouts_dir, layout['frame'])
+        layout['symbols'] = os.path.join(token_app.layouts_dir, layout['symbols'])
+        for spec in layout['fonts'].values():
+            spec['file'] = os.path.join(token_app.layouts_dir, spec['file'])
+
+        for name, title_x in (('black', 0.09), ('wide-title', 0.2)):
+            layout['name'] = name
+            layout['text']['title']['x'] = title_x
+            with open(os.path.join(directory, f'{name}.json'), 'w') as f:
+                json.dump(layout, f)
+
+        templates = load_templates(directory)
+
+    assert sorted(templates) == ['black', 'wide-title']
+    assert templates['wide-title'].text['title'].x == 402
+    assert templates['wide-title'].fingerprint != templates['black'].fingerprint
+
+
+def test_fonts_are_shared_between_templates():
+    layout_path = os.path.join(token_app.layouts_dir, 'black.json')
+    first = FrameTemplate.load(layout_path)
+    second = FrameTemplate.load(layout_path)
+    assert first.fonts['title'] is second.fonts['title']
+
+
+def legacy_compose(frame, art_image, art_box):
+    """The original compositing path: art on a blank canvas, full frame alpha-pasted on top"""
+    token = Image.new('RGBA', frame.size, (0, 0, 0, 0))
+    token.paste(art_image, art_box[:2])
+    token.paste(frame, (0, 0), frame)
+    return token
+
+
+def test_compose_matches_full_frame_paste():
+    """Precomposited rendering is pixel-identical, including a soft-edged art window"""
+    with tempfile.TemporaryDirectory() as directory:
+        # Opaque frame with a transparent window whose edge fades over 20px, plus a
+        # translucent overlay and transparent rounded corners
+        frame = Image.new('RGBA', (400, 560), (30, 60, 90, 255))
+        alpha = Image.new('L', frame.size, 255)
+        draw = ImageDraw.Draw(alpha)
+        for inset in range(20):
+            draw.rectangle((40 + inset, 60 + inset, 360 - inset, 300 - inset), fill=255 - inset * 12)
+        draw.rectangle((60, 80, 340, 280), fill=0)
+        draw.rectangle((150, 150, 250, 200), fill=128)
+        draw.pieslice((0, 0, 40, 40), 180, 270, fill=0)
+        frame.putalpha(alpha)
+        frame.save(os.path.join(directory, 'frame.png'))
+
+        with open(os.path.join(token_app.layouts_dir, 'black.json')) as f:
+            layout = json.load(f)
+        layout['frame'] = 'frame.png'
+        layout['symbols'] = os.path.join(token_app.layouts_dir, layout['symbols'])
+        for spec in layout['fonts'].values():
+            spec['file'] = os.path.join(token_app.layouts_dir, spec['file'])
+        layout_path = os.path.join(directory, 'soft.json')
+        with open(layout_path, 'w') as f:
+            json.dump(layout, f)
+
+        template = FrameTemplate.load(layout_path)
+
+    assert template.blend_tiles
+    art = Image.effect_noise(template.art_box[2:], 60).convert('RGBA')
+    expected = legacy_compose(frame, art, template.art_box)
+    assert template.compose(art).tobytes() == expected.tobytes()
+
+
+def test_scaled_template_shares_the_layout():
+    """A preview template is the same layout resolved at a fraction of the size, built once"""
+    template = token_app.get_template('black')
+    preview = template.scaled(0.25)
+
+    assert preview is template.scaled(0.25)
+    assert template.scaled(1) is template
+    assert preview.size == (round(2010 * 0.25), round(2814 * 0.25))
+    assert preview.text['title'].font.size == 25
+    assert preview.text['oracle'].min_size == 10
+    for element, slot in template.text.items():
+        scaled = preview.text[element]
+        assert abs(scaled.x - slot.x * 0.25) < 2 and abs(scaled.y - slot.y * 0.25) < 2
+        assert (scaled.anchor, scaled.fill) == (slot.anchor, slot.fill)
+    assert all(abs(a - b * 0.25) < 2 for a, b in zip(preview.art_box, template.art_box))
+
+    art = Image.new('RGB', preview.art_box[2:], (200, 30, 30))
+    token = token_app.create_token(art, 'Goblin', '1', '1', 'Creature', 'Goblin', 'Haste', '{R}',
+                                   'Artist', template=preview)
+    assert token.size == preview.size
+
+
+def test_warm_up_prepares_every_frame():
+    """The production warmup builds each frame's preview template and serves the WSGI app"""
+    import wsgi
+
+    token_app.warm_up()
+    for template in token_app.frame_templates.values():
+        assert token_app.PREVIEW_SCALE in template._scaled
+    assert wsgi.application is token_app.app
+
+
+def test_unknown_frame_is_rejected():
+    client = token_app.app.test_client()
+    response = client.post('/api/token/generate', json={'card_name': 'Anything', 'frame': 'nope'})
+    assert response.status_code == 400
+    assert response.get_json()['error'] == 'Unknown frame: nope'
+
+
+if __name__ == '__main__':
+    for name, func in list(globals().items()):
+        if name.startswith('test_'):
+            func()
+            print(f"✅ {name}")
@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""
+Test script for the glyph-run cache
+"""
+
+import os
+
+from PIL import Image, ImageChops, ImageDraw, ImageFont
+
+import app
+import assets
+import glyph_cache
+from glyph_cache import GlyphRunCache
+
+FONTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'static', 'fonts')
+
+
+def with_runs(cache, check):
+    original = glyph_cache.runs
+    glyph_cache.runs = cache
+    try:
+        return check()
+    finally:
+        glyph_cache.runs = original
+
+
+def draw_both(mode, xy, text, fill, font, anchor=None):
+    expected = Image.new(mode, (400, 160), (40, 80, 120, 200)[:len(mode)])
+    ImageDraw.Draw(expected).text(xy, text, fill=fill, font=font, anchor=anchor)
+    actual = Image.new(mode, (400, 160), (40, 80, 120, 200)[:len(mode)])
+    glyph_cache.draw_text(ImageDraw.Draw(actual), xy, text, fill, font, anchor)
+    return actual, expected
+
+
+def test_draw_text_matches_imagedraw():
+    font = assets.load_font(os.path.join(FONTS_DIR, 'Beleren2016-Bold.ttf'), 48)
+
+    def check():
+        cases = [
+            ('RGBA', (10, 20), 'Creature - Zombie', (0, 0, 0), None),
+            ('RGBA', (390, 150), '2/2', (255, 255, 255), 'rs'),
+            ('RGB', (200.5, 80.25), 'Flying', (200, 30, 30), 'mm'),
+            ('L', (5, 5), 'Wrap', 0, None),
+            ('RGBA', (10, 20), '', (0, 0, 0), None),
+        ]
+        for mode, xy, text, fill, anchor in cases:
+            for _ in range(2):
+                actual, expected = draw_both(mode, xy, text, fill, font, anchor)
+                assert ImageChops.difference(actual, expected).getbbox() is None, (mode, text)
+        return glyph_cache.runs.stats()
+
+    stats = with_runs(GlyphRunCache(), check)
+    assert stats['misses'] == 5 and stats['hits'] == 5 and stats['hit_rate'] == 0.5
+
+
+def test_cache_is_bounded_in_bytes():
+    font = assets.load_font(os.path.join(FONTS_DIR, 'MPlantin-Regular.ttf'), 40)
+    sizes = {word: font.getmask2(word, 'L')[0].size for word in ('Vigilance', 'Deathtouch')}
+    # Room for these two runs, but not for a third as well
+    cache = GlyphRunCache(max_bytes=sum(width * height for width, height in sizes.values()))
+
+    cache.mask(font, 'Vigilance', 'L', None, (0, 0))
+    cache.mask(font, 'Lifelink', 'L', None, (0, 0))
+    cache.mask(font, 'Vigilance', 'L', None, (0, 0))
+    cache.mask(font, 'Deathtouch', 'L', None, (0, 0))
+    stats = cache.stats()
+    assert stats['bytes'] <= stats['max_bytes'] and stats['evictions'] == 1
+    # The recently used run survived, the least recently used one went first
+    cache.mask(font, 'Vigilance', 'L', None, (0, 0))
+    assert cache.stats()['hits'] == 2
+
+    cache.clear()
+    assert cache.stats()['size'] == 0 and cache.stats()['bytes'] == 0
+
+
+def test_disabled_cache_and_bitmap_fonts_fall_back():
+    def check():
+        font = ImageFont.load_default()
+        actual, expected = draw_both('RGBA', (10, 10), 'Bear', (255, 255, 255), font)
+        assert ImageChops.difference(actual, expected).getbbox() is None
+        actual, expected = draw_both('RGBA', (10, 10), 'Two\nLines', (255, 255, 255),
+                                     assets.load_font(os.path.join(FONTS_DIR, 'MPlantin-Regular.ttf'), 30))
+        assert ImageChops.difference(actual, expected).getbbox() is None
+        return glyph_cache.runs.stats()
+
+    assert with_runs(GlyphRunCache(), check)['misses'] == 0
+    assert with_runs(GlyphRunCache(max_bytes=0), check)['size'] == 0
+
+
+def test_tokens_render_identically_with_the_cache():
+    art = Image.new('RGB', (64, 48), (90, 120, 60))
+    template = app.get_template().scaled(0.25)
+    args = (art, 'Zombie', '2', '2', 'Creature', 'Zombie', 'Flying\nWhen this dies, draw a card.',
+            '{1}{B}', 'Some Artist', template)
+
+    uncached = with_runs(GlyphRunCache(max_bytes=0), lambda: app.create_token(*args))
+    cache = GlyphRunCache()
+    first = with_runs(cache, lambda: app.create_token(*args))
+    second = with_runs(cache, lambda: app.create_token(*args))
+    assert ImageChops.difference(first, uncached).getbbox() is None
+    assert ImageChops.difference(second, uncached).getbbox() is None
+    stats = cache.stats()
+    assert stats['hits'] == stats['misses'] > 0
+
+
+if __name__ == '__main__':
+    for name, func in list(globals().items()):
+        if name.startswith('test_'):
+            func()
+            print(f"✅ {name}")
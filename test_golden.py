@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+"""
+Golden-image tests for the renderer
+Renders tokens, wrapped rules text and the basic fallback token from the recorded
+fixtures in fixtures/ and compares them with the reference images in fixtures/golden.
+A small per-pixel tolerance absorbs antialiasing and JPEG decoding differences between
+library builds; anything that moves text or art changes far more pixels and fails.
+On a failure the actual image and a diff are written to GOLDEN_FAILURES_DIR.
+
+After an intentional change to the output, regenerate the references with
+UPDATE_GOLDEN=1 python -m pytest test_golden.py and review the new images.
+"""
+
+import json
+import os
+import tempfile
+
+from PIL import Image, ImageDraw
+
+import app
+from image_diff import compare_images, diff_image
+from scryfall_stub import FIXTURES_DIR, read_fixture_art
+
+GOLDEN_DIR = os.path.join(FIXTURES_DIR, 'golden')
+FAILURES_DIR = os.getenv('GOLDEN_FAILURES_DIR', os.path.join(tempfile.gettempdir(), 'token-golden-failures'))
+UPDATE = os.getenv('UPDATE_GOLDEN') == '1'
+
+# A channel may be off by this much before its pixel counts as changed...
+PIXEL_TOLERANCE = 16
+# ...and at most this fraction of the pixels may change (one 4 -> 5 in a preview
+# token's P/T box alone changes 0.04%)
+MAX_CHANGED_FRACTION = 0.0001
+
+# Full-size references would be ~3 MB each, so whole tokens are checked at preview scale
+TOKEN_SCALE = 0.25
+
+LONG_ORACLE_TEXT = (
+    "Flying, first strike, vigilance, trample, haste, lifelink\n"
+    "At the beginning of your upkeep, look at the top three cards of your library. Put one "
+    "of them into your hand and the rest on the bottom of your library in any order.\n"
+    "Whenever another creature you control dies, create a 1/1 white Spirit creature token "
+    "with flying, then put a +1/+1 counter on each creature you control.\n"
+    "When this creature leaves the battlefield, return it to its owner's hand at the "
+    "beginning of the next end step."
+)
+
+
+def fixture_card(name):
+    with open(os.path.join(FIXTURES_DIR, 'cards.json'), encoding='utf-8') as f:
+        return next(card for card in json.load(f) if card['name'] == name)
+
+
+def render_fixture_token(name, power, toughness, subtype, **overrides):
+    card = dict(fixture_card(name), **overrides)
+    spec = app.token_spec(card, power, toughness, subtype, frame_name='black', scale=TOKEN_SCALE)
+    return app.render_token_image(spec, read_fixture_art(spec['art_url']))
+
+
+def render_wrapped(text):
+    """Wrap text with the full-size rules font and draw the lines on a plain page"""
+    oracle = app.get_template('black').text['oracle']
+    line_height = app.get_template('black').oracle_line_height
+    lines = app.wrap_text(text, oracle.font, oracle.width)
+    page = Image.new('L', (oracle.width, max(1, len(lines)) * line_height), 255)
+    draw = ImageDraw.Draw(page)
+    for i, line in enumerate(lines):
+        draw.text((0, i * line_height), line, fill=0, font=oracle.font)
+    return page
+
+
+def check_golden(name, image):
+    path = os.path.join(GOLDEN_DIR, f'{name}.png')
+    if UPDATE:
+        os.makedirs(GOLDEN_DIR, exist_ok=True)
+        image.save(path, optimize=True)
+        return
+    assert os.path.exists(path), f'No reference for {name}; create it with UPDATE_GOLDEN=1'
+
+    with Image.open(path) as expected:
+        expected.load()
+    assert image.size == expected.size, f'{name}: size {image.size}, reference {expected.size}'
+    difference = compare_images(image, expected, PIXEL_TOLERANCE)
+    if difference.fraction > MAX_CHANGED_FRACTION:
+        os.makedirs(FAILURES_DIR, exist_ok=True)
+        image.save(os.path.join(FAILURES_DIR, f'{name}.actual.png'))
+        diff_image(image, expected, PIXEL_TOLERANCE).save(os.path.join(FAILURES_DIR, f'{name}.diff.png'))
+        raise AssertionError(
+            f'{name}: {difference.changed} pixels ({difference.fraction:.3%}) differ by more than '
+            f'{PIXEL_TOLERANCE} (max {difference.max_delta}); see {FAILURES_DIR}')
+
+
+def test_compare_images_tolerance():
+    expected = Image.new('RGB', (10, 10), (100, 100, 100))
+    actual = expected.copy()
+    actual.putpixel((0, 0), (105, 100, 100))
+    actual.putpixel((1, 0), (100, 100, 160))
+
+    difference = compare_images(actual, expected, tolerance=10)
+    assert difference.max_delta == 60
+    assert difference.changed == 1 and difference.fraction == 0.01
+    assert compare_images(actual, expected).changed == 2
+    assert compare_images(expected, expected.copy()) == (0, 0.0, 0, 0.0)
+    assert diff_image(actual, expected, 10).getpixel((1, 0)) == (255, 0, 0)
+
+
+def test_token_multiple_paragraphs():
+    check_golden('token-serra-angel', render_fixture_token('Serra Angel', '4', '4', 'Angel'))
+
+
+def test_tolerance_catches_a_changed_digit():
+    if UPDATE:
+        return
+    try:
+        check_golden('token-serra-angel', render_fixture_token('Serra Angel', '4', '5', 'Angel'))
+    except AssertionError:
+        return
+    raise AssertionError('A different toughness passed the golden check')
+
+
+def test_token_wrapped_rules_without_pt():
+    check_golden('token-esper-sentinel', render_fixture_token('Esper Sentinel', '', '', 'Soldier'))
+
+
+def test_token_legendary():
+    check_golden('token-krenko-mob-boss', render_fixture_token('Krenko, Mob Boss', '3', '3', 'Goblin'))
+
+
+def test_token_shrinks_overflowing_text():
+    token = render_fixture_token('Storm Crow', '1', '2', 'Bird', oracle_text=LONG_ORACLE_TEXT)
+    check_golden('token-long-oracle', token)
+
+
+def test_wrap_text_paragraphs():
+    check_golden('wrap-serra-angel', render_wrapped(fixture_card('Serra Angel')['oracle_text']))
+
+
+def test_wrap_text_long():
+    check_golden('wrap-long-oracle', render_wrapped(LONG_ORACLE_TEXT))
+
+
+def test_basic_token():
+    card = fixture_card('Grizzly Bears')
+    token = app.create_basic_token(read_fixture_art(card['image_uris']['art_crop']),
+                                   card['name'], '2', '2', 'Creature', card['colors'], 'Bear')
+    check_golden('basic-grizzly-bears', token)
+
+
+if __name__ == '__main__':
+    for name, func in list(globals().items()):
+        if name.startswith('test_'):
+            func()
+            print(f"✅ {name}")
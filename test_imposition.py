@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""
+Test script for print sheet imposition
+"""
+
+import io
+import json
+import re
+
+from PIL import Image
+
+import imposition
+from test_art_cache import run_with_stub
+from test_batch import ITEMS
+
+
+def check_pdf_structure(data):
+    """Every xref entry points at its object and startxref at the xref table; returns the page count"""
+    startxref = int(re.search(rb'startxref\n(\d+)\n%%EOF\n$', data).group(1))
+    assert data[startxref:].startswith(b'xref\n')
+    count = int(re.match(rb'xref\n0 (\d+)\n', data[startxref:]).group(1))
+    entries = re.findall(rb'(\d{10}) 00000 n \n', data[startxref:])
+    assert len(entries) == count - 1
+    for object_id, offset in enumerate(entries, start=1):
+        assert data[int(offset):].startswith(f'{object_id} 0 obj\n'.encode('ascii'))
+    return int(re.search(rb'/Type /Pages /Kids \[[^\]]*\] /Count (\d+)', data).group(1))
+
+
+def test_layout_grid_and_strips():
+    letter = imposition.SheetLayout('letter', dpi=300)
+    assert (letter.width, letter.height) == (2550, 3300)
+    assert (letter.columns, letter.rows, letter.per_page) == (3, 3, 9)
+    assert letter.card_box(0) == (150, 75, 900, 1125)
+    assert letter.card_box(4) == (900, 1125, 1650, 2175)
+    # Strips tile the page exactly
+    bounds = [letter.strip_bounds(row) for row in range(letter.rows)]
+    assert bounds[0][0] == 0 and bounds[-1][1] == letter.height
+    assert all(previous[1] == current[0] for previous, current in zip(bounds, bounds[1:]))
+
+    a4 = imposition.SheetLayout('a4', dpi=150, bleed=0.125, margin=0.25)
+    assert (a4.slot_width, a4.slot_height) == (413, 563) and a4.per_page == 4
+    assert a4.page_count(9) == 3
+    # Cut marks sit in the margins, outside every card
+    for x0, y0, x1, y1 in a4.cut_marks_lines():
+        for position in range(a4.per_page):
+            left, top, right, bottom = a4.card_box(position)
+            assert x1 < left - a4.bleed or x0 > right + a4.bleed or y1 < top - a4.bleed or y0 > bottom + a4.bleed
+
+    for bad in ({'paper': 'tabloid'}, {'dpi': 72}, {'bleed': 1}, {'margin': 4}):
+        try:
+            imposition.SheetLayout(**bad)
+            raise AssertionError(f'expected ValueError for {bad}')
+        except ValueError:
+            pass
+
+
+def test_strips_render_tokens_into_slots():
+    layout = imposition.SheetLayout('letter', dpi=150, bleed=0.125)
+    rendered = []
+
+    def render(color):
+        rendered.append(color)
+        return None if color is None else Image.new('RGBA', (100, 140), color)
+
+    tokens = [(255, 0, 0, 255), None, (0, 0, 255, 255)]
+    png = b''.join(imposition.write_png(layout, imposition.page_strips(layout, tokens, render)))
+    sheet = Image.open(io.BytesIO(png))
+    assert sheet.size == (layout.width, layout.height) and round(sheet.info['dpi'][0]) == 150
+    sheet = sheet.convert('RGB')
+    assert rendered == tokens
+
+    def center(position):
+        left, top, right, bottom = layout.card_box(position)
+        return sheet.getpixel(((left + right) // 2, (top + bottom) // 2))
+
+    assert center(0) == (255, 0, 0) and center(2) == (0, 0, 255)
+    # A failed render leaves its slot showing only the bleed colour; unused slots stay paper white
+    assert center(1) == (0, 0, 0)
+    if layout.per_page > 3:
+        assert center(3) == (255, 255, 255)
+
+
+def test_sheet_endpoint_streams_pdf_and_png():
+    def check(client, stub):
+        tokens = [ITEMS[0]] * 10 + [ITEMS[2]]
+        response = client.post('/api/token/sheet', json={'tokens': tokens, 'dpi': 150})
+        assert response.status_code == 200 and response.mimetype == 'application/pdf'
+        assert response.is_streamed
+        data = response.get_data()
+        assert response.headers['X-Sheet-Pages'] == '2'
+        assert check_pdf_structure(data) == 2
+        assert data.count(b'/Subtype /Image') == 2 * 3  # one image per grid row
+        assert json.loads(response.headers['X-Batch-Errors']) == [{'index': 10, 'error': 'Card not found'}]
+
+        png = client.post('/api/token/sheet', json={'tokens': tokens, 'dpi': 150, 'format': 'png', 'page': 2})
+        sheet = Image.open(io.BytesIO(png.get_data()))
+        assert sheet.size == (1275, 1650)
+
+        assert client.post('/api/token/sheet', json={'tokens': tokens, 'format': 'png', 'page': 3}).status_code == 400
+        assert client.post('/api/token/sheet', json={'tokens': tokens, 'paper': 'tabloid'}).status_code == 400
+        assert client.post('/api/token/sheet', json={'tokens': [ITEMS[2]]}).status_code == 422
+
+    run_with_stub(check)
+
+
+if __name__ == '__main__':
+    for name, func in list(globals().items()):
+        if name.startswith('test_'):
+            func()
+            print(f"✅ {name}")
@@ -0,0 +1,161 @@
+#!/usr/bin/env python3
+"""
+Test script for mana symbol parsing, the sprite atlas and inline symbol layout
+"""
+
+import json
+import os
+import tempfile
+
+from PIL import Image, ImageChops, ImageDraw
+
+import app
+import assets
+import glyph_cache
+import text_layout
+from frame_template import read_layout
+from mana_symbols import load_symbol_set, parse
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+SYMBOLS_PATH = os.path.join(ROOT, 'static', 'symbols', 'mana.json')
+
+
+def test_parse_splits_text_and_symbols():
+    assert parse('{T}: Add {G}.') == [('T',), ': Add ', ('G',), '.']
+    assert parse('{2}{W}{U}') == [('2',), ('W',), ('U',)]
+    assert parse('No symbols') == ['No symbols']
+    assert parse('') == []
+
+
+def test_unknown_symbols_stay_text_and_runs_are_remembered():
+    symbols = load_symbol_set(SYMBOLS_PATH)
+    runs = symbols.runs('Pay {CHAOS} or {W/U}, then {2/G} and {B/G/P}.')
+    assert runs == ('Pay {CHAOS} or ', ('W/U',), ', then ', ('2/G',), ' and ', ('B/G/P',), '.')
+    assert symbols.runs('Pay {CHAOS} or {W/U}, then {2/G} and {B/G/P}.') is runs
+    assert load_symbol_set(SYMBOLS_PATH) is symbols
+
+
+def test_atlas_holds_every_symbol_once_per_size():
+    symbols = load_symbol_set(SYMBOLS_PATH)
+    atlas = symbols.atlas(40)
+    assert set(atlas.boxes) == set(symbols.styles)
+    assert {'W', 'T', 'Q', 'X', '10', 'W/U', '2/R', 'G/P', 'U/B/P'} <= set(atlas.boxes)
+    assert symbols.atlas(40) is atlas
+    # Every sprite has its disc drawn in the middle of its cell
+    for name, (left, top, right, bottom) in atlas.boxes.items():
+        center = (left + atlas.pad + atlas.diameter // 2, top + atlas.diameter // 2)
+        assert atlas.sheet.getpixel(center)[3] == 255, name
+
+
+def test_symbol_glyphs_come_from_the_font_pool():
+    symbols = load_symbol_set(SYMBOLS_PATH)
+    before = assets.fonts.stats()
+    symbols.atlas(23)
+    after = assets.fonts.stats()
+    assert after['hits'] + after['misses'] > before['hits'] + before['misses']
+    assert any(path == symbols.font_path for path, _ in assets.loaded_fonts())
+
+
+def test_template_preloads_atlases_for_symbol_slots():
+    template = app.get_template('black')
+    symbols = template.symbols
+    assert template.text['mana_cost'].symbols and template.text['oracle'].symbols
+    assert not template.text['title'].symbols
+    needed = set()
+    for scale in (1, app.PREVIEW_SCALE):
+        slots = template.scaled(scale).text
+        assert symbols.diameter(slots['mana_cost'].font) in symbols._atlases
+        # Every size fit_text may shrink the rules text to is ready before the first render
+        for size in text_layout.font_sizes(slots['oracle'].font.size, slots['oracle'].min_size):
+            needed.add(symbols.diameter_at(size))
+    assert needed <= set(symbols._atlases)
+    # A handful of atlases per scale, not one per point size
+    assert len(needed) <= 16
+
+
+def test_wrapping_measures_symbols_at_drawn_width():
+    template = app.get_template('black')
+    oracle = template.text['oracle']
+    symbols = template.symbols
+    font = oracle.font
+    assert symbols.measure('{T}:', font) == symbols.advance(font) + text_layout.measure(font, ':')
+    assert symbols.measure('{G}{G}', font) == symbols.advance(font) + symbols.diameter(font)
+
+    text = 'Pay ' + ' '.join(['{2/W}{G}{G}'] * 12) + ' to win.'
+    lines = app.wrap_text(text, font, oracle.width, symbols)
+    assert all(symbols.measure(line, font) <= oracle.width for line in lines)
+    # "{2/W}" set as text is far wider than its symbol, so plain wrapping breaks too early
+    assert len(lines) < len(app.wrap_text(text, font, oracle.width))
+
+
+def test_lines_without_symbols_draw_as_plain_text():
+    symbols = load_symbol_set(SYMBOLS_PATH)
+    font = app.get_template('black').text['oracle'].font
+    expected = Image.new('RGBA', (1200, 200), (255, 255, 255, 255))
+    glyph_cache.draw_text(ImageDraw.Draw(expected), (10, 20), 'Flying, vigilance', (0, 0, 0), font)
+    actual = Image.new('RGBA', (1200, 200), (255, 255, 255, 255))
+    symbols.draw_line(actual, ImageDraw.Draw(actual), (10, 20), 'Flying, vigilance', (0, 0, 0), font)
+    assert ImageChops.difference(actual, expected).getbbox() is None
+
+
+def test_symbols_are_composited_inline():
+    symbols = load_symbol_set(SYMBOLS_PATH)
+    font = app.get_template('black').text['oracle'].font
+    image = Image.new('RGBA', (1200, 200), (255, 255, 255, 255))
+    symbols.draw_line(image, ImageDraw.Draw(image), (10, 20), '{R}: Add', (0, 0, 0), font)
+
+    diameter = symbols.diameter(font)
+    ascent, _ = font.getmetrics()
+    cap_height = -font.getbbox('H', anchor='ls')[1]
+    top = round(20 + ascent - cap_height / 2 - diameter / 2)
+    # Near the left edge of the disc, clear of the glyph, the pixels are the red fill
+    assert image.getpixel((10 + diameter // 8, top + diameter // 2))[:3] == symbols.styles['R'].colors[0]
+    # The text run starts one symbol advance along, drawn exactly as plain text
+    text_left = Image.new('RGBA', image.size, (255, 255, 255, 255))
+    glyph_cache.draw_text(ImageDraw.Draw(text_left), (10 + symbols.advance(font), 20), ': Add', (0, 0, 0), font)
+    text_box = ImageChops.difference(text_left, Image.new('RGBA', image.size, (255, 255, 255, 255))).getbbox()
+    assert ImageChops.difference(image.crop(text_box), text_left.crop(text_box)).getbbox() is None
+
+
+def test_right_anchored_cost_ends_at_the_anchor():
+    symbols = load_symbol_set(SYMBOLS_PATH)
+    font = app.get_template('black').text['mana_cost'].font
+    image = Image.new('RGBA', (800, 200), (0, 0, 0, 0))
+    symbols.draw_line(image, ImageDraw.Draw(image), (700, 20), '{3}{W}{W}', (0, 0, 0), font, 'ra')
+    left, _, right, _ = image.getbbox()
+    assert right == 700
+    assert left == 700 - round(symbols.measure('{3}{W}{W}', font)) - symbols.atlas(symbols.diameter(font)).pad
+
+
+def test_symbol_set_is_part_of_the_frame_fingerprint():
+    layout_path = os.path.join(app.layouts_dir, 'black.json')
+    with tempfile.TemporaryDirectory() as directory:
+        os.makedirs(os.path.join(directory, 'layouts'))
+        os.makedirs(os.path.join(directory, 'symbols'))
+        with open(layout_path) as f:
+            layout = json.load(f)
+        layout['frame'] = os.path.join(app.layouts_dir, layout['frame'])
+        for spec in layout['fonts'].values():
+            spec['file'] = os.path.join(app.layouts_dir, spec['file'])
+        copied_layout = os.path.join(directory, 'layouts', 'black.json')
+        with open(copied_layout, 'w') as f:
+            json.dump(layout, f)
+        with open(SYMBOLS_PATH) as f:
+            symbol_spec = json.load(f)
+        symbol_spec['font'] = os.path.join(ROOT, 'static', 'fonts', 'Beleren2016-Bold.ttf')
+        copied_symbols = os.path.join(directory, 'symbols', 'mana.json')
+        with open(copied_symbols, 'w') as f:
+            json.dump(symbol_spec, f)
+
+        before = read_layout(copied_layout)[4]
+        symbol_spec['colors']['W'] = [255, 255, 255]
+        with open(copied_symbols, 'w') as f:
+            json.dump(symbol_spec, f)
+        assert read_layout(copied_layout)[4] != before
+
+
+if __name__ == '__main__':
+    for name, func in list(globals().items()):
+        if name.startswith('test_'):
+            func()
+            print(f"✅ {name}")
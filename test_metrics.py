@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""
+Test script for render stage metrics, timing headers and request profiling
+"""
+
+import json
+import os
+import pstats
+import tempfile
+
+from flask import Flask
+
+import app as token_app
+import metrics
+from test_art_cache import run_with_stub
+
+
+def test_histogram_and_prometheus_format():
+    histogram = metrics.Histogram('test_seconds', 'Test latency.', 'stage', buckets=(0.1, 1.0))
+    for value in (0.05, 0.5, 2.0):
+        histogram.observe('draw', value)
+    data = histogram.snapshot()['draw']
+    assert data['count'] == 3 and abs(data['sum'] - 2.55) < 1e-9
+    assert data['buckets'] == [(0.1, 1), (1.0, 2)]
+
+    lines = histogram.prometheus_lines()
+    assert lines[:2] == ['# HELP test_seconds Test latency.', '# TYPE test_seconds histogram']
+    assert 'test_seconds_bucket{stage="draw",le="1.0"} 2' in lines
+    assert 'test_seconds_bucket{stage="draw",le="+Inf"} 3' in lines
+    assert 'test_seconds_count{stage="draw"} 3' in lines
+
+
+def test_collect_timings_outside_a_request():
+    with metrics.collect_timings() as timings:
+        with metrics.stage('text'):
+            pass
+        with metrics.stage('text'):
+            pass
+    assert list(timings) == ['text'] and timings['text'] >= 0
+    with metrics.stage('text'):
+        pass
+    assert list(timings) == ['text'] and metrics._timings.get() is None
+
+
+def test_generate_reports_every_stage():
+    def check(client, stub):
+        payload = {'card_name': 'Grizzly Bears', 'power': '2', 'toughness': '2', 'subtype': 'Bear'}
+        response = client.post('/api/token/generate', json=payload, headers={'X-Render-Timing': '1'})
+        assert response.status_code == 200
+        timings = json.loads(response.headers['X-Render-Timing'])
+        assert set(timings) == set(metrics.STAGES)
+        server_timing = response.headers['Server-Timing']
+        assert 'encode;dur=' in server_timing and 'total;dur=' in server_timing
+
+        # Timing headers are opt-in, and a render cache hit has no render stages
+        repeat = client.post('/api/token/generate', json=payload)
+        assert 'Server-Timing' not in repeat.headers
+
+        text = client.get('/metrics').get_data(as_text=True)
+        for stage in metrics.STAGES:
+            assert f'token_render_stage_seconds_count{{stage="{stage}"}}' in text
+        assert 'token_http_request_seconds_count{endpoint="api.generate_token"}' in text
+        assert 'token_cache_hits_total{cache="renders"}' in text
+
+    run_with_stub(check)
+
+
+def test_profile_hook_writes_stats():
+    with tempfile.TemporaryDirectory() as directory:
+        app = Flask(__name__)
+        metrics.init_metrics(app, profile_dir=directory)
+
+        @app.route('/work')
+        def work():
+            with metrics.stage('text'):
+                sum(i * i for i in range(10000))
+            return 'ok'
+
+        client = app.test_client()
+        assert 'X-Profile' not in client.get('/work').headers
+        filename = client.get('/work?profile=1').headers['X-Profile']
+        assert os.listdir(directory) == [filename]
+        assert pstats.Stats(os.path.join(directory, filename)).total_calls > 0
+        # Outside a request, stages only feed the histograms
+        with metrics.stage('text'):
+            pass
+        assert metrics._timings.get() is None
+
+
+if __name__ == '__main__':
+    for name, func in list(globals().items()):
+        if name.startswith('test_'):
+            func()
+            print(f"✅ {name}")
@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""
+Test script for the autocomplete name index
+"""
+
+import os
+import tempfile
+
+import app as token_app
+from bulk_store import BulkCardStore, build_store
+from name_index import NameIndex
+from scryfall_stub import ScryfallStub, stubbed_app
+from test_bulk_store import write_bulk
+
+RECORDS = [
+    ('1', 'Esper Sentinel', 'Artifact Creature — Human Soldier'),
+    ('2', 'Esper Charm', 'Instant'),
+    ('3', 'Serra Angel', 'Creature — Angel'),
+    ('4', 'Sentinel of the Eternal Watch', 'Creature — Giant Soldier'),
+    ('5', 'Lim-Dûl the Necromancer', 'Legendary Creature — Human Wizard'),
+    ('6', 'Esper', None),
+    ('7', 'esper sentinel', 'Duplicate name'),
+]
+
+
+def names(results):
+    return [card['name'] for card in results]
+
+
+def test_prefix_matches_come_first_alphabetically():
+    index = NameIndex(RECORDS)
+    assert len(index) == 6  # the duplicate name is indexed once
+    assert names(index.search('esp')) == ['Esper', 'Esper Charm', 'Esper Sentinel']
+    assert index.search('esper s')[0] == {'id': '1', 'name': 'Esper Sentinel',
+                                          'type_line': 'Artifact Creature — Human Soldier'}
+    assert names(index.search('ESPER', limit=2)) == ['Esper', 'Esper Charm']
+
+
+def test_substring_and_fuzzy_matches():
+    index = NameIndex(RECORDS)
+    # Prefix match first, then the name containing the query
+    assert names(index.search('sentinel')) == ['Sentinel of the Eternal Watch', 'Esper Sentinel']
+    # Accents and typos
+    assert names(index.search('lim-dul'))[0] == 'Lim-Dûl the Necromancer'
+    assert 'Lim-Dûl the Necromancer' in names(index.search('necromancr'))
+    assert 'Serra Angel' in names(index.search('sera angle'))
+    assert index.search('zzzzzz') == []
+    assert index.search('') == []
+
+
+def test_max_names_bounds_the_index():
+    records = [(str(i), f'Card {i:05d}', '') for i in range(500)]
+    assert len(NameIndex(records, max_names=100)) == 100
+
+
+def test_autocomplete_endpoint_uses_bulk_snapshot():
+    cards = [{'object': 'card', 'id': card_id, 'name': name, 'type_line': type_line}
+             for card_id, name, type_line in RECORDS[:5]]
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, 'cards.db')
+        build_store(write_bulk(tmp, cards[:2]), db_path)
+
+        original_store = token_app.bulk_store
+        token_app.bulk_store = BulkCardStore(db_path)
+        try:
+            client = token_app.app.test_client()
+            response = client.get('/api/autocomplete?q=esp')
+            assert response.status_code == 200
+            assert names(response.get_json()['cards']) == ['Esper Charm', 'Esper Sentinel']
+            assert set(response.get_json()['cards'][0]) == {'id', 'name', 'type_line'}
+
+            # A refreshed snapshot is picked up without a restart
+            build_store(write_bulk(tmp, cards), db_path)
+            assert names(client.get('/api/autocomplete?q=serra').get_json()['cards']) == ['Serra Angel']
+            assert client.get('/api/autocomplete?q=').get_json() == {'cards': []}
+        finally:
+            token_app.bulk_store = original_store
+
+
+def test_autocomplete_without_snapshot_never_calls_upstream():
+    """Online, suggestions are unavailable instead of a Scryfall search per keystroke"""
+    with ScryfallStub() as stub, stubbed_app(stub) as token_app:
+        assert token_app.bulk_store is None
+        response = token_app.app.test_client().get('/api/autocomplete?q=esp')
+        assert response.status_code == 501
+        assert response.get_json()['cards'] == []
+        assert stub.count('/cards/search') == 0
+
+
+if __name__ == '__main__':
+    for name, func in list(globals().items()):
+        if name.startswith('test_'):
+            func()
+            print(f"✅ {name}")
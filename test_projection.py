@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""
+Test script for card field projection and response compression
+"""
+
+import gzip
+import json
+
+import app as token_app
+from projection import DEFAULT_FIELDS, build_tree, parse_fields, project
+from scryfall_stub import ScryfallStub, stubbed_app
+
+
+def make_full_card(index):
+    """Card with the bulk of a real Scryfall object"""
+    return {
+        'object': 'card',
+        'id': f'card-{index}',
+        'name': f'Projection Card {index}',
+        'mana_cost': '{1}{U}',
+        'type_line': 'Creature — Merfolk',
+        'colors': ['U'],
+        'oracle_text': 'Islandwalk',
+        'legalities': {fmt: 'legal' for fmt in ('standard', 'modern', 'legacy', 'vintage', 'commander')},
+        'prices': {'usd': '0.25', 'eur': '0.20'},
+        'image_uris': {size: f'https://img.example/{size}/{index}.jpg'
+                       for size in ('small', 'normal', 'large', 'png', 'art_crop', 'border_crop')},
+    }
+
+
+def test_project_nested_fields_and_lists():
+    card = {
+        'id': 'x', 'name': 'Fire // Ice', 'prices': {'usd': '1'},
+        'card_faces': [
+            {'name': 'Fire', 'oracle_text': '...', 'image_uris': {'small': 's1', 'large': 'l1'}},
+            {'name': 'Ice', 'oracle_text': '...'},
+        ],
+    }
+    projected = project(card, parse_fields(None))
+    assert projected == {
+        'id': 'x', 'name': 'Fire // Ice',
+        'card_faces': [{'name': 'Fire', 'image_uris': {'small': 's1'}}, {'name': 'Ice'}],
+    }
+    assert project(card, parse_fields('name, prices.usd')) == {'name': 'Fire // Ice', 'prices': {'usd': '1'}}
+    assert project(card, parse_fields('*')) is card
+    # A whole object wins over one of its sub-fields, in either order
+    assert build_tree(['image_uris.small', 'image_uris']) == {'image_uris': True}
+    assert build_tree(['image_uris', 'image_uris.small']) == {'image_uris': True}
+
+    try:
+        parse_fields('name,../etc')
+        raise AssertionError('expected ValueError')
+    except ValueError:
+        pass
+
+
+def test_search_and_card_responses_are_projected():
+    with ScryfallStub([make_full_card(1)]) as stub, stubbed_app(stub):
+        client = token_app.app.test_client()
+
+        card = client.get('/api/search?q=Projection').get_json()['cards'][0]
+        assert set(card) <= {field.split('.')[0] for field in DEFAULT_FIELDS}
+        assert card['image_uris'] == {'small': 'https://img.example/small/1.jpg'}
+
+        assert client.get('/api/card/card-1?fields=id,prices').get_json() == {
+            'id': 'card-1', 'prices': {'usd': '0.25', 'eur': '0.20'}}
+        assert client.get('/api/card/card-1?fields=*').get_json() == make_full_card(1)
+        assert client.get('/api/search?q=Projection&fields=a;b').status_code == 400
+
+
+def test_json_is_compressed_when_accepted():
+    cards = [make_full_card(i) for i in range(10)]
+    with ScryfallStub(cards) as stub, stubbed_app(stub):
+        client = token_app.app.test_client()
+
+        plain = client.get('/api/search?q=Projection&limit=10&fields=*')
+        assert 'Content-Encoding' not in plain.headers
+        assert 'Accept-Encoding' in plain.headers['Vary']
+
+        compressed = client.get('/api/search?q=Projection&limit=10&fields=*',
+                                headers={'Accept-Encoding': 'gzip'})
+        assert compressed.headers['Content-Encoding'] == 'gzip'
+        assert len(compressed.data) < len(plain.data) / 3
+        assert json.loads(gzip.decompress(compressed.data)) == plain.get_json()
+
+        # Tiny bodies aren't worth compressing
+        small = client.get('/api/card/missing', headers={'Accept-Encoding': 'gzip'})
+        assert 'Content-Encoding' not in small.headers
+
+
+def test_large_results_are_streamed():
+    cards = [make_full_card(i) for i in range(60)]
+    with ScryfallStub(cards) as stub, stubbed_app(stub):
+        client = token_app.app.test_client()
+
+        response = client.get('/api/search?q=Projection&limit=50')
+        assert response.is_streamed
+        data = response.get_json()
+        assert data['total'] == 60
+        assert [card['id'] for card in data['cards']] == [f'card-{i}' for i in range(50)]
+        assert data['cards'][0] == project(cards[0], parse_fields(None))
+
+        compressed = client.get('/api/search?q=Projection&limit=50', headers={'Accept-Encoding': 'gzip'})
+        assert compressed.headers['Content-Encoding'] == 'gzip'
+        assert json.loads(gzip.decompress(compressed.data)) == data
+
+
+if __name__ == '__main__':
+    for name, func in list(globals().items()):
+        if name.startswith('test_'):
+            func()
+            print(f"✅ {name}")
@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""
+Test script for the Scryfall request scheduler
+"""
+
+import os
+import tempfile
+import threading
+import time
+
+import app as token_app
+from rate_limit import FileTokenBucket, RequestScheduler, TokenBucket, UpstreamBusy
+
+
+def test_rate_is_enforced():
+    """After the burst, requests are spaced at the configured rate"""
+    scheduler = RequestScheduler(rate=50, burst=1)
+    start = time.perf_counter()
+    for _ in range(11):
+        scheduler.acquire()
+    elapsed = time.perf_counter() - start
+
+    assert 0.18 <= elapsed < 0.5
+    assert scheduler.stats()['granted'] == 11
+
+
+def test_interactive_requests_jump_the_batch_queue():
+    scheduler = RequestScheduler(rate=20, burst=1)
+    scheduler.acquire()  # drain the bucket so everyone below has to queue
+    order = []
+
+    def request(priority, label):
+        scheduler.acquire(priority)
+        order.append(label)
+
+    threads = [threading.Thread(target=request, args=('batch', f'batch-{i}')) for i in range(3)]
+    for thread in threads:
+        thread.start()
+    time.sleep(0.01)  # let the batch requests queue up first
+    interactive = threading.Thread(target=request, args=('interactive', 'interactive'))
+    interactive.start()
+    for thread in threads + [interactive]:
+        thread.join()
+
+    # At most one batch request was already at the head of the queue when it arrived
+    assert order.index('interactive') <= 1
+    assert scheduler.stats()['max_queue_depth']['batch'] == 3
+
+
+def test_deep_queue_fails_fast_with_retry_after():
+    scheduler = RequestScheduler(rate=1, burst=1, max_queue=10, max_wait=1.5)
+    scheduler.acquire()
+    waiter = threading.Thread(target=scheduler.acquire)
+    waiter.start()
+    time.sleep(0.05)
+
+    start = time.perf_counter()
+    try:
+        scheduler.acquire()
+        raise AssertionError('expected UpstreamBusy')
+    except UpstreamBusy as e:
+        assert e.retry_after == 2
+    assert time.perf_counter() - start < 0.1
+    assert scheduler.stats()['rejected'] == 1
+    waiter.join()
+
+
+def test_shared_file_bucket_splits_one_budget():
+    """Two buckets on the same file (as in two processes) share a single burst"""
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'scryfall.bucket')
+        first = FileTokenBucket(path, rate=1, burst=3)
+        second = FileTokenBucket(path, rate=1, burst=3)
+
+        granted = [first.try_take(), second.try_take(), first.try_take(), second.try_take()]
+        assert granted[:3] == [0, 0, 0]
+        assert granted[3] > 0
+
+
+def test_token_bucket_refills():
+    bucket = TokenBucket(rate=100, burst=1)
+    assert bucket.try_take() == 0
+    assert bucket.try_take() > 0
+    time.sleep(0.02)
+    assert bucket.try_take() == 0
+
+
+def test_busy_search_returns_503_with_retry_after():
+    original = token_app.upstream.scheduler
+    token_app.upstream.scheduler = RequestScheduler(rate=0.5, burst=1, max_wait=3)
+    token_app.upstream.scheduler.acquire()
+    waiter = threading.Thread(target=token_app.upstream.scheduler.acquire)
+    waiter.start()
+    time.sleep(0.05)
+    try:
+        token_app.card_cache.clear()
+        response = token_app.app.test_client().get('/api/search?q=Anything')
+        assert response.status_code == 503
+        assert response.headers['Retry-After'] == '4'
+    finally:
+        token_app.upstream.scheduler = original
+        waiter.join()
+
+
+if __name__ == '__main__':
+    for name, func in list(globals().items()):
+        if name.startswith('test_'):
+            func()
+            print(f"✅ {name}")
@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""
+Test script for the rendered-token cache and its HTTP validators
+Renders against a local Scryfall stub so no network access is needed
+"""
+
+import tempfile
+
+import app as token_app
+from render_cache import RenderCache, render_key
+from test_art_cache import run_with_stub
+
+PAYLOAD = {'card_name': 'Grizzly Bears', 'power': '2', 'toughness': '2', 'subtype': 'Bear'}
+
+
+def test_repeat_request_served_from_cache():
+    """An identical POST returns the cached image with the same ETag"""
+    def check(client, stub):
+        first = client.post('/api/token/generate', json=PAYLOAD)
+        second = client.post('/api/token/generate', json=PAYLOAD)
+
+        assert first.status_code == 200
+        assert first.headers['ETag'] == second.headers['ETag']
+        assert first.headers['Cache-Control'] == token_app.TOKEN_CACHE_CONTROL
+        assert first.data == second.data
+        assert token_app.render_cache.stats()['memory_hits'] == 1
+        assert token_app.art_cache.stats()['misses'] == 2  # original + resized, first render only
+
+    run_with_stub(check)
+
+
+def test_if_none_match_returns_304():
+    """Revalidating with the ETag returns an empty 304"""
+    def check(client, stub):
+        etag = client.post('/api/token/generate', json=PAYLOAD).headers['ETag']
+        response = client.post('/api/token/generate', json=PAYLOAD, headers={'If-None-Match': etag})
+
+        assert response.status_code == 304
+        assert response.data == b''
+        assert response.headers['ETag'] == etag
+
+    run_with_stub(check)
+
+
+def test_rendered_token_is_cacheable_by_get():
+    """The POST points at a GET address that serves and revalidates the same image"""
+    def check(client, stub):
+        posted = client.post('/api/token/generate', json=dict(PAYLOAD, format='webp'))
+        url = posted.headers['Content-Location']
+        assert url == f"/api/token/{posted.get_etag()[0]}.webp"
+
+        fetched = client.get(url)
+        assert fetched.status_code == 200
+        assert fetched.data == posted.data
+        assert fetched.mimetype == 'image/webp'
+        assert fetched.headers['ETag'] == posted.headers['ETag']
+        assert fetched.headers['Cache-Control'] == token_app.TOKEN_CACHE_CONTROL
+        assert 'Accept' not in fetched.vary
+
+        revalidated = client.get(url, headers={'If-None-Match': fetched.headers['ETag']})
+        assert revalidated.status_code == 304 and revalidated.data == b''
+        assert client.get('/api/token/0123abcd.webp').status_code == 404
+        assert client.get(url.replace('.webp', '.gif')).status_code == 404
+
+    run_with_stub(check)
+
+
+def test_get_with_another_format_is_not_found():
+    """A key is only served under an extension of the format it was rendered in"""
+    def check(client, stub):
+        url = client.post('/api/token/generate', json=PAYLOAD).headers['Content-Location']
+        assert url.endswith('.png')
+        assert client.get(url).status_code == 200
+        for extension in ('.jpeg', '.webp'):
+            response = client.get(url.replace('.png', extension))
+            assert response.status_code == 404
+            assert 'Cache-Control' not in response.headers
+
+    run_with_stub(check)
+
+
+def test_different_inputs_get_different_etags():
+    """Changing any render input changes the ETag"""
+    def check(client, stub):
+        first = client.post('/api/token/generate', json=PAYLOAD)
+        second = client.post('/api/token/generate', json=dict(PAYLOAD, subtype='Beast'))
+        assert first.headers['ETag'] != second.headers['ETag']
+
+    run_with_stub(check)
+
+
+def test_render_key_is_canonical():
+    """Key order doesn't matter, values do"""
+    assert render_key({'a': 1, 'b': 'x'}) == render_key({'b': 'x', 'a': 1})
+    assert render_key({'a': 1}) != render_key({'a': 2})
+
+
+def test_memory_eviction_falls_back_to_disk():
+    """Entries pushed out of memory are still served from disk"""
+    with tempfile.TemporaryDirectory() as directory:
+        cache = RenderCache(directory, max_memory_bytes=150)
+        cache.put('a', b'a' * 100)
+        cache.put('b', b'b' * 100)
+
+        assert cache.stats()['memory_evictions'] == 1
+        assert cache.get('a') == b'a' * 100
+        assert cache.stats()['disk_hits'] == 1
+
+        reopened = RenderCache(directory)
+        assert reopened.get('b') == b'b' * 100
+
+
+if __name__ == '__main__':
+    for name, func in list(globals().items()):
+        if name.startswith('test_'):
+            func()
+            print(f"✅ {name}")
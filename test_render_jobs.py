@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""
+Test script for asynchronous render jobs
+"""
+
+import io
+import threading
+
+from PIL import Image
+
+import app as token_app
+from render_jobs import DONE, FAILED, JobQueueFull, RenderJobs
+from test_art_cache import run_with_stub
+
+
+def test_jobs_coalesce_and_apply_backpressure():
+    release = threading.Event()
+    rendered = []
+
+    def render(spec):
+        release.wait(5)
+        rendered.append(spec)
+
+    jobs = RenderJobs(render, workers=1, max_pending=2)
+    try:
+        first = jobs.submit('key-1', {'n': 1}, 'image/png')
+        assert jobs.submit('key-1', {'n': 1}, 'image/png') is first
+        second = jobs.submit('key-2', {'n': 2}, 'image/png')
+        try:
+            jobs.submit('key-3', {'n': 3}, 'image/png')
+            raise AssertionError('expected JobQueueFull')
+        except JobQueueFull as e:
+            assert e.retry_after >= 1
+
+        release.set()
+        assert second.done.wait(5) and first.done.wait(5)
+        assert rendered == [{'n': 1}, {'n': 2}]
+        assert first.status == DONE
+        assert {'queue_ms', 'render_ms', 'total_ms'} <= set(first.to_dict())
+
+        stats = jobs.stats()
+        assert (stats['submitted'], stats['coalesced'], stats['rejected'], stats['completed']) == (2, 1, 1, 2)
+        assert stats['pending'] == 0
+    finally:
+        jobs.shutdown()
+
+
+def test_failed_jobs_and_history_limit():
+    def render(spec):
+        if spec.get('fail'):
+            raise ValueError('no art')
+
+    jobs = RenderJobs(render, workers=1, max_finished=3)
+    try:
+        failed = jobs.submit('bad', {'fail': True}, 'image/png')
+        assert failed.done.wait(5)
+        assert failed.status == FAILED and failed.to_dict()['error'] == 'no art'
+
+        finished = [jobs.submit(f'key-{i}', {}, 'image/png') for i in range(4)]
+        for job in finished:
+            assert job.done.wait(5)
+        # Only the newest max_finished jobs are remembered
+        assert jobs.get(failed.id) is None and jobs.get(finished[0].id) is None
+        assert jobs.get(finished[-1].id) is finished[-1]
+    finally:
+        jobs.shutdown()
+
+
+def test_job_endpoints_submit_poll_and_fetch():
+    def check(client, stub):
+        payload = {'card_name': 'Grizzly Bears', 'power': '2', 'toughness': '2', 'subtype': 'Bear',
+                   'format': 'webp', 'preset': 'thumbnail'}
+        submitted = client.post('/api/token/jobs', json=payload)
+        assert submitted.status_code == 202
+        job_id = submitted.get_json()['id']
+        assert submitted.headers['Location'] == f'/api/token/jobs/{job_id}'
+
+        assert token_app.render_jobs.get(job_id).done.wait(60)
+        status = client.get(f'/api/token/jobs/{job_id}').get_json()
+        assert status['status'] == 'done' and status['render_ms'] >= 0
+
+        result = client.get(status['result_url'])
+        assert result.status_code == 200 and result.mimetype == 'image/webp'
+        assert Image.open(io.BytesIO(result.data)).width == 146
+        # The job populated the render cache, so the synchronous endpoint agrees
+        direct = client.post('/api/token/generate', json=payload)
+        assert direct.headers['ETag'] == result.headers['ETag'] and direct.data == result.data
+
+        assert client.get('/api/token/jobs/unknown').status_code == 404
+        assert client.post('/api/token/jobs', json={'card_name': 'No Such Card'}).status_code == 404
+
+    run_with_stub(check)
+
+
+if __name__ == '__main__':
+    for name, func in list(globals().items()):
+        if name.startswith('test_'):
+            func()
+            print(f"✅ {name}")
@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+"""
+Test script for the Scryfall stub and the recorded fixtures it serves
+"""
+
+import io
+import json
+import os
+
+import requests
+from PIL import Image
+
+from scryfall_stub import FIXTURES_DIR, ScryfallStub
+from test_art_cache import run_with_stub
+
+
+def test_fixtures_are_served_with_local_art():
+    with ScryfallStub() as stub:
+        cards = stub.load_fixtures()
+        with open(os.path.join(FIXTURES_DIR, 'cards.json'), encoding='utf-8') as f:
+            assert len(cards) == len(json.load(f))
+
+        for card in cards:
+            for face in [card] + card.get('card_faces', []):
+                art_url = face.get('image_uris', {}).get('art_crop')
+                if art_url:
+                    assert art_url.startswith(stub.url)
+                    response = requests.get(art_url)
+                    assert response.status_code == 200
+                    assert Image.open(io.BytesIO(response.content)).format == 'JPEG'
+
+        found = requests.get(f'{stub.url}/cards/search', params={'q': 'name:"Grizzly Bears"'}).json()
+        assert found['data'][0]['type_line'] == 'Creature — Bear'
+
+
+def test_random_errors_are_reproducible():
+    def statuses(seed):
+        with ScryfallStub(error_rate=0.3, seed=seed) as stub:
+            stub.load_fixtures()
+            with requests.Session() as session:
+                codes = [session.get(f'{stub.url}/cards/search', params={'q': 'Bears'}).status_code
+                         for _ in range(40)]
+            return codes, stub.errors
+
+    codes, errors = statuses(7)
+    assert set(codes) == {200, 503} and codes.count(503) == errors
+    assert statuses(7) == (codes, errors)
+
+
+def test_every_fixture_card_renders_offline():
+    def check(client, stub):
+        for card in stub.load_fixtures():
+            response = client.post('/api/token/generate', json={'card_name': card['name'], 'preview': True})
+            assert response.status_code == 200, (card['name'], response.get_data())
+
+    run_with_stub(check)
+
+
+if __name__ == '__main__':
+    for name, func in list(globals().items()):
+        if name.startswith('test_'):
+            func()
+            print(f"✅ {name}")
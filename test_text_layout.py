@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""
+Test script for rules-text wrapping and auto-fitting
+"""
+
+import app as token_app
+import text_layout
+
+
+def legacy_wrap(text, font, max_width):
+    """The wrapper create_token used before text_layout, kept for comparison"""
+    words = text.split()
+    lines, current_line = [], []
+    for word in words:
+        bbox = font.getbbox(' '.join(current_line + [word]))
+        if bbox[2] - bbox[0] <= max_width:
+            current_line.append(word)
+        elif current_line:
+            lines.append(' '.join(current_line))
+            current_line = [word]
+        else:
+            lines.append(word)
+    if current_line:
+        lines.append(' '.join(current_line))
+    return lines
+
+
+def oracle_slot():
+    return token_app.get_template().text['oracle']
+
+
+def test_short_text_wraps_like_before():
+    oracle = oracle_slot()
+    for text in ('Flying', 'Deathtouch, lifelink',
+                 'Whenever an opponent casts their first noncreature spell each turn, draw a card.'):
+        assert text_layout.wrap_lines(text, oracle.font, oracle.width) == legacy_wrap(text, oracle.font, oracle.width)
+
+
+def test_newlines_start_new_lines():
+    oracle = oracle_slot()
+    lines = text_layout.wrap_lines('Flying\nVigilance', oracle.font, oracle.width)
+    assert lines == ['Flying', 'Vigilance']
+    assert text_layout.wrap_lines('', oracle.font, oracle.width) == []
+
+
+def test_lines_fit_the_width():
+    oracle = oracle_slot()
+    text = ' '.join(['Whenever a creature you control dies, create a treasure token.'] * 6)
+    for line in text_layout.wrap_lines(text, oracle.font, 800):
+        assert oracle.font.getlength(line) <= 800
+
+
+def test_words_are_measured_once():
+    font = oracle_slot().font
+    text_layout._widths.clear()
+    text_layout.wrap_lines('draw draw draw a card', font, 10000)
+    assert set(text_layout.word_widths(font)) == {' ', 'draw', 'a', 'card'}
+
+
+def test_font_sizes_step_down_to_the_minimum():
+    assert text_layout.font_sizes(80, 40) == [80, 76, 72, 68, 64, 60, 56, 52, 48, 44, 40]
+    assert text_layout.font_sizes(20, 10) == [20, 16, 12, 10]
+    assert text_layout.font_sizes(20, 10, step=1) == list(range(20, 9, -1))
+    assert text_layout.font_sizes(30, 30) == [30]
+
+
+def test_fit_text_keeps_size_when_it_fits():
+    oracle = oracle_slot()
+    font, lines, _ = text_layout.fit_text('Flying', lambda size: token_app.get_template().font_at(oracle, size),
+                                          oracle.font.size, oracle.min_size, oracle.width, oracle.height)
+    assert font is oracle.font
+    assert lines == ['Flying']
+
+
+def test_fit_text_shrinks_long_text_into_the_box():
+    oracle = oracle_slot()
+    text = '\n'.join(['When this creature enters, each opponent loses 2 life and you gain 2 life.'] * 5)
+    font, lines, line_height = text_layout.fit_text(
+        text, lambda size: token_app.get_template().font_at(oracle, size),
+        oracle.font.size, oracle.min_size, oracle.width, oracle.height)
+
+    sizes = text_layout.font_sizes(oracle.font.size, oracle.min_size)
+    assert font.size in sizes[1:]
+    assert len(lines) * line_height <= oracle.height
+    # The next larger size would overflow
+    bigger = token_app.get_template().font_at(oracle, sizes[sizes.index(font.size) - 1])
+    assert len(text_layout.wrap_lines(text, bigger, oracle.width)) * text_layout.line_height(bigger) > oracle.height
+
+
+if __name__ == '__main__':
+    for name, func in list(globals().items()):
+        if name.startswith('test_'):
+            func()
+            print(f"✅ {name}")
@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""
+Test script for the pooled upstream HTTP client
+Runs against a local Scryfall stub
+"""
+
+import asyncio
+import time
+
+import requests
+
+from rate_limit import RequestScheduler
+from scryfall_stub import ScryfallStub
+from upstream import AsyncUpstreamClient, UpstreamClient
+
+CARD = {'object': 'card', 'id': 'card-1', 'name': 'Llanowar Elves'}
+
+
+def test_connections_are_reused():
+    """Sequential requests share one keep-alive connection"""
+    with ScryfallStub([CARD]) as stub:
+        client = UpstreamClient()
+        for _ in range(5):
+            assert client.get(f"{stub.url}/cards/card-1").json()['name'] == 'Llanowar Elves'
+        assert stub.connections == 1
+
+
+def test_429_is_retried_after_retry_after():
+    """A rate-limited response is retried once Retry-After has passed"""
+    with ScryfallStub([CARD]) as stub:
+        stub.fail('/cards/card-1', 429, {'Retry-After': '1'})
+        client = UpstreamClient(backoff_factor=0)
+
+        start = time.perf_counter()
+        response = client.get(f"{stub.url}/cards/card-1")
+        elapsed = time.perf_counter() - start
+
+        assert response.status_code == 200
+        assert stub.count('/cards/card-1') == 2
+        assert elapsed >= 1
+
+
+def test_retry_after_is_capped():
+    with ScryfallStub([CARD]) as stub:
+        stub.fail('/cards/card-1', 429, {'Retry-After': '3600'})
+        client = UpstreamClient(backoff_factor=0, max_retry_after=0.1)
+
+        start = time.perf_counter()
+        assert client.get(f"{stub.url}/cards/card-1").status_code == 200
+        assert time.perf_counter() - start < 5
+
+
+def test_server_errors_give_up_after_retries():
+    """Persistent failures are returned to the caller once retries are exhausted"""
+    with ScryfallStub([CARD]) as stub:
+        stub.fail('/cards/card-1', 503, times=10)
+        client = UpstreamClient(retries=2, backoff_factor=0)
+
+        assert client.get(f"{stub.url}/cards/card-1").status_code == 503
+        assert stub.count('/cards/card-1') == 3
+
+
+def test_not_found_is_not_retried():
+    with ScryfallStub([CARD]) as stub:
+        client = UpstreamClient()
+        assert client.get(f"{stub.url}/cards/missing").status_code == 404
+        assert stub.count('/cards/missing') == 1
+
+
+def test_every_retry_is_throttled():
+    """Retries of failed statuses and refused connections each take a scheduler token"""
+    with ScryfallStub([CARD]) as stub:
+        stub.fail('/cards/card-1', 503, times=2)
+        scheduler = RequestScheduler(rate=100, burst=100)
+        client = UpstreamClient(retries=3, backoff_factor=0, scheduler=scheduler)
+
+        assert client.get(f"{stub.url}/cards/card-1", priority='batch').status_code == 200
+        assert stub.count('/cards/card-1') == 3
+        assert scheduler.stats()['granted'] == 3
+
+    client = UpstreamClient(retries=2, backoff_factor=0, scheduler=scheduler)
+    try:
+        client.get('http://127.0.0.1:9/cards/card-1', priority='batch')
+        assert False, 'expected the refused connection to be raised'
+    except requests.exceptions.ConnectionError:
+        pass
+    assert scheduler.stats()['granted'] == 6
+
+
+def test_async_requests_overlap():
+    """Concurrent coroutine requests run in parallel rather than back to back"""
+    with ScryfallStub([CARD], latency=0.3) as stub:
+        client = AsyncUpstreamClient()
+
+        async def fetch_all():
+            return await asyncio.gather(*[client.get_json(f"{stub.url}/cards/card-1") for _ in range(5)]
+                                        + [client.get_json(f"{stub.url}/cards/missing")])
+
+        start = time.perf_counter()
+        results = asyncio.run(fetch_all())
+        elapsed = time.perf_counter() - start
+        client.close()
+
+        assert [card and card['name'] for card in results] == ['Llanowar Elves'] * 5 + [None]
+        assert elapsed < 1.0
+
+
+if __name__ == '__main__':
+    for name, func in list(globals().items()):
+        if name.startswith('test_'):
+            func()
+            print(f"✅ {name}")
@@ -0,0 +1,128 @@
+"""
+Text layout for rules text
+Words are measured once per font and the widths are cached across requests, so
+wrapping a line is a running sum instead of re-measuring the whole growing line for
+every word. Explicit newlines in oracle text start a new paragraph, and fit_text
+shrinks the font with a binary search over a few fixed sizes when the text would
+overflow its box.
+"""
+
+import threading
+
+# Words remembered per font before that font's cache is reset
+MAX_WORDS_PER_FONT = 20000
+# fit_text shrinks in steps of this many points, so only a handful of sizes (and
+# symbol atlases) are ever needed per text box
+FONT_SIZE_STEP = 4
+
+_widths = {}
+_widths_lock = threading.Lock()
+
+
+def font_key(font):
+    """Fonts loaded from the same file at the same size share a width cache"""
+    path = getattr(font, 'path', None)
+    return (path, font.size) if path else id(font)
+
+
+def word_widths(font):
+    """Return the shared word -> advance width cache for a font"""
+    key = font_key(font)
+    widths = _widths.get(key)
+    if widths is None:
+        with _widths_lock:
+            widths = _widths.setdefault(key, {})
+    return widths
+
+
+def measure(font, word):
+    """Advance width of a word, measured once per font"""
+    widths = word_widths(font)
+    width = widths.get(word)
+    if width is None:
+        if len(widths) >= MAX_WORDS_PER_FONT:
+            widths.clear()
+        width = widths[word] = font.getlength(word)
+    return width
+
+
+def wrap_lines(text, font, max_width, symbols=None):
+    """Wrap text to max_width, breaking at spaces and at explicit newlines.
+
+    With a SymbolSet, words holding symbols such as "{T}:" are measured with the
+    symbols at their drawn width.
+    """
+    if not text:
+        return []
+
+    space = measure(font, ' ')
+    lines = []
+    for paragraph in text.split('\n'):
+        current_line = []
+        line_width = 0
+        for word in paragraph.split():
+            if symbols is not None and '{' in word:
+                word_width = symbols.measure(word, font)
+            else:
+                word_width = measure(font, word)
+            test_width = line_width + space + word_width if current_line else word_width
+
+            if test_width <= max_width:
+                current_line.append(word)
+                line_width = test_width
+            elif current_line:
+                lines.append(' '.join(current_line))
+                current_line = [word]
+                line_width = word_width
+            else:
+                # Single word is too long, give it a line of its own
+                lines.append(word)
+
+        if current_line:
+            lines.append(' '.join(current_line))
+
+    return lines
+
+
+def line_height(font):
+    """Distance between wrapped lines for a font"""
+    return font.getbbox("Ay")[3]
+
+
+def font_sizes(max_size, min_size, step=FONT_SIZE_STEP):
+    """The sizes fit_text may choose, largest first: max_size down in steps, then min_size"""
+    sizes = list(range(max_size, min_size, -step))
+    return sizes + [min_size] if min_size <= max_size else [max_size]
+
+
+def fit_text(text, load_font, max_size, min_size, max_width, max_height, symbols=None,
+             step=FONT_SIZE_STEP):
+    """Wrap text at the largest font size (of font_sizes) that fits the box.
+
+    load_font(size) returns the font at a given size. Returns (font, lines, line_height);
+    if even min_size overflows, the min_size layout is returned.
+    """
+    def layout(size):
+        font = load_font(size)
+        lines = wrap_lines(text, font, max_width, symbols)
+        height = line_height(font)
+        return font, lines, height
+
+    best = layout(max_size)
+    if len(best[1]) * best[2] <= max_height or max_size <= min_size:
+        return best
+
+    # Binary search for the largest size that fits; sizes run largest first
+    sizes = font_sizes(max_size, min_size, step)
+    low, high = 1, len(sizes) - 1
+    best = None
+    while low <= high:
+        middle = (low + high) // 2
+        candidate = layout(sizes[middle])
+        if len(candidate[1]) * candidate[2] <= max_height:
+            best = candidate
+            high = middle - 1
+        else:
+            low = middle + 1
+
+    return best if best is not None else layout(min_size)
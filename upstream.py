@@ -0,0 +1,148 @@
+"""
+HTTP client for upstream calls (Scryfall API and its image CDN)
+One shared requests.Session with a sized connection pool keeps TCP/TLS connections
+alive between calls, every request gets a timeout, and transient failures are retried
+with exponential backoff that honours Scryfall's Retry-After on 429 responses.
+Calls made with a priority wait for a slot from the RequestScheduler before every
+attempt, so retries are paid for from the same rate limit as first tries.
+AsyncUpstreamClient exposes the same calls as coroutines for ASGI deployments.
+"""
+
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.exceptions import MaxRetryError
+from urllib3.util.retry import Retry
+
+USER_AGENT = 'hashaton-tokens/1.0'
+
+# Statuses worth retrying: rate limiting and transient server/proxy errors
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+
+class CappedRetry(Retry):
+    """Retry policy that never sleeps longer than max_retry_after for a Retry-After header"""
+
+    def __init__(self, *args, max_retry_after=30, **kwargs):
+        self.max_retry_after = max_retry_after
+        super().__init__(*args, **kwargs)
+
+    def new(self, **kwargs):
+        kwargs.setdefault('max_retry_after', self.max_retry_after)
+        return super().new(**kwargs)
+
+    def get_retry_after(self, response):
+        retry_after = super().get_retry_after(response)
+        if retry_after is None:
+            return None
+        return min(retry_after, self.max_retry_after)
+
+
+class UpstreamClient:
+    """Thread-safe pooled HTTP client with timeouts and retries"""
+
+    def __init__(self, pool_size=20, connect_timeout=3.05, read_timeout=15, retries=3,
+                 backoff_factor=0.5, max_retry_after=30, scheduler=None):
+        self.pool_size = pool_size
+        self.scheduler = scheduler
+        self.timeout = (connect_timeout, read_timeout)
+        self.session = requests.Session()
+        self.session.headers.update({'User-Agent': USER_AGENT, 'Accept': 'application/json;q=0.9,*/*;q=0.8'})
+
+        # Retries happen in request() rather than inside urllib3, so each one can be
+        # throttled; the adapter sends every attempt exactly once
+        self.retry = CappedRetry(
+            total=retries,
+            backoff_factor=backoff_factor,
+            status_forcelist=RETRY_STATUSES,
+            allowed_methods=frozenset(['GET', 'POST']),
+            respect_retry_after_header=True,
+            raise_on_status=False,
+            max_retry_after=max_retry_after,
+        )
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=pool_size, max_retries=0)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+
+    def get(self, url, priority=None, **kwargs):
+        """GET a URL; with a priority every attempt is throttled by the scheduler first"""
+        return self.request('GET', url, priority, **kwargs)
+
+    def post(self, url, priority=None, **kwargs):
+        return self.request('POST', url, priority, **kwargs)
+
+    def request(self, method, url, priority=None, **kwargs):
+        """Send a request, retrying connection errors and retryable statuses with backoff.
+
+        Once retries run out the last response is returned (or the last error raised).
+        """
+        kwargs.setdefault('timeout', self.timeout)
+        retry = self.retry
+        while True:
+            self._throttle(priority)
+            try:
+                response = self.session.request(method, url, **kwargs)
+            except (requests.exceptions.ConnectionError, requests.exceptions.Timeout) as e:
+                try:
+                    retry = retry.increment(method, url, error=e)
+                except MaxRetryError:
+                    raise e
+                retry.sleep()
+                continue
+
+            if not retry.is_retry(method, response.status_code, 'Retry-After' in response.headers):
+                return response
+            try:
+                retry = retry.increment(method, url, response=response.raw)
+            except MaxRetryError:
+                return response
+            response.close()
+            retry.sleep(response.raw)
+
+    def _throttle(self, priority):
+        if priority is not None and self.scheduler is not None:
+            self.scheduler.acquire(priority)
+
+    def close(self):
+        self.session.close()
+
+
+class AsyncUpstreamClient:
+    """Coroutine interface over an UpstreamClient.
+
+    Requests run on a thread pool sized to the connection pool, so an event loop can
+    overlap several upstream calls (e.g. metadata lookups and art downloads) while
+    still sharing the pooled, retrying session.
+    """
+
+    def __init__(self, client=None):
+        self.client = client or UpstreamClient()
+        self._executor = ThreadPoolExecutor(max_workers=self.client.pool_size,
+                                            thread_name_prefix='upstream')
+
+    async def get(self, url, **kwargs):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, lambda: self.client.get(url, **kwargs))
+
+    async def post(self, url, **kwargs):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, lambda: self.client.post(url, **kwargs))
+
+    async def get_json(self, url, **kwargs):
+        """GET and decode JSON, or None on a 404"""
+        response = await self.get(url, **kwargs)
+        if response.status_code == 404:
+            return None
+        response.raise_for_status()
+        return response.json()
+
+    async def get_bytes(self, url, **kwargs):
+        response = await self.get(url, **kwargs)
+        response.raise_for_status()
+        return response.content
+
+    def close(self):
+        self._executor.shutdown(wait=False)
+        self.client.close()
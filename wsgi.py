@@ -0,0 +1,15 @@
+"""
+WSGI entry point for production servers
+Importing the app module only reads the layout files; this entry point also preloads
+every frame template (frame image, fonts, precomposited base) so the cost is paid at
+startup. With gunicorn's preload_app that happens once in the master process and
+forked workers share those pages copy-on-write.
+
+Usage: gunicorn -c gunicorn.conf.py
+"""
+
+from app import app, frame_templates
+
+frame_templates.preload()
+
+application = app